@@ -0,0 +1,152 @@
+from array import array
+
+
+# -------------------------
+# Adjacency Class
+# -------------------------
+class Adjacency:
+    """
+    Read-only snapshot of the graph connections in compressed sparse
+    row (CSR) format. It is built from the edge list of each vertex, in
+    the same order of Vertex.get_edge(), so scripts can traverse the
+    graph in tight loops without creating proxies for every neighbor.
+
+    Vertices are referenced by their dense index, the position of the
+    vertex in the graph's vertex list (0 to size - 1). The neighbors of
+    vertex i are at positions offsets[i] to offsets[i + 1] - 1 of the
+    neighbors, edges and weights buffers. Indices of buffers are
+    0-based in Lua and Python, and so are the dense indices: in Lua,
+    vertex i is the vertex of get_index() i + 1. Lua scripts get a
+    LuaAdjacency, with accessors in the 1-based indices of Lua.
+
+    The buffers are read-only memoryviews of array objects, so they
+    can also be wrapped by NumPy without copy, e.g.
+    numpy.frombuffer(adjacency.offsets, dtype=numpy.int64).
+
+    Attributes
+    ----------
+    offsets: memoryview
+        Start of neighbors of each vertex (size + 1 integers).
+    neighbors: memoryview
+        Dense index of adjacent vertex of each connection.
+    edges: memoryview
+        ID of the edge of each connection.
+    weights: memoryview
+        Weight of the edge of each connection.
+    vertex_ids: memoryview
+        ID of each vertex by its dense index.
+    """
+
+    def __init__(self, graph):
+        """
+        Parameters
+        ----------
+        graph: GraphModel
+            Graph to take the snapshot.
+        """
+        index = {v: i for i, v in enumerate(graph.vertex)}
+        offsets = array("q", [0])
+        neighbors = array("q")
+        edges = array("q")
+        weights = array("d")
+        for v in graph.vertex:
+            for e in v.edge:
+                neighbors.append(index[e.b if e.a is v else e.a])
+                edges.append(e.id)
+                weights.append(float(e.weight))
+            offsets.append(len(neighbors))
+        self.offsets = memoryview(offsets).toreadonly()
+        self.neighbors = memoryview(neighbors).toreadonly()
+        self.edges = memoryview(edges).toreadonly()
+        self.weights = memoryview(weights).toreadonly()
+        self.vertex_ids = memoryview(
+            array("q", (v.id for v in graph.vertex))
+        ).toreadonly()
+
+    # -------------------------
+    # Get Vertex Size
+    # -------------------------
+    def get_vertex_size(self) -> int:
+        """Returns how many vertices there are in the snapshot."""
+        return len(self.vertex_ids)
+
+    # -------------------------
+    # Get Degree
+    # -------------------------
+    def get_degree(self, index: int) -> int:
+        """Returns the number of connections of vertex at dense index."""
+        return self.offsets[index + 1] - self.offsets[index]
+
+
+# -------------------------
+# Lua Adjacency Class
+# -------------------------
+class LuaAdjacency:
+    """
+    Adjacency for Lua scripts, with the same buffers (0-based, see
+    Adjacency) and accessors that take and return vertex indices in
+    the 1-based form of get_index() and get_vertex_by_index() of Lua:
+
+        local first, last = adj:get_range(v:get_index())
+        for k = first, last do
+            local u = app:get_vertex_by_index(adj:get_neighbor(k))
+            local edge_id = adj.edges[k]
+        end
+
+    Attributes
+    ----------
+    offsets, neighbors, edges, weights, vertex_ids: memoryview
+        Buffers of the Adjacency, 0-based.
+    """
+
+    def __init__(self, adjacency: Adjacency):
+        """
+        Parameters
+        ----------
+        adjacency: Adjacency
+            Snapshot whose buffers are shared.
+        """
+        self.offsets = adjacency.offsets
+        self.neighbors = adjacency.neighbors
+        self.edges = adjacency.edges
+        self.weights = adjacency.weights
+        self.vertex_ids = adjacency.vertex_ids
+
+    # -------------------------
+    # Get Vertex Size
+    # -------------------------
+    def get_vertex_size(self) -> int:
+        """Returns how many vertices there are in the snapshot."""
+        return len(self.vertex_ids)
+
+    # -------------------------
+    # Get Degree
+    # -------------------------
+    def get_degree(self, index: int) -> int:
+        """Returns the number of connections of vertex at Lua index."""
+        return self.offsets[index] - self.offsets[index - 1]
+
+    # -------------------------
+    # Get Range
+    # -------------------------
+    def get_range(self, index: int) -> tuple[int, int]:
+        """
+        Returns the first and the last positions in the buffers of the
+        connections of vertex at Lua index, for a numeric for loop. The
+        last is smaller than the first if there are no connections.
+        """
+        return self.offsets[index - 1], self.offsets[index] - 1
+
+    # -------------------------
+    # Get Neighbor
+    # -------------------------
+    def get_neighbor(self, position: int) -> int:
+        """Returns the Lua index of adjacent vertex at buffer position."""
+        return self.neighbors[position] + 1
+
+    # -------------------------
+    # Get Vertex ID
+    # -------------------------
+    def get_vertex_id(self, index: int) -> int:
+        """Returns the ID of vertex at Lua index."""
+        return self.vertex_ids[index - 1]
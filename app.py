@@ -1,32 +1,43 @@
 import os
+import shutil
 import locale
 from datetime import datetime
 import tkinter as tk
 from tkinter import ttk
 from tkinter import messagebox
-from tkinter.filedialog import asksaveasfile, askopenfilename
+from tkinter.filedialog import asksaveasfilename, askopenfilename
 from PIL import Image, ImageTk
-from vertex import Vertex, Edge
+from vertex import Vertex
+from edge import Edge
+from graph_model import GraphModel, save_graph_data
+from renderer import GraphRenderer
 import json
 import time
+import random
 import webbrowser
 from threading import Thread
-from state import State, ScriptType
+from state import State, ElementType
 from about import About
-from lupa import LuaRuntime
-from app_proxy import AppProxy
+from engine import Engine
+from script_cache import select_lua_runtime
 from properties import Properties
+from ui_queue import UIQueue
+from log_buffer import LogBuffer
+from execution_trace import Trace, TracePlayer
 
 
 # -------------------------
 # App Class
 # -------------------------
-class App(tk.Frame):
+class App(tk.Frame, Engine):
     """Defines the application class of graphic interface using Tkinter."""
 
-    VERTEX = 0
-    EDGE = 1
+    VERTEX = ElementType.VERTEX
+    EDGE = ElementType.EDGE
     SPEED_MAX = 10
+    REPLAY_BASE = 3  # Replay runs REPLAY_BASE^speed events per second
+    LOAD_POLL_MS = 20  # Interval to check the graph loading worker
+    COMPACT_SAVE_SIZE = 5000  # Vertices + edges to save one record per line
 
     COLOR_BG = "white"
     COLOR_BG_SOLVED = "#f5f5dc"  # "#ffffee"
@@ -42,7 +53,9 @@ class App(tk.Frame):
     # -------------------------
     # App Constructor
     # -------------------------
-    def __init__(self, master=None, filename: str = "", script_lua: str = ""):
+    def __init__(
+        self, master=None, filename: str = "", script_lua: str = "", seed=None
+    ):
         """
         Defines the class constructor to initialize the graphic interface and
         canvas visual elements.
@@ -53,11 +66,14 @@ class App(tk.Frame):
             Path and file name of the graph.
         script_lua: str
             Path and file name of the algorithm in lua programming language.
+        seed: int
+            Seed of the random number generator of executions. If None,
+            the seed is taken from the script properties or a new one
+            is chosen for each execution.
         """
         super().__init__(master)
+        Engine.__init__(self)
         self.script = script_lua
-        self.script_type = ScriptType.NONE
-        self.script_properties = None
         self.script_properties_frame = None
         self.config_file = "settings.json"
         self.var_log_symbols = ""
@@ -67,25 +83,33 @@ class App(tk.Frame):
         self.var_show_weight = tk.BooleanVar(value=True)
         self.var_animation = tk.BooleanVar(value=True)
         self.var_execution_time_log = tk.BooleanVar(value=True)
+        self.var_record_trace = tk.BooleanVar(value=False)
+        self.var_replay = tk.IntVar(value=0)
+        self.player = None  # TracePlayer of the last trace
+        self.replay_job = None  # Pending after() call of the replay
+        self.replay_position = 0.0
+        self.replay_clock = 0.0
         self.load_configuration()
-        self.bidirectional = False
-        self.execution_time = 0
-        self.solved = False
-        self.vertex: list[Vertex] = []
-        self.vertex_dict = {}
-        self.edge: list[Edge] = []
-        self.edge_dict = {}
-        self.area = []
+        self.set_speed(self.speed)
+        self.var_seed = tk.StringVar(value="" if seed is None else str(seed))
+        self.graph.bidirectional = False
+        self.loading = False
+        self.loading_id = 0
         self.master = master
-        self.scale = 1.0
         self.master.title(f"{self.title}")
+        self.log_widget_lines = 0  # Lines in the log widget
         self.create_window()
+        self.ui = UIQueue(self)
+        self.log_buffer = LogBuffer(self.log_max_lines)
+        try:
+            self.log_buffer.set_file(self.log_file)
+        except OSError as e:
+            self.set_statusbar(f"Error opening log file: {e}")
+        self.renderer = GraphRenderer(self, self.canvas, self.graph)
         self.selected = None
         self.selected_edge = None
         self.initial_time = time.time()
         self.final_time = time.time()
-        self.stopped = True
-        self.paused = False
         self.filename: str = ""
         if filename != "":
             self.load_graph_file(filename)
@@ -95,13 +119,9 @@ class App(tk.Frame):
             )
             name = os.path.splitext(os.path.basename(self.script))[0]
             self.script_label.config(text=name)
-
-    # -------------------------
-    # Get Vertex Size
-    # -------------------------
-    def get_vertex_size(self):
-        """Returns how many vertices there are in the graph's vertex list."""
-        return len(self.vertex)
+            self.script_cache.warm(
+                self.script, select_lua_runtime(self.get_lua_runtime())[0]
+            )
 
     # -------------------------
     # Get Speed
@@ -111,67 +131,16 @@ class App(tk.Frame):
         return self.speed
 
     # -------------------------
-    # Set Execution Time
-    # -------------------------
-    def set_execution_time(self, time):
-        """Set the execution time of algorithm."""
-        self.execution_time = time
-
-    # -------------------------
-    # Set Solved
-    # -------------------------
-    def set_solved(self, solved):
-        """Inform application if algorithm solved graph or not."""
-        self.solved = solved
-
-    # -------------------------
-    # Get Vertex
-    # -------------------------
-    def get_vertex(self, index):
-        """
-        Returns a specific vertex from graph vertices.
-
-        Parameters
-        ----------
-        index: int
-            Position of vertex on vertex list.
-        """
-        if index < 0 or index >= self.get_vertex_size():
-            return None
-        return self.vertex[index]
-
-    # -------------------------
-    # Get Vertex By ID
-    # -------------------------
-    def get_vertex_by_id(self, vertex_id) -> Vertex | None:
-        """
-        Returns a vertex by its ID.
-
-        Parameters
-        ----------
-        vertex_id: str
-            ID of the vertex to be retrieved.
-
-        Returns
-        -------
-        Vertex | None
-            The vertex with the specified ID, or None if not found.
-        """
-        return self.vertex_dict.get(vertex_id, None)
-
-    # -------------------------
-    # Area Add
+    # Set Speed
     # -------------------------
-    def area_add(self, x, y):
+    def set_speed(self, speed: int) -> None:
         """
-        Add a new point in a area to create a poligonon.
-
-        Parameters
-        ----------
-        x, y: int
-            Position x, y of new point in area.
+        Changes the speed of algorithm execution, from 0 to 10. Each
+        step() of the script waits (10 - speed)^2 / 100 seconds, so the
+        speed 10 has no wait.
         """
-        self.area.append((x, y))
+        self.speed = speed
+        self.set_step_delay((self.get_speed_max() - speed) ** 2 / 100)
 
     # -------------------------
     # Area Close
@@ -180,24 +149,15 @@ class App(tk.Frame):
         """
         Close the area polygon and create it.
         """
-        area = self.area
-        self.canvas.create_polygon(
-            *area, fill="lemon chiffon", outline="black", tags="area"
-        )
-        self.area = []
+        self.ui.call(self.renderer.draw_area, self.area)
+        super().area_close()
 
     # -------------------------
     # Draw
     # -------------------------
     def draw(self) -> None:
         """Draw all edges and vertices"""
-        for edge in self.edge:
-            edge.draw()
-        for vertex in self.vertex:
-            vertex.draw()
-        self.canvas.tag_lower("edge")
-        self.canvas.tag_raise("vertex")
-        self.canvas.tag_raise("text")
+        self.renderer.draw()
 
     # -------------------------
     # Create Window
@@ -220,6 +180,8 @@ class App(tk.Frame):
             command=self.save_graph_file_dialog,
         )
         file_menu.add_command(label="Save Log", command=self.save_log_file)
+        file_menu.add_command(label="Open Trace", command=self.open_trace_file)
+        file_menu.add_command(label="Save Trace", command=self.save_trace_file)
         file_menu.add_separator()
         file_menu.add_command(label="Exit", command=root.quit)
 
@@ -250,7 +212,8 @@ class App(tk.Frame):
             canvas_frame, orient="horizontal", command=self.canvas.xview
         )
         self.canvas.configure(
-            yscrollcommand=self.scroll_y.set, xscrollcommand=self.scroll_x.set
+            yscrollcommand=lambda *args: self.on_canvas_scroll(self.scroll_y, *args),
+            xscrollcommand=lambda *args: self.on_canvas_scroll(self.scroll_x, *args),
         )
 
         # Positioning the Canvas and Scrollbars
@@ -262,6 +225,7 @@ class App(tk.Frame):
         canvas_frame.grid_columnconfigure(0, weight=1)
 
         self.canvas.bind("<Button-2>", self.canvas_button2_event)
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
         self.master.bind("<Delete>", self.delete_canvas_object)
 
         self.canvas.bind("<MouseWheel>", self.zoom)  # Windows/Linux
@@ -397,6 +361,21 @@ class App(tk.Frame):
         )
         self.execution_time_log.pack(side="right")
 
+        # Control for "Record Trace"
+        record_trace_frame = ttk.Frame(self.config_frame)
+        record_trace_frame.pack(fill="x", padx=10, pady=0)
+        tk.Label(record_trace_frame, text="Record trace:").pack(
+            side="left", pady=0
+        )
+        self.chk_record_trace = tk.Checkbutton(
+            record_trace_frame,
+            variable=self.var_record_trace,
+            onvalue=True,
+            offvalue=False,
+            command=self.on_record_trace_change,
+        )
+        self.chk_record_trace.pack(side="right")
+
         # Control for "Bidirectional"
         bidirectional_frame = ttk.Frame(self.config_frame)
         bidirectional_frame.pack(fill="x", padx=10, pady=0)
@@ -424,7 +403,7 @@ class App(tk.Frame):
         def on_speed_change(value):
             """When change speed, salve configuration file."""
             self.save_configuration()
-            self.speed = int(value)
+            self.set_speed(int(value))
             self.label_valor.config(text=f"{self.scale_speed.get()}")
 
         speed_scale = self.scale_speed = tk.Scale(
@@ -442,6 +421,32 @@ class App(tk.Frame):
         self.label_valor = tk.Label(speed_frame, text=f"{speed_scale.get()}")
         self.label_valor.pack(side="right", padx=1)
 
+        # Control for "Seed"
+        seed_frame = ttk.Frame(self.config_frame)
+        seed_frame.pack(fill="x", padx=10, pady=0)
+        tk.Label(seed_frame, text="Seed:").pack(side="left", pady=0)
+        self.entry_seed = ttk.Entry(seed_frame, textvariable=self.var_seed)
+        self.entry_seed.pack(side="right", fill="x")
+
+        # Control for "Replay"
+        replay_frame = ttk.Frame(self.config_frame)
+        replay_frame.pack(fill="x", padx=10, pady=0)
+        tk.Label(replay_frame, text="Replay:").pack(side="left", pady=0)
+        self.bt_replay = ttk.Button(
+            replay_frame, image=self.icon_play, command=self.event_replay
+        )
+        self.bt_replay.pack(side="left", padx=5)
+        self.scale_replay = tk.Scale(
+            replay_frame,
+            from_=0,
+            to=0,
+            variable=self.var_replay,
+            orient="horizontal",
+            showvalue=False,
+            command=self.on_replay_scrub,
+        )
+        self.scale_replay.pack(side="right", fill="x", expand=True)
+
         # ------------------------------------------------------
 
         logs_frame = ttk.Frame(self.config_frame)
@@ -589,8 +594,7 @@ class App(tk.Frame):
         """
         name = self.vertex_name.get()
         if self.selected:
-            self.selected.name = name
-            self.canvas.itemconfig(self.selected.text_id, text=name)
+            self.selected.set_name(name)
 
     # -------------------------
     # Open Documentation Dialog
@@ -644,28 +648,30 @@ class App(tk.Frame):
             factor = 0.9
         else:
             return
-        self.scale *= factor  # update scale
         # Center zoom on mouse position
-        self.canvas.scale(
-            "all",
+        self.renderer.zoom(
             self.canvas.canvasx(event.x),
             self.canvas.canvasy(event.y),
             factor,
-            factor,
         )
-        # Adjust your view to stay focused
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-        # Update the size of edge arrows
-        for e in self.edge:
-            self.canvas.itemconfig(
-                e.canvas_id,  # Update the element on the Canvas
-                arrowshape=(
-                    10 * self.scale,
-                    10 * self.scale,
-                    5 * self.scale,
-                ),
-            )
+
+    # -------------------------
+    # On Canvas Scroll
+    # -------------------------
+    def on_canvas_scroll(self, scrollbar: tk.Scrollbar, first, last) -> None:
+        """
+        Called when the view of canvas moves: updates the scrollbar and
+        the items drawn for the visible area.
+        """
+        scrollbar.set(first, last)
+        self.renderer.request_view()
+
+    # -------------------------
+    # On Canvas Configure
+    # -------------------------
+    def on_canvas_configure(self, event) -> None:
+        """Updates the items drawn when the canvas is resized."""
+        self.renderer.request_view()
 
     # -------------------------
     # On Script Click
@@ -704,6 +710,14 @@ class App(tk.Frame):
         self.save_configuration()
         self.execution_time_log = self.var_execution_time_log.get()
 
+    # -------------------------
+    # On Record Trace Change
+    # -------------------------
+    def on_record_trace_change(self):
+        """Changes variable that controls the recording of traces."""
+        self.save_configuration()
+        self.record_trace = self.var_record_trace.get()
+
     # -------------------------
     # On Edge Weight Change
     # -------------------------
@@ -712,8 +726,7 @@ class App(tk.Frame):
         weight = self.edge_weight.get()
         try:
             if self.selected_edge:
-                self.selected_edge.weight = float(weight)
-                self.canvas.itemconfig(self.selected_edge.text_id, text=weight)
+                self.selected_edge.set_weight(float(weight))
         except ValueError:
             print("Invalid value, ignoring update.")
 
@@ -725,37 +738,8 @@ class App(tk.Frame):
         When the chart style is changed between two-way and one-way,
         it is necessary to recreate the edges on the canvas.
         """
-        self.bidirectional = self.var_bidirectional.get()
-        # Redraw all edges
-        for e in self.edge:
-            ax, ay = e.a.get_coords()
-            bx, by = e.b.get_coords()
-
-            # Removes current edge from canvas
-            self.canvas.delete(e.canvas_id)
-
-            # Redraw edge with or without arrows
-            if self.bidirectional:
-                e.canvas_id = self.canvas.create_line(
-                    ax, ay, bx, by, width=2, fill=self.COLOR_NONE, tags="edge"
-                )
-            else:
-                e.canvas_id = self.canvas.create_line(
-                    ax,
-                    ay,
-                    bx,
-                    by,
-                    arrow="last",
-                    arrowshape=(
-                        10 * self.scale,
-                        10 * self.scale,
-                        5 * self.scale,
-                    ),
-                    width=2,
-                    fill=self.COLOR_NONE,
-                    tags="edge",
-                )
-        self.draw()
+        self.graph.bidirectional = self.var_bidirectional.get()
+        self.renderer.rebuild_edges()
 
     # -------------------------
     # On Log Symbols Change
@@ -776,7 +760,7 @@ class App(tk.Frame):
     # Event Pause
     # -------------------------
     def event_pause(self) -> None:
-        self.paused = True
+        self.pause()
 
     # -------------------------
     # Event Play
@@ -786,12 +770,15 @@ class App(tk.Frame):
         It is executed when the play button is pressed, starting the
         execution of an algorithm on a graph.
         """
-        if self.paused:
-            self.paused = False
+        if self.is_paused():
+            self.resume()
             return
         if not self.script:
             self.show_error_alert("You need a graph and an algorithm to run.")
             return
+        if self.loading:
+            self.set_statusbar("Wait until the graph is loaded.")
+            return
         self.clear_log()
         self.event_clear()
         self.canvas.configure(bg=App.COLOR_BG_RUNNING)
@@ -799,121 +786,202 @@ class App(tk.Frame):
         self.debug = False
 
         if self.selected is not None:
-            self.selected.unselect()
+            self.renderer.unselect(self.selected)
         if self.selected_edge is not None:
-            self.selected_edge.unselect()
-        self.stopped = False
+            self.renderer.unselect(self.selected_edge)
+        self.log_buffer.mark(
+            f"{datetime.now():%Y-%m-%d %H:%M:%S} "
+            f"{os.path.basename(self.script)} "
+            f"{os.path.basename(self.filename)}"
+        )
+        self.start_execution()
 
-        # For now python too ------------------------
         def _run_script():
-            ext = os.path.splitext(self.script)[1].lower()
-            try:
-                if ext == ".lua":
-                    self.script_type = ScriptType.LUA
-                    self.lua_execute()
-                elif ext == ".py":
-                    self.script_type = ScriptType.PYTHON
-                    self.python_execute()
-                else:
-                    self.log(f"Unsupported script extension: {ext}", True)
-            except Exception as e:
-                self.log(f"Error executing script: {e}", True)
-
-        # --------------------------------------
+            ok = self.execute()
+            self.ui.call(self.end_execution, ok)
 
         a = Thread(target=_run_script)
-
-        # a = Thread(target=self.lua_execute)
         a.daemon = True
         a.start()
 
     # -------------------------
-    # Lua Execute
+    # End Execution
     # -------------------------
-    def lua_execute(self):
-        """Executes a script lua if loaded"""
-        self.init_dicts()
-        try:
-            lua = LuaRuntime(unpack_returned_tuples=True)  # type: ignore
-            app_proxy = AppProxy(self)
-            lua.globals().State = {
-                "NONE": State.NONE,
-                "TESTING": State.TESTING,
-                "ACTIVE": State.ACTIVE,
-                "INVALID": State.INVALID,
-            }
-            lua.globals().app = app_proxy
-            with open(self.script, "r") as file:
-                lua_script = file.read()
-            lua.execute(lua_script)
+    def end_execution(self, ok: bool) -> None:
+        """
+        Shows the result of an execution, called in the main loop
+        when the script thread ends.
+
+        Parameters
+        ----------
+        ok: bool
+            If the script ran without errors.
+        """
+        self.log_buffer.flush()
+        if ok:
             self.save_execution_history()
-        except Exception as e:
-            self.log(str(e), True)
         if self.solved:
             self.canvas.configure(bg=App.COLOR_BG_SOLVED)
         else:
             self.canvas.configure(bg=App.COLOR_BG_FAILED)
         if not self.animation:
             self.draw()
+        if self.trace is not None:
+            self.set_player(TracePlayer(self.graph, self.trace, self.trace.size()))
 
     # -------------------------
-    # Python Execute
+    # Is Animated
     # -------------------------
-    def python_execute(self):
-        """Run a Python script."""
-        self.init_dicts()
-        try:
-            app_proxy = AppProxy(self)
-            exec_globals = {
-                "app": app_proxy,
-                "State": {
-                    "NONE": State.NONE,
-                    "TESTING": State.TESTING,
-                    "ACTIVE": State.ACTIVE,
-                    "INVALID": State.INVALID,
-                },
-            }
-            with open(self.script, "r") as file:
-                python_script = file.read()
-            exec(python_script, exec_globals)
-            self.save_execution_history()
-        except Exception as e:
-            self.log(f"[Python script error] {e}", True)
+    def is_animated(self) -> bool:
+        """
+        Returns if changes of states are drawn as they happen: with
+        animation on, or while a trace is loaded for replay.
+        """
+        return self.animation or self.player is not None
 
-        if self.solved:
-            self.canvas.configure(bg=App.COLOR_BG_SOLVED)
+    # -------------------------
+    # Set Player
+    # -------------------------
+    def set_player(self, player: TracePlayer) -> None:
+        """
+        Loads a trace for replay. The graph can not be edited while a
+        trace is loaded, since the trace refers to its elements.
+        """
+        self.close_replay()
+        self.player = player
+        self.editing = False
+        self.scale_replay.config(to=player.size())
+        if player.position is None:
+            self.seek_replay(0)
         else:
-            self.canvas.configure(bg=App.COLOR_BG_FAILED)
+            self.var_replay.set(player.position)
+            self.show_replay_position()
 
-        if not self.animation:
-            self.draw()
+    # -------------------------
+    # Close Replay
+    # -------------------------
+    def close_replay(self) -> None:
+        """Stops the replay and discards the loaded trace."""
+        self.stop_replay()
+        self.player = None
+        self.var_replay.set(0)
+        self.scale_replay.config(to=0)
 
     # -------------------------
-    # Init Dicts
+    # Seek Replay
     # -------------------------
-    def init_dicts(self):
-        self.clear_dicts()
-        for vertex in self.vertex:
-            self.vertex_dict[vertex.get_id()] = vertex
+    def seek_replay(self, position: int) -> None:
+        """
+        Changes the graph to the states after position events of the
+        loaded trace, and the log to the lines written until then.
+        """
+        old = self.player.seek(position)
+        position = self.player.position
+        if old is None or position < old:
+            self.clear_log()
+            logs = self.player.get_logs(0, position)
+        else:
+            logs = self.player.get_logs(old, position)
+        for text, system_log in logs:
+            if text:
+                # Already written to the log file when recorded
+                self.write_log(text, system_log, sink=False)
+        self.var_replay.set(position)
+        self.show_replay_position()
+
+    # -------------------------
+    # Show Replay Position
+    # -------------------------
+    def show_replay_position(self) -> None:
+        """Shows the position of the replay in the statusbar."""
+        player = self.player
+        self.set_statusbar(
+            f"Replay: event {player.position} of {player.size()}, "
+            f"{player.get_time(player.position):.6f}s"
+        )
 
-        for edge in self.edge:
-            self.edge_dict[edge.get_id()] = edge
+    # -------------------------
+    # On Replay Scrub
+    # -------------------------
+    def on_replay_scrub(self, value) -> None:
+        """When the replay scale is moved, seeks the trace."""
+        if self.player is None or int(value) == self.player.position:
+            return
+        self.seek_replay(int(value))
+        self.replay_position = float(self.player.position)
+
+    # -------------------------
+    # Event Replay
+    # -------------------------
+    def event_replay(self) -> None:
+        """
+        Plays or pauses the replay of the loaded trace. The replay
+        starts again from the beginning if it is at the end.
+        """
+        if self.replay_job is not None:
+            self.stop_replay()
+            return
+        if self.player is None:
+            self.set_statusbar(
+                "No trace to replay. Turn on Record trace and play a script, "
+                "or open a trace file."
+            )
+            return
+        if self.player.position == self.player.size():
+            self.seek_replay(0)
+        self.replay_position = float(self.player.position)
+        self.replay_clock = time.perf_counter()
+        self.bt_replay.config(image=self.icon_pause)
+        self.replay_job = self.after(UIQueue.FRAME_MS, self.replay_frame)
 
     # -------------------------
-    # Clear Dicts
+    # Replay Frame
     # -------------------------
-    def clear_dicts(self):
-        self.vertex_dict.clear()
-        self.edge_dict.clear()
+    def replay_frame(self) -> None:
+        """
+        Advances the replay by the events of a frame, REPLAY_BASE^speed
+        events per second.
+        """
+        now = time.perf_counter()
+        rate = App.REPLAY_BASE ** self.speed
+        self.replay_position += rate * (now - self.replay_clock)
+        self.replay_clock = now
+        self.seek_replay(int(self.replay_position))
+        if self.player.position >= self.player.size():
+            self.replay_job = None
+            self.stop_replay()
+            return
+        self.replay_job = self.after(UIQueue.FRAME_MS, self.replay_frame)
 
     # -------------------------
-    # Get Var
+    # Stop Replay
     # -------------------------
-    def get_var(self, var_name):
-        """Returns a configuration variable to lua script."""
-        if self.script_properties:
-            return self.script_properties.get_attr(var_name)
-        return None
+    def stop_replay(self) -> None:
+        """Pauses the replay, keeping the trace loaded."""
+        if self.replay_job is not None:
+            self.after_cancel(self.replay_job)
+            self.replay_job = None
+        self.bt_replay.config(image=self.icon_play)
+
+    # -------------------------
+    # Seed Execution
+    # -------------------------
+    def seed_execution(self, seed=None) -> None:
+        """
+        Chooses the seed of an execution (see Engine.seed_execution).
+        The seed is taken from the seed field (or command line), then
+        from the "seed" script property. If none of them is set, a new
+        seed is chosen.
+        """
+        if seed is None:
+            text = self.var_seed.get().strip()
+            if text:
+                try:
+                    seed = int(text)
+                except ValueError:
+                    self.log(f"Invalid seed '{text}', choosing a new one.", True)
+                    seed = random.randrange(2**32)
+        super().seed_execution(seed)
 
     # -------------------------
     # Save Execution History
@@ -953,6 +1021,7 @@ class App(tk.Frame):
                                 script,
                                 execution_time,
                                 self.solved,
+                                self.seed,
                             ],
                         )
                     )
@@ -973,58 +1042,26 @@ class App(tk.Frame):
         root.withdraw()  # Hide main window
         messagebox.showerror("Script error", message)
 
-    # -------------------------
-    # Step
-    # -------------------------
-    def step(self) -> None:
-        """
-        This method must be called internally in the lua script
-        at some loop points to perform brief pauses and slow down
-        the algorithm's execution for a more refined observation
-        of how the execution is occurring. The value ranges from
-        0 to 10, with the value 10 having no SLEEP. This value is
-        adjusted in the graphical interface.
-        """
-        while self.paused:
-            time.sleep(0.1)
-        speed = self.get_speed()
-        if speed < 10:
-            t = (self.get_speed_max() - speed) ** 2 / 100
-            time.sleep(t)
-
     # -------------------------
     # Event Stop
     # -------------------------
     def event_stop(self) -> None:
         """Stop the algorithm execution."""
-        self.paused = False
-        self.stopped = True
-
-    # -------------------------
-    # Is Stopped
-    # -------------------------
-    def is_stopped(self):
-        """Returns if algorithm was stopped."""
-        return self.stopped
+        self.stop()
 
     # -------------------------
     # Event Clear
     # -------------------------
     def event_clear(self) -> None:
         """Change state of all edges and vertices of graph to NONE."""
-        self.paused = False
-        self.stopped = True
+        self.stop()
+        self.close_replay()
         self.clear_log()
         self.canvas.configure(bg=App.COLOR_BG)
         self.editing = True
         self.debug = False
-        for v in self.vertex:
-            v.set_state(State.NONE)
-            # v.active_edges = 0
-        for e in self.edge:
-            e.set_state(State.NONE)
         self.canvas.delete("area")
-        self.draw()
+        self.graph.reset_states()
 
     # -------------------------
     # Event Debug
@@ -1076,23 +1113,77 @@ class App(tk.Frame):
             interface those that he wants to be displayed.
         system_log: bool
             If it is a system log.
+
+        The line is kept in the log buffer (and its file, if any) and
+        shown by the main loop, all lines of a frame with a single
+        insert.
         """
         if not text:
             return
+        if self.recorder is not None:
+            self.recorder.log(text, system_log)
+        self.write_log(text, system_log)
+
+    # -------------------------
+    # Write Log
+    # -------------------------
+    def write_log(self, text, system_log: bool, sink: bool = True) -> None:
+        """
+        Writes a log line in the log buffer, if it is a system log or
+        its symbol is one of the Log Symbols (see log()). With sink
+        False, the line is not written to the log file.
+        """
+        if not (system_log or text[0] in self.var_log_symbols):
+            return
         msg = f"{text}\n"
         if not system_log:
             msg = msg[1:]
-        if system_log or text[0] in self.var_log_symbols:
-            self.log_text.config(state="normal")
-            self.log_text.insert(tk.END, msg)
-            self.log_text.yview(tk.END)
-            self.log_text.config(state="disabled")
+        self.log_buffer.write(msg, sink)
+        self.ui.post(self.flush_log, key="log")
+
+    # -------------------------
+    # Log Enabled
+    # -------------------------
+    def log_enabled(self, symbol: str) -> bool:
+        """
+        Returns if log lines of a symbol are shown, i.e. if the symbol
+        is one of the Log Symbols. System logs are always shown. While a
+        trace is recorded, all lines are kept, so the trace has the lines
+        of every symbol (log() still shows only the Log Symbols).
+        """
+        if self.recorder is not None:
+            return True
+        return bool(symbol) and symbol[0] in self.var_log_symbols
+
+    # -------------------------
+    # Flush Log
+    # -------------------------
+    def flush_log(self):
+        """
+        Shows the log lines not shown yet, removing the oldest lines of
+        the widget to keep at most log_max_lines.
+        """
+        lines = self.log_buffer.take()
+        if not lines:
+            return
+        text = "".join(lines)
+        self.log_text.config(state="normal")
+        self.log_text.insert(tk.END, text)
+        self.log_widget_lines += text.count("\n")
+        excess = self.log_widget_lines - self.log_buffer.max_lines
+        if excess > 0:
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self.log_widget_lines -= excess
+        self.log_text.yview(tk.END)
+        self.log_text.config(state="disabled")
 
     # -------------------------
     # Clear Log
     # -------------------------
     def clear_log(self):
         """Clear log graphic field."""
+        self.log_buffer.clear()
+        self.log_widget_lines = 0
         self.log_text.config(state="normal")
         self.log_text.delete("1.0", tk.END)
         self.log_text.config(state="disabled")
@@ -1105,9 +1196,103 @@ class App(tk.Frame):
         mouse position."""
         if not self.editing:
             return
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
-        self.vertex.append(Vertex("", x, y, self))
+        x, y = self.renderer.to_model(
+            self.canvas.canvasx(event.x),
+            self.canvas.canvasy(event.y),
+        )
+        self.graph.add_vertex("", x, y)
+
+    # -------------------------
+    # On Vertex Click
+    # -------------------------
+    def on_vertex_click(self, vertex: Vertex, event: tk.Event) -> None:
+        """Event called when mouse was clicked over a vertex."""
+        if not self.editing:
+            if self.debug:
+                if vertex.state == State.ACTIVE:
+                    vertex.state = State.NONE
+                else:
+                    vertex.state = State.ACTIVE
+                self.draw()
+                return
+            self.set_statusbar(f"Vertex: {vertex.id}")
+            return
+        if self.selected is not None:
+            self.renderer.unselect(self.selected)
+            self.selected = None
+        if self.selected_edge is not None:
+            self.renderer.unselect(self.selected_edge)
+            self.selected_edge = None
+        self.renderer.select(vertex)
+        self.selected = vertex
+        self.set_statusbar(f"Vertex selected: {vertex.id}")
+        self.vertex_id.config(state="normal")
+        self.vertex_id.delete(0, tk.END)
+        self.vertex_id.insert(0, vertex.id)
+        self.vertex_id.config(state="readonly")
+        self.vertex_name.delete(0, tk.END)
+        self.vertex_name.insert(0, vertex.name)
+        self.show_config_frame(self.vertex_config_frame)
+
+    # -------------------------
+    # On Vertex Drag
+    # -------------------------
+    def on_vertex_drag(self, vertex: Vertex, event: tk.Event) -> None:
+        """Event called when you are moving a vertex to other position."""
+        if not self.editing:
+            return
+        x, y = self.renderer.to_model(
+            self.canvas.canvasx(event.x),
+            self.canvas.canvasy(event.y),
+        )
+        self.graph.move_vertex(vertex, x, y)
+
+    # -------------------------
+    # On Vertex Connect
+    # -------------------------
+    def on_vertex_connect(self, vertex: Vertex, event: tk.Event) -> None:
+        """
+        When a vertex is selected and you click with Mouse Button-3
+        in other vertex, you create a connection between the selected
+        vertex and the other, represented by a new edge object.
+        """
+        selected = self.selected
+        if selected is None or selected == vertex:
+            return
+        if selected.type == self.VERTEX and not vertex.is_connected(selected):
+            self.graph.add_edge(selected, vertex, 1)
+
+    # -------------------------
+    # On Edge Click
+    # -------------------------
+    def on_edge_click(self, edge: Edge, event: tk.Event) -> None:
+        """Event called when mouse was clicked over an edge."""
+        if not self.editing:
+            if self.debug:
+                if edge.state == State.ACTIVE:
+                    edge.state = State.NONE
+                else:
+                    edge.state = State.ACTIVE
+                self.draw()
+                return
+            self.set_statusbar("Edge: " + str(edge.id))
+            return
+        if self.selected_edge is not None:
+            self.renderer.unselect(self.selected_edge)
+            self.selected_edge = None
+        if self.selected is not None:
+            self.renderer.unselect(self.selected)
+            self.selected = None
+        self.renderer.select(edge)
+        self.selected_edge = edge
+        self.set_statusbar("Edge selected: " + str(edge.id))
+        self.edge_id.config(state="normal")
+        self.edge_id.delete(0, tk.END)
+        self.edge_id.insert(0, edge.id)
+        self.edge_id.config(state="readonly")
+        self.edge_weight.delete(0, tk.END)
+        self.edge_weight.insert(0, edge.weight)
+        self.show_config_frame(self.edge_config_frame)
 
     # -------------------------
     # Delete Canvas Object
@@ -1117,10 +1302,10 @@ class App(tk.Frame):
         if not self.editing:
             return
         if self.selected is not None:
-            self.selected.delete()
+            self.graph.remove_vertex(self.selected)
             self.selected = None
         if self.selected_edge is not None:
-            self.selected_edge.delete()
+            self.graph.remove_edge(self.selected_edge)
             self.selected_edge = None
 
     # -------------------------
@@ -1130,78 +1315,145 @@ class App(tk.Frame):
         """Open the about window."""
         tk.messagebox.askquestion("About", "Hamiltonian Cycle", icon="info")
 
-     # -------------------------
-    # Get Graph
-    # -------------------------
-    def get_graph(self) -> str:
-        # 1. Mapeia ID antigo -> Novo ID (0, 1, 2...)
-        v_map = {v.id: i for i, v in enumerate(self.vertex)}
-
-        # 2. Gera a lista de JSON de vértices com IDs novos
-        vertex_json: list[dict] = []
-        for i, v in enumerate(self.vertex):
-            v_data = v.get_json()
-            v_data["id"] = i  # Reindexa apenas aqui no dicionário temporário
-            vertex_json.append(v_data)
-
-        # 3. Gera a lista de JSON de arestas traduzindo as conexões
-        edge_json: list[dict] = []
-        for i, e in enumerate(self.edge):
-            e_data = e.get_json()
-            e_data["id"] = i
-            # Traduzimos a referência usando o mapa, mas sem alterar e.a original
-            e_data["a"] = v_map[e.a.id]
-            e_data["b"] = v_map[e.b.id]
-            edge_json.append(e_data)
-
-        self.log(f"$bidirectional {self.bidirectional} (reindexed for benchmark)")
-
-        obj = {
-            "bidirectional": self.bidirectional,
-            "vertex": vertex_json,
-            "edge": edge_json,
-        }
-        return json.dumps(obj)
-
     # -------------------------
     # Save Graph File Dialog
     # -------------------------
     def save_graph_file_dialog(self) -> None:
-        """Save graph file dialog"""
-        path = asksaveasfile(
+        """
+        Save graph file dialog. The graph is copied on the main thread
+        and written by a worker thread, in a single pass, so saving a
+        big graph does not freeze the interface. Big graphs are written
+        with one record per line.
+        """
+        filename = asksaveasfilename(
             initialfile=self.filename,
             defaultextension=".json",
-            filetypes=[("json files", "*.json")],
+            filetypes=[
+                ("json files", "*.json"),
+                ("binary graph files", "*.grb"),
+            ],
         )
-        if path is None:
+        if not filename:
             return
+        self.log(
+            f"$bidirectional {self.graph.bidirectional} "
+            "(reindexed for benchmark)"
+        )
+        data = self.graph.get_json()
+        size = len(data["vertex"]) + len(data["edge"])
+        compact = size > App.COMPACT_SAVE_SIZE
+        name = os.path.basename(filename)
+        self.set_statusbar(f"Saving {name}...")
+        result = {}
+        start = time.perf_counter()
+
+        def _save():
+            try:
+                save_graph_data(data, filename, compact)
+            except Exception as e:
+                result["error"] = e
+
+        worker = Thread(target=_save)
+        worker.daemon = True
+        worker.start()
+
+        def _wait():
+            if worker.is_alive():
+                self.after(App.LOAD_POLL_MS, _wait)
+            elif "error" in result:
+                self.set_statusbar(
+                    f"Error trying to save file: {result['error']}"
+                )
+            else:
+                self.filename = filename
+                elapsed = time.perf_counter() - start
+                self.set_statusbar(f"{filename} saved in {elapsed:.3f}s")
 
-        graph_data = self.get_graph()
-        try:
-            graph_object = json.loads(graph_data)
-            with open(path.name, "w") as f:
-                json.dump(graph_object, f, indent=4)
-            self.filename = path.name
-            self.set_statusbar(self.filename)
-        except json.JSONDecodeError as e:
-            self.set_statusbar(f"Error trying to save file: {e}")
+        self.after(App.LOAD_POLL_MS, _wait)
 
     # -------------------------
     # Save Log File
     # -------------------------
     def save_log_file(self) -> None:
-        """Save a log file"""
+        """
+        Save a log file. It is a copy of the log file of settings, if
+        there is one, with all lines. Otherwise the lines kept in memory
+        (the last log_max_lines) are saved.
+        """
         filename: str = os.path.basename(self.filename)
         filename = os.path.splitext(filename)[0] + ".log"
-        path = asksaveasfile(
+        filename = asksaveasfilename(
             initialfile=filename,
-            defaultextension=".json",
+            defaultextension=".log",
             filetypes=[("log files", "*.log")],
         )
-        if path is None:
+        if not filename:
+            return
+        sink = self.log_buffer.filename
+        try:
+            if sink:
+                self.log_buffer.flush()
+                if not (
+                    os.path.exists(filename) and os.path.samefile(sink, filename)
+                ):
+                    shutil.copyfile(sink, filename)
+            else:
+                with open(filename, "w", encoding="utf-8") as f:
+                    f.write(self.log_buffer.get_text())
+        except OSError as e:
+            self.set_statusbar(f"Error trying to save log: {e}")
+            return
+        self.set_statusbar(f"{filename} saved")
+
+    # -------------------------
+    # Save Trace File
+    # -------------------------
+    def save_trace_file(self) -> None:
+        """Save the loaded trace in a file, to be replayed later."""
+        if self.player is None:
+            self.set_statusbar("No trace to save. Turn on Record trace.")
+            return
+        filename = os.path.basename(self.filename)
+        filename = os.path.splitext(filename)[0] + ".trace"
+        filename = asksaveasfilename(
+            initialfile=filename,
+            defaultextension=".trace",
+            filetypes=[("trace files", "*.trace")],
+        )
+        if not filename:
+            return
+        try:
+            self.player.trace.save(filename)
+        except OSError as e:
+            self.set_statusbar(f"Error trying to save trace: {e}")
+            return
+        self.set_statusbar(f"{filename} saved")
+
+    # -------------------------
+    # Open Trace File
+    # -------------------------
+    def open_trace_file(self) -> None:
+        """
+        Open a trace file to replay it on the current graph, which must
+        be the graph where the trace was recorded.
+        """
+        if self.loading:
+            self.set_statusbar("Wait until the graph is loaded.")
+            return
+        filename = askopenfilename(
+            title="Open a trace file",
+            filetypes=[("trace files", "*.trace")],
+        )
+        if not filename:
+            return
+        self.event_clear()
+        try:
+            player = TracePlayer(self.graph, Trace.load(filename))
+        except (OSError, ValueError) as e:
+            self.show_error_alert(f"Error opening trace: {e}")
             return
-        with open(path.name, "w") as f:
-            f.write(self.log_text.get("1.0", "end"))
+        self.canvas.configure(bg=App.COLOR_BG_RUNNING)
+        self.set_player(player)
 
     # -------------------------
     # Open Graph File Dialog
@@ -1212,14 +1464,16 @@ class App(tk.Frame):
         filename = askopenfilename(
             title="Open a graph file",
             initialdir="graphs",
-            filetypes=[("json files", "*.json")],
+            filetypes=[
+                ("Graph files", "*.json *.grb"),
+                ("json files", "*.json"),
+                ("binary graph files", "*.grb"),
+            ],
         )
         if filename != "":
             self.reset_canvas()
             self.set_statusbar(filename)
             self.load_graph_file(filename)
-            name = os.path.splitext(os.path.basename(self.filename))[0]
-            self.graph_label.config(text=name)
 
     # -------------------------
     # Open Script File Dialog
@@ -1256,6 +1510,9 @@ class App(tk.Frame):
                 self.script_properties = Properties(
                     self.script_properties_frame, self.script
                 )
+                self.script_cache.warm(
+                    self.script, select_lua_runtime(self.get_lua_runtime())[0]
+                )
             else:
                 print("Error: File not found.")
         else:
@@ -1266,56 +1523,120 @@ class App(tk.Frame):
     # -------------------------
     def load_graph_file(self, filename) -> None:
         """
-        Load a graph file.
+        Load a graph file. The file is parsed and the graph model is
+        built by a worker thread, then the canvas is populated in
+        batches, so the interface does not freeze on big graphs.
+        Loading another file cancels a load in progress.
 
         Parameters
         ----------
         filename: str
-            Name and path of graph file in format JSON.
+            Name and path of graph file in format JSON or binary.
         """
-        try:
-            self.filename = filename
-            f = open(filename)
-            data = json.load(f)
-            f.close()
-            self.canvas.delete("all")
-            self.bidirectional = data.get("bidirectional", True)
-            self.var_bidirectional.set(self.bidirectional)
-            for v in data["vertex"]:
-                self.vertex.append(
-                    Vertex(v.get("name", ""), v["x"], v["y"], self, v["id"])
-                )
-            for e in data["edge"]:
-                a = None
-                b = None
-                for v in self.vertex:
-                    if e["a"] == v.id:
-                        a = v
-                    if e["b"] == v.id:
-                        b = v
-                    if a is not None and b is not None:
-                        break
-                weight = e.get("weight", 1)
-                edge = Edge(a, b, weight, self, id=e["id"])
-                self.edge.append(edge)
-                a.edge.append(edge)
-                b.edge.append(edge)
-                a.neighbor[b.get_id()] = edge
-                b.neighbor[a.get_id()] = edge
-            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
-
-            for v in self.vertex:
-                v.shuffle_edges()
-
-            name = os.path.splitext(os.path.basename(self.filename))[0]
-            self.master.title(f"{self.title} : {name}")
-            self.graph_label.config(text=name)
-        except Exception as e:
-            messagebox.showinfo(
-                "Alert", f"File {filename} is corrupted or invalid. {e}"
+        self.cancel_loading()
+        self.loading = True
+        self.loading_id += 1
+        self.filename = filename
+        name = os.path.splitext(os.path.basename(filename))[0]
+        self.graph_label.config(text=name)
+        self.set_statusbar(f"Loading {name}...")
+        result = {}
+        start = time.perf_counter()
+
+        def _load():
+            try:
+                graph = GraphModel()
+                graph.load_file(filename)
+                result["graph"] = graph
+            except Exception as e:
+                result["error"] = e
+
+        worker = Thread(target=_load)
+        worker.daemon = True
+        worker.start()
+        self.after(
+            App.LOAD_POLL_MS,
+            self.wait_graph_load,
+            worker,
+            result,
+            self.loading_id,
+            start,
+        )
+
+    # -------------------------
+    # Wait Graph Load
+    # -------------------------
+    def wait_graph_load(self, worker, result, loading_id, start) -> None:
+        """
+        Waits, without blocking the main loop, the worker thread that
+        loads a graph file, and then draws the loaded graph.
+        """
+        if loading_id != self.loading_id:
+            return  # Cancelled by other load
+        if worker.is_alive():
+            self.after(
+                App.LOAD_POLL_MS,
+                self.wait_graph_load,
+                worker,
+                result,
+                loading_id,
+                start,
             )
+            return
+        filename = self.filename
+        if "error" in result:
+            self.loading = False
             self.filename = ""
+            self.graph_label.config(text="Click here.")
             self.set_statusbar("")
+            messagebox.showinfo(
+                "Alert",
+                f"File {filename} is corrupted or invalid. {result['error']}",
+            )
+            return
+        parse_time = time.perf_counter() - start
+        graph = result["graph"]
+        self.set_graph(graph)
+        self.var_bidirectional.set(graph.bidirectional)
+        name = os.path.splitext(os.path.basename(filename))[0]
+        self.master.title(f"{self.title} : {name}")
+
+        def _progress(created, total):
+            self.set_statusbar(
+                f"Drawing {name}: {100 * created // total}% "
+                f"({created} of {total} items)"
+            )
+
+        def _done():
+            self.loading = False
+            self.set_statusbar(
+                f"{name}: {graph.get_vertex_size()} vertices, "
+                f"{graph.get_edge_size()} edges loaded in {parse_time:.3f}s, "
+                f"drawn in {time.perf_counter() - start - parse_time:.3f}s"
+            )
+
+        self.renderer.rebuild(on_progress=_progress, on_done=_done)
+
+    # -------------------------
+    # Cancel Loading
+    # -------------------------
+    def cancel_loading(self) -> None:
+        """Cancels a graph load in progress, if any."""
+        self.loading_id += 1
+        self.loading = False
+        self.renderer.cancel_rebuild()
+
+    # -------------------------
+    # Set Graph
+    # -------------------------
+    def set_graph(self, graph: GraphModel) -> None:
+        """Replaces the current graph of application."""
+        self.selected = None
+        self.selected_edge = None
+        self.adjacency = None
+        self.close_replay()
+        self.graph = graph
+        self.renderer.set_graph(graph)
 
     # -------------------------
     # Save Configuration
@@ -1328,6 +1649,10 @@ class App(tk.Frame):
             "speed": self.var_speed.get(),
             "logs_symbols": self.var_logs_field.get(),
             "execution_time_log": self.var_execution_time_log.get(),
+            "record_trace": self.var_record_trace.get(),
+            "log_max_lines": self.log_max_lines,
+            "log_file": self.log_file,
+            "lua_runtime": self.lua_runtime,
         }
         with open(self.config_file, "w") as f:
             json.dump(config, f, indent=4)
@@ -1349,28 +1674,34 @@ class App(tk.Frame):
                     j.get("execution_time_log", False),
                 )
                 self.execution_time_log = self.var_execution_time_log.get()
+                self.var_record_trace.set(j.get("record_trace", False))
+                self.record_trace = self.var_record_trace.get()
                 self.var_log_symbols = j.get("logs_symbols", "")
+                self.log_max_lines = j.get("log_max_lines", LogBuffer.MAX_LINES)
+                self.log_file = j.get("log_file", "")
+                self.lua_runtime = j.get("lua_runtime", "")
         else:
-            self.bidirectional = True
             self.show_weight = True
             self.animation = True
             self.speed = 10
             self.execution_time_log = False
+            self.record_trace = False
             self.var_log_symbols = ""
+            self.log_max_lines = LogBuffer.MAX_LINES
+            self.log_file = ""
+            self.lua_runtime = ""
 
     # -------------------------
     # Reset Canvas
     # -------------------------
     def reset_canvas(self) -> None:
         """Reset canvas to create a new graph."""
-        self.clear_dicts()
         self.clear_log()
         self.event_clear()
         self.filename = ""
         self.master.title(f"{self.title}")
-        self.vertex.clear()
-        Vertex.id = 0
-        self.edge.clear()
-        Edge.id = 0
-        self.canvas.delete("all")
+        self.selected = None
+        self.selected_edge = None
+        self.cancel_loading()
+        self.graph.clear()
         self.graph_label.config(text="Click here.")
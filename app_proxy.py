@@ -1,13 +1,52 @@
-from vertex_proxy import VertexProxy
+from adjacency import LuaAdjacency
+from vertex_proxy import VertexProxy, LuaVertexProxy
+from edge_proxy import EdgeProxy, LuaEdgeProxy
+
+
+def _values(items):
+    """Returns the values of a Lua table, or the items of a Python list."""
+    if hasattr(items, "values"):
+        return list(items.values())
+    return items
 
 
 class AppProxy:
+    """
+    Interface of the application for scripts. An instance is created
+    for each execution, with a single proxy for each vertex and edge,
+    so proxies can be compared by identity and used as keys of tables.
+    Indices are 0-based, as in Python (see LuaAppProxy).
+    """
+
+    VertexProxy = VertexProxy
+    EdgeProxy = EdgeProxy
+
     def __init__(self, app):
         self._app = app
+        graph = app.graph
+        self._vertices = [self.VertexProxy(self, v) for v in graph.vertex]
+        self._edges = [self.EdgeProxy(self, e) for e in graph.edge]
+
+    def vertex_proxy(self, vertex):
+        if vertex is None:
+            return None
+        return self._vertices[vertex.index]
+
+    def edge_proxy(self, edge):
+        if edge is None:
+            return None
+        return self._edges[edge.index]
 
     def log(self, text):
         self._app.log(text)
 
+    def log_enabled(self, symbol):
+        return self._app.log_enabled(symbol)
+
+    def logf(self, symbol, fmt, *args):
+        if self._app.log_enabled(symbol):
+            self._app.log(symbol + fmt % args)
+
     def area_add(self, x, y):
         self._app.area_add(x, y)
 
@@ -26,22 +65,122 @@ class AppProxy:
     def get_vertex_size(self):
         return self._app.get_vertex_size()
 
+    def get_edge_size(self):
+        return self._app.get_edge_size()
+
     def get_var(self, var_name):
         return self._app.get_var(var_name)
 
     def step(self):
         self._app.step()
 
+    def random(self, m=None, n=None):
+        return self._app.random(m, n)
+
     def get_vertex(self, index):
-        from state import ScriptType
+        return self.vertex_proxy(self._app.get_vertex(index))
+
+    def get_vertex_by_index(self, index):
+        return self.vertex_proxy(self._app.get_vertex(index))
+
+    def get_edge_by_index(self, index):
+        return self.edge_proxy(self._app.get_edge(index))
 
-        aux = 0
-        if self._app.script_type == ScriptType.LUA:
-            aux = 1
-        return VertexProxy(self._app, self._app.get_vertex(index - aux))
-    
     def get_vertex_by_id(self, vertex_id):
-        vertex = self._app.get_vertex_by_id(vertex_id)
-        if vertex is None:
-            return None
-        return VertexProxy(self._app, self._app.get_vertex_by_id(vertex_id))
+        return self.vertex_proxy(self._app.get_vertex_by_id(vertex_id))
+
+    def get_edge_by_id(self, edge_id):
+        return self.edge_proxy(self._app.get_edge_by_id(edge_id))
+
+    def get_adjacency(self):
+        return self._app.get_adjacency()
+
+    def set_vertex_states(self, ids, state):
+        self._app.set_vertex_states(_values(ids), state)
+
+    def set_edge_states(self, ids, state):
+        self._app.set_edge_states(_values(ids), state)
+
+    def reset_states(self, state_filter=None):
+        if state_filter is not None and not isinstance(state_filter, int):
+            state_filter = _values(state_filter)
+        self._app.reset_states(state_filter)
+
+
+class LuaAppProxy(AppProxy):
+    """
+    Interface of the application for Lua scripts, with 1-based indices.
+
+    The proxy belongs to a single Lua runtime (LuaState), used by a
+    single execution, and is thrown away with it by LuaState.close().
+    Within the execution, a Lua table keeps a reference to every proxy,
+    so lupa does not wrap a proxy again each time its wrapper is
+    collected by Lua. No wrapper outlives its runtime, so nothing
+    depends on when lupa runs their finalizers.
+    """
+
+    VertexProxy = LuaVertexProxy
+    EdgeProxy = LuaEdgeProxy
+
+    def __init__(self, app, lua_state):
+        """
+        Raises
+        ------
+        ValueError
+            If the runtime was already given to another proxy.
+        """
+        if lua_state.proxy is not None or lua_state.lua is None:
+            raise ValueError("Lua runtime already used by an execution.")
+        super().__init__(app)
+        lua = lua_state.lua
+        lua_state.proxy = self
+        self._lua = lua
+        self._lua_references = lua.table_from(self._vertices + self._edges)
+        self._pairs = lua.eval(
+            "function(t)"
+            "  local i = -1"
+            "  return function() i = i + 2 return t[i], t[i + 1] end "
+            "end"
+        )
+        self._format = lua.eval("string.format")
+
+    def release(self):
+        """
+        Drops the Lua objects of this proxy, when its runtime is closed.
+        They reference the proxies back, so the cycle is broken here.
+        """
+        self._lua = None
+        self._lua_references = None
+        self._pairs = None
+        self._format = None
+
+    def logf(self, symbol, fmt, *args):
+        """Formats the log line with Lua string.format()."""
+        if self._app.log_enabled(symbol):
+            self._app.log(symbol + self._format(fmt, *args))
+
+    def iterate_pairs(self, items):
+        """Returns a Lua iterator over the pairs of a flat list."""
+        return self._pairs(self._lua.table_from(items))
+
+    def apply_states(self, vertices, edges):
+        """
+        Applies the state changes of the Lua mirror of the graph (see
+        lua_mirror.py). Both are Lua tables of lists of IDs by state.
+        """
+        for state, ids in edges.items():
+            self._app.set_edge_states(ids.values(), state)
+        for state, ids in vertices.items():
+            self._app.set_vertex_states(ids.values(), state)
+
+    def get_vertex(self, index):
+        return self.vertex_proxy(self._app.get_vertex(index - 1))
+
+    def get_vertex_by_index(self, index):
+        return self.vertex_proxy(self._app.get_vertex(index - 1))
+
+    def get_edge_by_index(self, index):
+        return self.edge_proxy(self._app.get_edge(index - 1))
+
+    def get_adjacency(self):
+        return LuaAdjacency(self._app.get_adjacency())
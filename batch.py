@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Batch runner of Grafuria.
+
+Runs every combination of scripts, graphs, seeds and script property
+overrides in parallel, with the headless engine (see main.py), one job
+per process of a pool. Results are printed as they finish, one JSON
+object per line, and a consolidated report is written at the end.
+
+Usage:
+    python3 batch.py script=scripts/dfs.py graph=graphs/*.json seeds=1-10
+    python3 batch.py script=scripts/nemertea/nemertea.py graph=graphs/cube.json
+        props='{"deep": 5}' props='{"deep": 7}' timeout=60 workers=4
+
+Note:
+    - 'script' and 'graph' may be repeated and accept wildcards.
+    - 'seeds' is a list of seeds and ranges, e.g. 1-10,20 (optional). Without
+      it, each job takes the seed of the script properties or a new one.
+    - 'props' is a JSON object with script properties that replace those of
+      the script JSON file. Each 'props' is another set of jobs (optional).
+    - 'timeout' is the limit of seconds of each job (optional).
+    - 'workers' is the number of processes, the number of CPUs by default.
+    - 'report' is the report file, "batch_report.json" by default.
+
+The exit status is 0 if every job solved the graph, 1 if some did not and
+2 if some failed or timed out.
+"""
+
+import sys
+import os
+import glob
+import json
+import time
+import signal
+import queue as queue_module
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from engine import Engine
+from main import time_summary
+
+HARD_TIMEOUT_GRACE = 5  # Seconds until the pool is restarted after a timeout
+USAGE = (
+    "Usage: python3 batch.py script=... graph=... [seeds=1-10,20] "
+    "[props=JSON] [timeout=SECONDS] [workers=N] [report=FILE]"
+)
+
+_engine = None  # Engine of the worker process, reused by its jobs
+_graph_file = ""  # Graph loaded in the engine of the worker process
+_pid_queue = None  # Queue where the worker process reports its jobs
+
+
+# -------------------------
+# Job Timeout
+# -------------------------
+class JobTimeout(Exception):
+    """Raised in a worker when its job exceeds the timeout."""
+
+
+# -------------------------
+# Make Jobs
+# -------------------------
+def make_jobs(scripts, graphs, seeds=None, props=None, timeout=None):
+    """
+    Returns the jobs of every combination of scripts, graphs, seeds and
+    property overrides. Jobs of the same graph are kept together, so a
+    worker can reuse the graph loaded by its last job.
+
+    Parameters
+    ----------
+    scripts, graphs: list[str]
+        Paths and file names of the scripts and graphs.
+    seeds: list[int]
+        Seeds of executions. None runs each combination once, with the
+        seed of the script properties or a new one.
+    props: list[dict]
+        Sets of script properties overrides. None runs without them.
+    timeout: float
+        Limit of seconds of each job, None to run without limit.
+
+    Returns
+    -------
+    list[dict]
+        The jobs.
+    """
+    return [
+        {
+            "script": script,
+            "graph": graph,
+            "seed": seed,
+            "props": overrides,
+            "timeout": timeout,
+        }
+        for graph in graphs
+        for script in scripts
+        for overrides in (props or [None])
+        for seed in (seeds or [None])
+    ]
+
+
+# -------------------------
+# Init Worker
+# -------------------------
+def init_worker(pid_queue) -> None:
+    """Initializes a worker process with the queue to report its jobs."""
+    global _pid_queue
+    _pid_queue = pid_queue
+
+
+# -------------------------
+# Run Job
+# -------------------------
+def run_job(job: dict, token=None) -> dict:
+    """
+    Executes a job in a worker process. If the job has a timeout, the
+    execution is stopped by a timer (on systems with SIGALRM): scripts
+    that check app:is_stopped() end by themselves, the others are
+    interrupted at the next call to the application.
+
+    Parameters
+    ----------
+    job: dict
+        Job made by make_jobs().
+    token: int
+        Key of the job in the batch. If given, the worker reports
+        (token, process id) when the job starts, so the batch can kill
+        the process of a job that does not end.
+
+    Returns
+    -------
+    dict
+        The job with its results.
+    """
+    global _engine, _graph_file
+    if token is not None and _pid_queue is not None:
+        _pid_queue.put((token, os.getpid()))
+    if _engine is None:
+        _engine = Engine()
+    engine = _engine
+    result = dict(job)
+    try:
+        if _graph_file != job["graph"]:
+            _graph_file = ""
+            engine.load_graph(job["graph"])
+            _graph_file = job["graph"]
+        engine.load_script(job["script"], job["props"])
+        engine.graph.reset_states()
+        engine.start_execution(job["seed"])
+    except Exception as e:
+        result.update(status="error", error=str(e))
+        return result
+
+    def on_timeout(signum, frame):
+        engine.stop()
+        raise JobTimeout()
+
+    timer = job["timeout"] and hasattr(signal, "setitimer")
+    if timer:
+        signal.signal(signal.SIGALRM, on_timeout)
+        signal.setitimer(signal.ITIMER_REAL, job["timeout"])
+    start = time.perf_counter()
+    try:
+        ok = engine.execute()
+    except JobTimeout:
+        ok = False
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    wall_time = time.perf_counter() - start
+    if job["timeout"] and wall_time >= job["timeout"]:
+        status = "timeout"
+    elif not ok:
+        status = "error"
+    else:
+        status = "solved" if engine.solved else "unsolved"
+    result.update(
+        status=status,
+        seed=engine.seed,
+        solved=bool(engine.solved),
+        execution_time=engine.execution_time,
+        wall_time=wall_time,
+        path_size=engine.get_path_size(),
+        log=engine.logs,
+    )
+    return result
+
+
+# -------------------------
+# Terminate Pool
+# -------------------------
+def terminate_pool(executor: ProcessPoolExecutor, pids) -> None:
+    """
+    Shuts down a pool without waiting for its jobs, cancelling those
+    not started and killing the processes of those running, so a job
+    stuck in a loop that never calls the application (e.g. pure Lua)
+    does not hold the batch. Idle workers end by the shutdown.
+
+    Parameters
+    ----------
+    executor: ProcessPoolExecutor
+        The pool.
+    pids: iterable[int]
+        Process ids reported by the running jobs (see run_job()).
+    """
+    executor.shutdown(wait=False, cancel_futures=True)
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except OSError:
+            pass  # The job ended meanwhile
+
+
+# -------------------------
+# Run Batch
+# -------------------------
+def run_batch(jobs, workers=None, on_result=None):
+    """
+    Runs the jobs in a process pool. No more jobs than workers are
+    submitted at a time, so the time of a job is counted from its
+    submission. A job that exceeds its timeout by HARD_TIMEOUT_GRACE
+    seconds is reported as timed out and the pool is restarted; the
+    other jobs that were running are submitted again.
+
+    Parameters
+    ----------
+    jobs: list[dict]
+        Jobs made by make_jobs().
+    workers: int
+        Number of processes, the number of CPUs if None.
+    on_result: callable
+        Called with each result, as soon as its job finishes.
+
+    Returns
+    -------
+    list[dict]
+        The results, in the order that jobs finished.
+    """
+    workers = workers or os.cpu_count() or 1
+    queue = list(reversed(jobs))
+    results = []
+    running = {}  # future: (job, submission time, token)
+    pids = {}  # token: process id reported by the job
+    tokens = iter(range(sys.maxsize))
+    pid_queue = multiprocessing.Queue()
+
+    def new_pool():
+        return ProcessPoolExecutor(
+            max_workers=workers, initializer=init_worker, initargs=(pid_queue,)
+        )
+
+    def running_pids():
+        while True:
+            try:
+                token, pid = pid_queue.get_nowait()
+            except queue_module.Empty:
+                break
+            pids[token] = pid
+        return [pids[t] for _, _, t in running.values() if t in pids]
+
+    def finish(result):
+        results.append(result)
+        if on_result:
+            on_result(result)
+
+    executor = new_pool()
+    try:
+        while queue or running:
+            while queue and len(running) < workers:
+                job = queue.pop()
+                token = next(tokens)
+                future = executor.submit(run_job, job, token)
+                running[future] = (job, time.monotonic(), token)
+            done, _ = wait(running, timeout=1, return_when=FIRST_COMPLETED)
+            for future in done:
+                job, _, token = running.pop(future)
+                pids.pop(token, None)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = dict(job, status="error", error=str(e))
+                finish(result)
+            now = time.monotonic()
+            expired = [
+                future
+                for future, (job, submitted, _) in running.items()
+                if job["timeout"]
+                and now - submitted > job["timeout"] + HARD_TIMEOUT_GRACE
+            ]
+            if expired:
+                terminate_pool(executor, running_pids())
+                for future in expired:
+                    job, submitted, _ = running.pop(future)
+                    finish(dict(job, status="timeout", wall_time=now - submitted))
+                queue.extend(job for job, _, _ in running.values())
+                running.clear()
+                pids.clear()
+                executor = new_pool()
+    except BaseException:
+        terminate_pool(executor, running_pids())
+        raise
+    executor.shutdown()
+    pid_queue.close()
+    return results
+
+
+# -------------------------
+# Make Report
+# -------------------------
+def make_report(results) -> dict:
+    """
+    Returns the consolidated report of a batch: the results of all
+    jobs and a summary for each script, graph and property overrides.
+    """
+    groups = {}
+    for result in results:
+        key = (result["script"], result["graph"], json.dumps(result["props"]))
+        groups.setdefault(key, []).append(result)
+    summary = []
+    for (script, graph, props), group in sorted(groups.items()):
+        finished = [r for r in group if "wall_time" in r]
+        statuses = {}
+        for r in group:
+            statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+        item = {
+            "script": script,
+            "graph": graph,
+            "props": json.loads(props),
+            "jobs": len(group),
+            "status": statuses,
+        }
+        if finished:
+            item["wall_time"] = time_summary(r["wall_time"] for r in finished)
+        timed = [r for r in group if r["status"] in ("solved", "unsolved")]
+        if timed:
+            item["execution_time"] = time_summary(
+                r["execution_time"] for r in timed
+            )
+        summary.append(item)
+    return {"summary": summary, "results": results}
+
+
+# -------------------------
+# Parse Seeds
+# -------------------------
+def parse_seeds(text: str):
+    """Returns the seeds of a list like "1-10,20"."""
+    seeds = []
+    for item in text.split(","):
+        if "-" in item.strip()[1:]:
+            first, last = item.rsplit("-", 1)
+            seeds.extend(range(int(first), int(last) + 1))
+        elif item.strip():
+            seeds.append(int(item))
+    return seeds
+
+
+# -------------------------
+# Parse Argument
+# -------------------------
+def parse_argument(arg: str, parse, valid=None, expected=""):
+    """
+    Returns the value of an argument name=value converted by parse.
+    On an invalid value, prints the usage and exits with status 2
+    (error), not 1, which means a job that did not solve the graph.
+
+    Parameters
+    ----------
+    arg: str
+        The argument.
+    parse: callable
+        Converts the value, raising ValueError if it is invalid.
+    valid: callable
+        Returns whether a converted value is valid, None if all are.
+    expected: str
+        Description of valid values, for the error message.
+    """
+    name, value = arg.split("=", 1)
+    try:
+        result = parse(value)
+        if valid is None or valid(result):
+            return result
+    except ValueError:
+        pass
+    print(f"Invalid {name}={value}: {name} must be {expected}.", file=sys.stderr)
+    print(USAGE, file=sys.stderr)
+    sys.exit(2)
+
+
+# -------------------------
+# Main
+# -------------------------
+def main():
+    """Runs the batch described by the arguments (see module docstring)."""
+    scripts = []
+    graphs = []
+    seeds = None
+    props = []
+    timeout = None
+    workers = None
+    report_file = "batch_report.json"
+    for arg in sys.argv[1:]:
+        name, _, value = arg.partition("=")
+        if name == "script":
+            scripts.extend(sorted(glob.glob(value)) or [value])
+        elif name == "graph":
+            graphs.extend(sorted(glob.glob(value)) or [value])
+        elif name == "seeds":
+            seeds = parse_argument(
+                arg, parse_seeds, None, "a list of seeds and ranges, e.g. 1-10,20"
+            )
+        elif name == "props":
+            props.append(
+                parse_argument(
+                    arg, json.loads, lambda p: isinstance(p, dict), "a JSON object"
+                )
+            )
+        elif name == "timeout":
+            timeout = parse_argument(
+                arg, float, lambda t: t > 0, "a positive number of seconds"
+            )
+        elif name == "workers":
+            workers = parse_argument(
+                arg, int, lambda w: w > 0, "a positive integer"
+            )
+        elif name == "report":
+            report_file = value
+        else:
+            print(f"Unknown argument: {arg}", file=sys.stderr)
+            print(USAGE, file=sys.stderr)
+            return 2
+    if not scripts or not graphs:
+        print(USAGE, file=sys.stderr)
+        return 2
+
+    def on_result(result):
+        line = {k: v for k, v in result.items() if k != "log"}
+        print(json.dumps(line), flush=True)
+
+    jobs = make_jobs(scripts, graphs, seeds, props, timeout)
+    results = run_batch(jobs, workers, on_result)
+    with open(report_file, "w") as f:
+        json.dump(make_report(results), f, indent=2)
+    print(f"Report: {report_file}", file=sys.stderr)
+    statuses = {r["status"] for r in results}
+    if statuses & {"error", "timeout"}:
+        return 2
+    if "unsolved" in statuses:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
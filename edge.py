@@ -1,6 +1,5 @@
-import tkinter as tk
 from typing import Dict
-from state import State
+from state import State, ElementType
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -12,8 +11,9 @@ if TYPE_CHECKING:
 # -------------------------
 class Edge:
     """
-    This class represents a Edge on algorithm and it's representation
-    on application to draw on canvas.
+    This class represents a Edge on algorithm. It only holds data,
+    the representation on canvas is done by an observer of the graph
+    (see GraphRenderer).
 
     Attributes
     ----------
@@ -21,18 +21,18 @@ class Edge:
         Identify element type in application.
     id: int
         Edge identification ID.
-    app: App
-        Context of interface application.
-    canvas: tk.Canvas
-        Canvas to draw it element.
+    graph: GraphModel
+        Graph that owns this edge.
     a: Vertex
         First vertex connection.
     b: Vertex
         Second vertex connection.
     weight: float
         Weight of connection between a and b.
-    state: int
-        State of edge while execution.
+    index: int
+        Position of edge in the graph's edge list. The state is
+        stored in a column of the graph at this position (see
+        GraphModel).
     """
 
     id: int = 0  # Element autoincrement identification (static)
@@ -40,7 +40,7 @@ class Edge:
     # -------------------------
     # Edge Constructor
     # -------------------------
-    def __init__(self, a, b, w: float, app, id: int = -1):
+    def __init__(self, a, b, w: float, graph, id: int = -1):
         """
         Constructor to create a edge object. A edge object is aways
         connect with two vertex.
@@ -53,18 +53,17 @@ class Edge:
             Second edge connection.
         w: float
             Weight of connection between a and b.
-        app: App
-            Context of graphic application.
+        graph: GraphModel
+            Graph that owns this edge.
         id: int
             Edge id if exists. It's necessary on graph load from disk.
         """
-        self.type: int = app.EDGE  # Identify element type in application
-        self.app = app  # Context of interface application
-        self.canvas: tk.Canvas = app.canvas  # Canvas to draw it
+        self.type: int = ElementType.EDGE  # Identify element type
+        self.graph = graph  # Graph that owns this edge
         self.a = a  # First vertex connection
         self.b = b  # Second vertex connection
         self.weight: float = w  # Connection weight
-        self.state: int = State.NONE  # State of edge while execution
+        self.index: int = -1  # Position of state in the graph columns
         if id == -1:  # Apply an autoincrement id if
             Edge.id = Edge.id + 1  # we not pass id as parameter
             self.id = Edge.id
@@ -72,52 +71,6 @@ class Edge:
             if Edge.id <= id:  # loading a graph file
                 Edge.id = id + 1
             self.id = id
-        # Graphic representation of edge in application
-        if not app.bidirectional:
-            self.canvas_id = self.canvas.create_line(
-                a.x,
-                a.y,
-                b.x,
-                b.y,
-                arrow="last",
-                arrowshape=(
-                    10 * self.app.scale,
-                    10 * self.app.scale,
-                    5 * self.app.scale,
-                ),
-                width=2,
-                fill=self.app.COLOR_NONE,
-                tags="edge",
-            )
-        else:
-            self.canvas_id = self.canvas.create_line(
-                a.x,
-                a.y,
-                b.x,
-                b.y,
-                width=2,
-                fill=self.app.COLOR_NONE,
-                tags="edge",
-            )
-        x_middle = (a.x + b.x) / 2
-        y_middle = (a.y + b.y) / 2
-        self.text_id = self.canvas.create_text(
-            x_middle,
-            y_middle,
-            text=str(self.weight),
-            anchor="center",
-            font=("Arial", 10),
-            fill="black",
-            tags="text",
-        )
-        if not self.app.show_weight:
-            self.canvas.itemconfig(self.text_id, state="hidden")
-
-
-        self.canvas.tag_lower(self.canvas_id)
-        self.canvas.tag_bind(self.canvas_id, "<Button-1>", self.mouse_down)
-        self.canvas.tag_bind(self.canvas_id, "<Any-Enter>", self.mouse_enter)
-        self.canvas.tag_bind(self.canvas_id, "<Any-Leave>", self.mouse_leave)
 
     # -------------------------
     # Get JSON
@@ -144,6 +97,17 @@ class Edge:
         """Returns the edge ID."""
         return self.id
 
+    # -------------------------
+    # Get Index
+    # -------------------------
+    def get_index(self) -> int:
+        """
+        Returns the dense index of edge, its position in the graph's
+        edge list (0 to size - 1). It doesn't change while the graph
+        is not edited, so it is stable during an execution.
+        """
+        return self.index
+
     # -------------------------
     # Get Adjacent
     # -------------------------
@@ -179,6 +143,7 @@ class Edge:
     def set_weight(self, w: float) -> None:
         """Changes the weight of connection between a and b vertices."""
         self.weight = w
+        self.graph.notify_edge_changed(self)
 
     # -------------------------
     # Set Weight
@@ -192,7 +157,10 @@ class Edge:
     # -------------------------
     def get_state(self):
         """Returns the state of this edge."""
-        return self.state
+        graph = self.graph
+        if graph.edge_epoch[self.index] != graph.epoch:
+            return State.NONE
+        return graph.edge_state[self.index]
 
     # -------------------------
     # Set State
@@ -202,159 +170,15 @@ class Edge:
         self.a.change_active_edge(self, state)
         self.b.change_active_edge(self, state)
         self.state = state
-        if self.app.animation:  # draws if animation checkbox is true
-            self.draw()
-
-    # -------------------------
-    # Draw
-    # -------------------------
-    def draw(self) -> None:
-        """
-        Draws the element on the screen. It is important when the
-        state has changed.
-        """
-        if self.state == State.NONE:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_NONE,
-                width=2,
-            )
-        elif self.state == State.TESTING:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_OVER,
-                width=2,
-            )
-        elif self.state == State.ACTIVE:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_SELECTED,
-                width=4,
-            )
-        elif self.state == State.INVALID:
-            self.canvas.itemconfig(
-                self.canvas.id,
-                fill=self.app.COLOR_INVALID,
-                width=2,
-            )
-        if self.app.show_weight:
-            self.canvas.itemconfig(self.text_id, state="normal")
-        else:
-            self.canvas.itemconfig(self.text_id, state="hidden")
-
-    # -------------------------
-    # On Mouse Enter
-    # -------------------------
-    def mouse_enter(self, event: tk.Event) -> None:
-        """
-        Event called when mouse is over edge line, changing the edge color.
-        """
-        selected = self.app.selected_edge
-        if not self.app.editing:
-            return
-        if selected is not None and selected == self:
-            return
-        self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_OVER)
-
-    # -------------------------
-    # On Mouse Leave
-    # -------------------------
-    def mouse_leave(self, event: tk.Event) -> None:
-        """
-        Event called when mouse is out of edge line, changing the edge color.
-        """
-        selected = self.app.selected_edge
-        if not self.app.editing:
-            return
-        if selected is not None and selected == self:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_SELECTED,
-            )
-        else:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_NONE,
-            )
-
-    # -------------------------
-    # On Mouse Down
-    # -------------------------
-    def mouse_down(self, event: tk.Event) -> None:
-        """Event called when mouse was clicked over this edge."""
-        if not self.app.editing:
-            if self.app.debug:
-                if self.state == State.ACTIVE:
-                    self.state = State.NONE
-                else:
-                    self.state = State.ACTIVE
-                self.app.draw()
-                return
-            self.app.set_statusbar("Edge: " + str(self.id))
-            return
-        if self.app.selected_edge is not None:
-            self.app.selected_edge.unselect()
-            self.app.selected_edge = None
-        if self.app.selected is not None:
-            self.app.selected.unselect()
-            self.app.selected = None
-        self.select()
-        self.app.selected_edge = self
-        self.app.set_statusbar("Edge selected: " + str(self.id))
-        self.app.edge_id.config(state="normal")
-        self.app.edge_id.delete(0, tk.END)
-        self.app.edge_id.insert(0, self.id)
-        self.app.edge_id.config(state="readonly")
-        self.app.edge_weight.delete(0, tk.END)
-        self.app.edge_weight.insert(0, self.weight)
-        self.app.show_config_frame(self.app.edge_config_frame)
-
-    # -------------------------
-    # Refresh
-    # -------------------------
-    def refresh(self) -> None:
-        """
-        Changes edge coordinates as vertices are moved around on the canvas.
-        """
-        ax, ay = self.a.get_coords()
-        bx, by = self.b.get_coords()
-        self.canvas.coords(self.canvas_id, ax, ay, bx, by)
-        x_middle = (ax + bx) / 2
-        y_middle = (ay + by) / 2
-        self.canvas.coords(self.text_id, x_middle, y_middle)
-
-    # -------------------------
-    # Select
-    # -------------------------
-    def select(self) -> None:
-        """Set this edge as selected."""
-        self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_SELECTED)
-
-    # -------------------------
-    # Unselect
-    # -------------------------
-    def unselect(self) -> None:
-        """Unselect this edge."""
-        self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_NONE)
-
-    # -------------------------
-    # Delete
-    # -------------------------
-    def delete(self) -> None:
-        """
-        Removes the Edge by also removing its connection to the
-        Vertices to which it is connected.
-        """
-
-        print(f"removing edge {self.id}")
-        if not self.app.editing:
-            return
-        if self not in self.a.edge or self not in self.b.edge:
-            return
-        self.a.edge.remove(self)
-        self.a.neighbor.pop(self.b.get_id(), None)
-        self.b.edge.remove(self)
-        self.b.neighbor.pop(self.a.get_id(), None)
-        self.canvas.delete(str(self.canvas_id))  # Remove line from canvas.
-        self.canvas.delete(str(self.text_id))  # Remove text from canvas.
-        self.app.edge.remove(self)
+        self.graph.notify_edge_state(self)
+
+    @property
+    def state(self) -> int:
+        return self.get_state()
+
+    @state.setter
+    def state(self, state: int) -> None:
+        """Changes the state without notifying the graph observers."""
+        graph = self.graph
+        graph.edge_epoch[self.index] = graph.epoch
+        graph.edge_state[self.index] = state
@@ -1,6 +1,6 @@
 class EdgeProxy:
-    def __init__(self, app, edge):
-        self._app = app
+    def __init__(self, proxies, edge):
+        self._proxies = proxies
         self._edge = edge
 
     def get_type(self):
@@ -12,6 +12,9 @@ class EdgeProxy:
     def get_id(self):
         return self._edge.get_id()
 
+    def get_index(self):
+        return self._edge.index
+
     def set_weight(self, weight):
         self._edge.set_weight(weight)
 
@@ -25,16 +28,18 @@ class EdgeProxy:
         self._edge.set_state(state)
 
     def get_adjacent(self, vertex):
-        from vertex_proxy import VertexProxy
         other = self._edge.get_adjacent(vertex.get_raw_vertex())
-        return VertexProxy(self._app, other)
+        return self._proxies.vertex_proxy(other)
 
     def get_a(self):
-        from vertex_proxy import VertexProxy
-
-        return VertexProxy(self._app, self._edge.get_a())
+        return self._proxies.vertex_proxy(self._edge.get_a())
 
     def get_b(self):
-        from vertex_proxy import VertexProxy
+        return self._proxies.vertex_proxy(self._edge.get_b())
+
+
+class LuaEdgeProxy(EdgeProxy):
+    """Edge proxy with the 1-based indices of Lua."""
 
-        return VertexProxy(self._app, self._edge.get_b())
+    def get_index(self):
+        return self._edge.index + 1
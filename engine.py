@@ -0,0 +1,644 @@
+import os
+import json
+import random
+from threading import Event
+from vertex import Vertex
+from edge import Edge
+from graph_model import GraphModel
+from adjacency import Adjacency
+from state import State, ScriptType
+from app_proxy import AppProxy, LuaAppProxy
+from lua_mirror import create_mirror, MIRROR_FILE
+from script_cache import ScriptCache, select_lua_runtime
+from execution_trace import TraceRecorder
+
+
+# -------------------------
+# Execution Stopped
+# -------------------------
+class ExecutionStopped(BaseException):
+    """
+    Raised by Engine.step() to end a script that was stopped. It is a
+    BaseException, like KeyboardInterrupt, so scripts that catch
+    Exception do not catch it and keep running.
+    """
+
+
+# -------------------------
+# Script Properties Class
+# -------------------------
+class ScriptProperties:
+    """
+    Properties of a script, loaded from the JSON file with the same
+    name of the script, without graphic interface (see Properties).
+
+    Attributes
+    ----------
+    attr: dict
+        The properties loaded from the JSON file.
+    """
+
+    def __init__(self, filename: str, overrides=None):
+        """
+        Parameters
+        ----------
+        filename: str
+            The path and name of the script file.
+        overrides: dict
+            Properties that replace the values of the JSON file.
+        """
+        self.attr = {}
+        json_file = os.path.splitext(filename)[0] + ".json"
+        if os.path.exists(json_file):
+            with open(json_file, "r", encoding="utf-8") as f:
+                self.attr = json.load(f)
+        if overrides:
+            self.attr.update(overrides)
+
+    # -------------------------
+    # Get Attribute
+    # -------------------------
+    def get_attr(self, name):
+        """Returns the value of a property, or None if not exists."""
+        return self.attr.get(name)
+
+
+# -------------------------
+# Engine Class
+# -------------------------
+class Engine:
+    """
+    Executes scripts on a graph, without graphic interface. This is
+    the application seen by scripts (through AppProxy). The graphic
+    interface (App) extends it to draw and slow down the execution,
+    and the command line runs it directly (see main.py --headless).
+
+    Attributes
+    ----------
+    graph: GraphModel
+        Graph of the executions.
+    filename: str
+        Path and file name of the graph.
+    script: str
+        Path and file name of the script.
+    script_properties: ScriptProperties | Properties
+        Properties of the script, with a method get_attr(name).
+    solved: bool
+        If the last execution solved the problem.
+    execution_time: float
+        Execution time informed by the script.
+    seed: int
+        Seed of the last execution.
+    logs: list[str]
+        Log lines of the last execution.
+    record_trace: bool
+        If executions record a trace (see execution_trace).
+    trace: Trace
+        Trace of the last execution, if it was recorded.
+    """
+
+    def __init__(self):
+        self.graph = GraphModel()
+        self.filename = ""
+        self.script = ""
+        self.script_type = ScriptType.NONE
+        self.script_properties = None
+        self.script_cache = ScriptCache()
+        self.lua_runtime = ""  # Lua runtimes from settings
+        self.execution_time = 0
+        self.solved = False
+        self.seed = None
+        self.rng = random.Random()
+        self.adjacency = None
+        self.area = []
+        self.stopped = True
+        self.step_delay = 0  # Seconds of each call to step()
+        self.resumed = Event()  # Cleared while the execution is paused
+        self.resumed.set()
+        self.interrupted = Event()  # Set by stop(), ends waits of step()
+        self.slow_step = False  # If step() waits (delay or pause)
+        self.logs = []
+        self.record_trace = False
+        self.trace = None
+        self.recorder = None  # TraceRecorder of the running execution
+
+    # -------------------------
+    # Load Graph
+    # -------------------------
+    def load_graph(self, filename: str) -> None:
+        """Loads a graph file, in JSON or binary format."""
+        self.graph.clear()
+        self.graph.load_file(filename)
+        self.filename = filename
+
+    # -------------------------
+    # Load Script
+    # -------------------------
+    def load_script(self, filename: str, overrides=None) -> None:
+        """
+        Loads a script and its properties, and prepares its execution.
+
+        Parameters
+        ----------
+        filename: str
+            Path and file name of the script.
+        overrides: dict
+            Properties that replace the values of the script JSON file.
+        """
+        self.script = filename
+        self.script_properties = ScriptProperties(filename, overrides)
+        self.script_cache.warm(
+            self.script, select_lua_runtime(self.get_lua_runtime())[0]
+        )
+
+    # -------------------------
+    # Get Vertex Size
+    # -------------------------
+    def get_vertex_size(self):
+        """Returns how many vertices there are in the graph's vertex list."""
+        return self.graph.get_vertex_size()
+
+    # -------------------------
+    # Get Edge Size
+    # -------------------------
+    def get_edge_size(self):
+        """Returns how many edges there are in the graph's edge list."""
+        return self.graph.get_edge_size()
+
+    # -------------------------
+    # Set Execution Time
+    # -------------------------
+    def set_execution_time(self, time):
+        """Set the execution time of algorithm."""
+        self.execution_time = time
+
+    # -------------------------
+    # Set Solved
+    # -------------------------
+    def set_solved(self, solved):
+        """Inform application if algorithm solved graph or not."""
+        self.solved = solved
+
+    # -------------------------
+    # Get Vertex
+    # -------------------------
+    def get_vertex(self, index):
+        """
+        Returns a specific vertex from graph vertices.
+
+        Parameters
+        ----------
+        index: int
+            Position of vertex on vertex list.
+        """
+        return self.graph.get_vertex(index)
+
+    # -------------------------
+    # Get Edge
+    # -------------------------
+    def get_edge(self, index):
+        """
+        Returns a specific edge from graph edges.
+
+        Parameters
+        ----------
+        index: int
+            Position of edge on edge list.
+        """
+        return self.graph.get_edge(index)
+
+    # -------------------------
+    # Get Vertex By ID
+    # -------------------------
+    def get_vertex_by_id(self, vertex_id) -> Vertex | None:
+        """
+        Returns a vertex by its ID.
+
+        Parameters
+        ----------
+        vertex_id: str
+            ID of the vertex to be retrieved.
+
+        Returns
+        -------
+        Vertex | None
+            The vertex with the specified ID, or None if not found.
+        """
+        return self.graph.get_vertex_by_id(vertex_id)
+
+    # -------------------------
+    # Get Edge By ID
+    # -------------------------
+    def get_edge_by_id(self, edge_id) -> Edge | None:
+        """
+        Returns an edge by its ID.
+
+        Parameters
+        ----------
+        edge_id: int
+            ID of the edge to be retrieved.
+
+        Returns
+        -------
+        Edge | None
+            The edge with the specified ID, or None if not found.
+        """
+        return self.graph.get_edge_by_id(edge_id)
+
+    # -------------------------
+    # Get Adjacency
+    # -------------------------
+    def get_adjacency(self) -> Adjacency:
+        """
+        Returns a read-only CSR snapshot of the graph connections. It
+        is built once per execution, on the first call.
+        """
+        if self.adjacency is None:
+            self.adjacency = Adjacency(self.graph)
+        return self.adjacency
+
+    # -------------------------
+    # Set Vertex States
+    # -------------------------
+    def set_vertex_states(self, ids, state) -> None:
+        """
+        Changes the state of many vertices in one call, drawing them
+        once. IDs not found in the graph are ignored.
+
+        Parameters
+        ----------
+        ids: iterable
+            IDs of vertices.
+        state: int
+            New state.
+        """
+        get = self.graph.vertex_dict.get
+        vertices = [v for v in map(get, ids) if v is not None]
+        self.graph.set_vertex_states(vertices, state)
+
+    # -------------------------
+    # Set Edge States
+    # -------------------------
+    def set_edge_states(self, ids, state) -> None:
+        """
+        Changes the state of many edges in one call, drawing them
+        once. IDs not found in the graph are ignored.
+
+        Parameters
+        ----------
+        ids: iterable
+            IDs of edges.
+        state: int
+            New state.
+        """
+        get = self.graph.edge_dict.get
+        edges = [e for e in map(get, ids) if e is not None]
+        self.graph.set_edge_states(edges, state)
+
+    # -------------------------
+    # Reset States
+    # -------------------------
+    def reset_states(self, state_filter=None) -> None:
+        """
+        Changes the state of vertices and edges to NONE.
+
+        Parameters
+        ----------
+        state_filter: int | iterable
+            Only elements in this state (or in one of these states) are
+            changed. If None, all elements are changed.
+        """
+        if isinstance(state_filter, int):
+            state_filter = [state_filter]
+        self.graph.reset_states(state_filter)
+
+    # -------------------------
+    # Get Path Size
+    # -------------------------
+    def get_path_size(self) -> int:
+        """
+        Returns how many edges are ACTIVE, the size of the path found
+        by path search algorithms.
+        """
+        return sum(1 for e in self.graph.edge if e.get_state() == State.ACTIVE)
+
+    # -------------------------
+    # Area Add
+    # -------------------------
+    def area_add(self, x, y):
+        """
+        Add a new point in a area to create a poligonon.
+
+        Parameters
+        ----------
+        x, y: int
+            Position x, y of new point in area.
+        """
+        self.area.append((x, y))
+
+    # -------------------------
+    # Area Close
+    # -------------------------
+    def area_close(self):
+        """
+        Close the area polygon.
+        """
+        self.area = []
+
+    # -------------------------
+    # Start Execution
+    # -------------------------
+    def start_execution(self, seed=None) -> None:
+        """
+        Prepares a new execution of the script. States of the graph
+        are not changed here.
+
+        Parameters
+        ----------
+        seed: int
+            Seed of the execution (see seed_execution).
+        """
+        self.stopped = False
+        self.interrupted.clear()
+        self.resume()
+        self.solved = False
+        self.execution_time = 0
+        self.adjacency = None
+        self.area = []
+        self.logs = []
+        self.trace = None
+        if self.record_trace:
+            self.recorder = TraceRecorder(self.graph)
+        self.seed_execution(seed)
+
+    # -------------------------
+    # Seed Execution
+    # -------------------------
+    def seed_execution(self, seed=None) -> None:
+        """
+        Chooses the seed of an execution and uses it to shuffle the
+        edges of the graph and to start the random number generator
+        of scripts (see Engine.random), so an execution can be repeated
+        exactly. If the seed is None, it is taken from the "seed"
+        script property. If it is not set, a new seed is chosen.
+        """
+        if seed is None:
+            seed = self.get_var("seed")
+        if not isinstance(seed, int) or isinstance(seed, bool):
+            seed = random.randrange(2**32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.graph.shuffle_edges(self.rng)
+        self.log(f"Seed: {seed}", True)
+
+    # -------------------------
+    # Random
+    # -------------------------
+    def random(self, m=None, n=None):
+        """
+        Returns a random number of the execution generator, with the
+        same arguments of Lua math.random.
+
+        Parameters
+        ----------
+        m, n: int
+            Without arguments, returns a float in [0, 1). With only m,
+            returns an integer in [1, m]. With both, returns an
+            integer in [m, n].
+        """
+        if m is None:
+            return self.rng.random()
+        if n is None:
+            m, n = 1, m
+        return self.rng.randint(int(m), int(n))
+
+    # -------------------------
+    # Execute
+    # -------------------------
+    def execute(self) -> bool:
+        """
+        Executes the script, according to its extension. Errors are
+        written to the log. If a trace is being recorded, it ends here.
+
+        Returns
+        -------
+        bool
+            True if the script ended without errors.
+        """
+        ext = os.path.splitext(self.script)[1].lower()
+        try:
+            if ext == ".lua":
+                self.script_type = ScriptType.LUA
+                return self.lua_execute()
+            elif ext == ".py":
+                self.script_type = ScriptType.PYTHON
+                return self.python_execute()
+            else:
+                self.log(f"Unsupported script extension: {ext}", True)
+        except Exception as e:
+            self.log(f"Error executing script: {e}", True)
+        finally:
+            self.end_trace()
+        return False
+
+    # -------------------------
+    # End Trace
+    # -------------------------
+    def end_trace(self) -> None:
+        """Ends the recording of the trace of the execution, if any."""
+        if self.recorder is None:
+            return
+        self.trace = self.recorder.close()
+        self.recorder = None
+        self.trace.info.update(
+            graph=os.path.basename(self.filename),
+            script=os.path.basename(self.script),
+            seed=self.seed,
+            solved=bool(self.solved),
+            execution_time=self.execution_time,
+        )
+
+    # -------------------------
+    # Lua Execute
+    # -------------------------
+    def lua_execute(self) -> bool:
+        """Executes a script lua if loaded"""
+        name, missing = select_lua_runtime(self.get_lua_runtime())
+        if missing:
+            self.log(f"Lua runtime not available: {', '.join(missing)}", True)
+        lua_state = self.script_cache.acquire_lua(name)
+        self.log(f"Lua runtime: {lua_state.get_implementation()} ({name})", True)
+        lua = lua_state.lua
+        try:
+            app_proxy = LuaAppProxy(self, lua_state)
+            app = app_proxy
+            if self.get_var("lua_mirror"):
+                app = create_mirror(
+                    lua_state.function(MIRROR_FILE), lua, app_proxy, self.graph
+                )
+            lua.globals().app = app
+            try:
+                lua_state.function(self.script)()
+            finally:
+                if app is not app_proxy:
+                    app.flush()
+            return True
+        except ExecutionStopped:
+            self.log("Execution stopped.", True)
+            return False
+        except Exception as e:
+            self.log(str(e), True)
+            return False
+        finally:
+            # Closes the runtime and the proxy with it
+            self.script_cache.release_lua(lua_state)
+
+    # -------------------------
+    # Get Lua Runtime
+    # -------------------------
+    def get_lua_runtime(self) -> str:
+        """
+        Returns the Lua runtimes requested for the script, from the
+        lua_runtime property of the script or else from the settings
+        (see select_lua_runtime()). Empty means the default runtime.
+        """
+        return self.get_var("lua_runtime") or self.lua_runtime
+
+    # -------------------------
+    # Python Execute
+    # -------------------------
+    def python_execute(self) -> bool:
+        """Run a Python script."""
+        try:
+            app_proxy = AppProxy(self)
+            exec_globals = {
+                "app": app_proxy,
+                "State": {
+                    "NONE": State.NONE,
+                    "TESTING": State.TESTING,
+                    "ACTIVE": State.ACTIVE,
+                    "INVALID": State.INVALID,
+                },
+            }
+            exec(self.script_cache.python_code(self.script), exec_globals)
+            return True
+        except ExecutionStopped:
+            self.log("Execution stopped.", True)
+            return False
+        except Exception as e:
+            self.log(f"[Python script error] {e}", True)
+            return False
+
+    # -------------------------
+    # Get Var
+    # -------------------------
+    def get_var(self, var_name):
+        """Returns a configuration variable to lua script."""
+        if self.script_properties:
+            return self.script_properties.get_attr(var_name)
+        return None
+
+    # -------------------------
+    # Step
+    # -------------------------
+    def step(self) -> None:
+        """
+        Called by scripts at some loop points. It waits while the
+        execution is paused and for the step delay, so the execution
+        can be observed. Without pause and delay it returns at once.
+
+        Raises
+        ------
+        ExecutionStopped
+            If the execution was stopped, so scripts end at the next
+            step without checking is_stopped().
+        """
+        if self.stopped:
+            raise ExecutionStopped()
+        if self.slow_step:
+            self.resumed.wait()
+            if self.step_delay:
+                self.interrupted.wait(self.step_delay)
+            if self.stopped:
+                raise ExecutionStopped()
+
+    # -------------------------
+    # Set Step Delay
+    # -------------------------
+    def set_step_delay(self, delay: float) -> None:
+        """Changes the seconds that each call to step() waits."""
+        self.step_delay = delay
+        self.slow_step = delay > 0 or not self.resumed.is_set()
+
+    # -------------------------
+    # Pause
+    # -------------------------
+    def pause(self) -> None:
+        """Pauses the execution at the next call to step()."""
+        self.resumed.clear()
+        self.slow_step = True
+
+    # -------------------------
+    # Resume
+    # -------------------------
+    def resume(self) -> None:
+        """Resumes a paused execution."""
+        self.resumed.set()
+        self.slow_step = self.step_delay > 0
+
+    # -------------------------
+    # Is Paused
+    # -------------------------
+    def is_paused(self) -> bool:
+        """Returns if the execution is paused."""
+        return not self.resumed.is_set()
+
+    # -------------------------
+    # Stop
+    # -------------------------
+    def stop(self) -> None:
+        """
+        Stops the execution: the next call to step() raises
+        ExecutionStopped, also if it is waiting.
+        """
+        self.stopped = True
+        self.interrupted.set()
+        self.resume()
+
+    # -------------------------
+    # Is Stopped
+    # -------------------------
+    def is_stopped(self):
+        """Returns if algorithm was stopped."""
+        return self.stopped
+
+    # -------------------------
+    # Log Enabled
+    # -------------------------
+    def log_enabled(self, symbol: str) -> bool:
+        """
+        Returns if log lines of a symbol (the first character of the
+        lines) are kept, so scripts can skip building the lines that
+        are not. Without graphic interface, all lines are kept.
+        """
+        return True
+
+    # -------------------------
+    # Log
+    # -------------------------
+    def log(self, text, system_log: bool = False):
+        """
+        Add a line to the log of the execution.
+
+        Parameters
+        ----------
+        text: str
+            Text to be added to the log. The first character
+            is an identifier of the type of log information.
+        system_log: bool
+            If it is a system log.
+        """
+        if text:
+            self.logs.append(text)
+            if self.recorder is not None:
+                self.recorder.log(text, system_log)
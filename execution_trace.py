@@ -0,0 +1,424 @@
+import sys
+import json
+import time
+from array import array
+from bisect import bisect_left
+from graph_model import GraphModel, GraphObserver
+from state import State
+
+TRACE_FORMAT = "grafuria-trace"
+TRACE_VERSION = 1
+
+
+# -------------------------
+# Trace Class
+# -------------------------
+class Trace:
+    """
+    Trace of an execution: the states of the graph at the start and
+    every change of state and log line that followed, with the time
+    since the start. Events are kept in columns, one item per event,
+    so a long execution takes little memory and is saved quickly.
+
+    Attributes
+    ----------
+    vertex_states, edge_states: bytearray
+        States of vertices and edges at the start, by position.
+    times: array
+        Seconds since the start of each event.
+    kinds: bytearray
+        Kind of each event (VERTEX, EDGE, RESET or LOG).
+    items: array
+        Position of the vertex or edge of each event, or the position
+        of the line in logs for LOG events.
+    states: bytearray
+        New state of each VERTEX and EDGE event.
+    logs: list[tuple[str, bool]]
+        Text of log lines, and if they are system logs.
+    info: dict
+        Information about the execution (script, seed, solved...).
+    """
+
+    VERTEX = 0  # A vertex changed its state
+    EDGE = 1  # An edge changed its state
+    RESET = 2  # All states were reset to NONE
+    LOG = 3  # A line was added to the log
+
+    def __init__(self, vertex_states=b"", edge_states=b""):
+        self.vertex_states = bytearray(vertex_states)
+        self.edge_states = bytearray(edge_states)
+        self.times = array("d")
+        self.kinds = bytearray()
+        self.items = array("i")
+        self.states = bytearray()
+        self.logs = []
+        self.info = {}
+
+    # -------------------------
+    # Size
+    # -------------------------
+    def size(self) -> int:
+        """Returns the number of events."""
+        return len(self.kinds)
+
+    # -------------------------
+    # Duration
+    # -------------------------
+    def duration(self) -> float:
+        """Returns the seconds between the start and the last event."""
+        return self.times[-1] if self.times else 0.0
+
+    # -------------------------
+    # Save
+    # -------------------------
+    def save(self, filename: str) -> None:
+        """
+        Saves the trace in a file: a line with a JSON header (sizes,
+        information and log lines) followed by the columns in binary.
+        """
+        header = {
+            "format": TRACE_FORMAT,
+            "version": TRACE_VERSION,
+            "byteorder": sys.byteorder,
+            "vertices": len(self.vertex_states),
+            "edges": len(self.edge_states),
+            "events": self.size(),
+            "info": self.info,
+            "logs": self.logs,
+        }
+        with open(filename, "wb") as f:
+            f.write(json.dumps(header).encode("utf-8") + b"\n")
+            f.write(self.vertex_states)
+            f.write(self.edge_states)
+            self.times.tofile(f)
+            f.write(self.kinds)
+            self.items.tofile(f)
+            f.write(self.states)
+
+    # -------------------------
+    # Load
+    # -------------------------
+    @staticmethod
+    def load(filename: str) -> "Trace":
+        """
+        Loads a trace saved by save().
+
+        Raises
+        ------
+        ValueError
+            If the file is not a trace or is truncated.
+        """
+        with open(filename, "rb") as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                header = None
+            if not isinstance(header, dict) or header.get("format") != TRACE_FORMAT:
+                raise ValueError(f"{filename} is not a trace file.")
+            if header.get("version") != TRACE_VERSION:
+                raise ValueError(f"Unsupported trace version: {header.get('version')}")
+            events = header["events"]
+            trace = Trace(
+                f.read(header["vertices"]), f.read(header["edges"])
+            )
+            try:
+                trace.times.fromfile(f, events)
+                trace.kinds = bytearray(f.read(events))
+                trace.items.fromfile(f, events)
+                trace.states = bytearray(f.read(events))
+            except EOFError:
+                raise ValueError(f"Trace file {filename} is truncated.")
+            if (
+                len(trace.vertex_states) != header["vertices"]
+                or len(trace.edge_states) != header["edges"]
+                or len(trace.states) != events
+            ):
+                raise ValueError(f"Trace file {filename} is truncated.")
+        if header["byteorder"] != sys.byteorder:
+            trace.times.byteswap()
+            trace.items.byteswap()
+        trace.logs = [(text, bool(system_log)) for text, system_log in header["logs"]]
+        trace.info = header["info"]
+        return trace
+
+
+# -------------------------
+# Trace Recorder Class
+# -------------------------
+class TraceRecorder(GraphObserver):
+    """
+    Records the trace of an execution. It is attached to the graph as
+    an observer while the script runs, and the log lines are added by
+    the application (see Engine.log).
+    """
+
+    def __init__(self, graph: GraphModel):
+        self.graph = graph
+        self.trace = Trace(
+            bytearray(v.get_state() for v in graph.vertex),
+            bytearray(e.get_state() for e in graph.edge),
+        )
+        self.start = time.perf_counter()
+        # Bound methods, called for every event
+        self._add_time = self.trace.times.append
+        self._add_kind = self.trace.kinds.append
+        self._add_item = self.trace.items.append
+        self._add_state = self.trace.states.append
+        graph.attach(self)
+
+    # -------------------------
+    # Add
+    # -------------------------
+    def add(self, kind: int, item: int, state: int = State.NONE) -> None:
+        """Adds an event to the trace."""
+        self._add_time(time.perf_counter() - self.start)
+        self._add_kind(kind)
+        self._add_item(item)
+        self._add_state(state)
+
+    # -------------------------
+    # Log
+    # -------------------------
+    def log(self, text: str, system_log: bool = False) -> None:
+        """Adds a log line to the trace."""
+        self.trace.logs.append((text, system_log))
+        self.add(Trace.LOG, len(self.trace.logs) - 1)
+
+    # -------------------------
+    # Close
+    # -------------------------
+    def close(self) -> Trace:
+        """Ends the recording and returns the trace."""
+        self.graph.detach(self)
+        return self.trace
+
+    # -------------------------
+    # Graph Observer
+    # -------------------------
+    def on_vertex_state(self, vertex) -> None:
+        self.add(Trace.VERTEX, vertex.index, vertex.get_state())
+
+    def on_edge_state(self, edge) -> None:
+        self.add(Trace.EDGE, edge.index, edge.get_state())
+
+    def on_states_reset(self) -> None:
+        self.add(Trace.RESET, -1)
+
+    def on_vertex_states(self, vertices) -> None:
+        for vertex in vertices:
+            self.add(Trace.VERTEX, vertex.index, vertex.get_state())
+
+    def on_edge_states(self, edges) -> None:
+        for edge in edges:
+            self.add(Trace.EDGE, edge.index, edge.get_state())
+
+
+# -------------------------
+# Trace Player Class
+# -------------------------
+class TracePlayer:
+    """
+    Replays a trace on a graph, changing the states of its elements,
+    so the observers of the graph (the renderer) draw them. The graph
+    can be moved to the states after any event of the trace (seek).
+
+    Short moves forward apply only the events in between, each element
+    changed once. Other moves start from the nearest checkpoint, a copy
+    of the states taken every `interval` events, so scrubbing a long
+    trace does not replay it from the start.
+
+    Attributes
+    ----------
+    graph: GraphModel
+        Graph where the trace is replayed.
+    trace: Trace
+        The trace.
+    position: int | None
+        Number of events applied to the graph, None if unknown.
+    interval: int
+        Number of events between checkpoints.
+    """
+
+    CHECKPOINT_EVENTS = 4096  # Minimum number of events between checkpoints
+
+    def __init__(self, graph: GraphModel, trace: Trace, position=None):
+        """
+        Parameters
+        ----------
+        graph: GraphModel
+            Graph where the trace was recorded.
+        trace: Trace
+            The trace.
+        position: int
+            Number of events of the trace already applied to the graph,
+            e.g. trace.size() just after the recording. None if the
+            states of the graph are unknown.
+
+        Raises
+        ------
+        ValueError
+            If the trace was recorded on a graph of other size.
+        """
+        if (
+            len(trace.vertex_states) != graph.get_vertex_size()
+            or len(trace.edge_states) != graph.get_edge_size()
+        ):
+            raise ValueError(
+                f"The trace was recorded on a graph with "
+                f"{len(trace.vertex_states)} vertices and "
+                f"{len(trace.edge_states)} edges."
+            )
+        self.graph = graph
+        self.trace = trace
+        self.position = position
+        self.interval = max(
+            TracePlayer.CHECKPOINT_EVENTS,
+            len(trace.vertex_states) + len(trace.edge_states),
+        )
+        self.checkpoints = [(bytes(trace.vertex_states), bytes(trace.edge_states))]
+        self.log_positions = array(
+            "i", (i for i, kind in enumerate(trace.kinds) if kind == Trace.LOG)
+        )
+
+    # -------------------------
+    # Size
+    # -------------------------
+    def size(self) -> int:
+        """Returns the number of events of the trace."""
+        return self.trace.size()
+
+    # -------------------------
+    # Get Time
+    # -------------------------
+    def get_time(self, position: int) -> float:
+        """Returns the seconds since the start after position events."""
+        return self.trace.times[position - 1] if position > 0 else 0.0
+
+    # -------------------------
+    # Get Logs
+    # -------------------------
+    def get_logs(self, first: int, last: int):
+        """
+        Returns the log lines of events from position first to last
+        (not included), as tuples (text, system_log).
+        """
+        items = self.trace.items
+        logs = self.trace.logs
+        positions = self.log_positions
+        start = bisect_left(positions, first)
+        end = bisect_left(positions, last)
+        return [logs[items[i]] for i in positions[start:end]]
+
+    # -------------------------
+    # Seek
+    # -------------------------
+    def seek(self, position: int):
+        """
+        Changes the states of the graph to the states after the first
+        position events of the trace.
+
+        Returns
+        -------
+        int | None
+            The position before the seek, None if it was unknown.
+        """
+        position = min(max(int(position), 0), self.size())
+        old = self.position
+        if old is not None and old <= position <= old + self.interval:
+            self._forward(old, position)
+        else:
+            self._restore(*self._states_at(position))
+        self.position = position
+        return old
+
+    # -------------------------
+    # Forward
+    # -------------------------
+    def _forward(self, first: int, last: int) -> None:
+        """Applies the events from position first to last to the graph."""
+        trace = self.trace
+        kinds, items, states = trace.kinds, trace.items, trace.states
+        vertex_changes = {}
+        edge_changes = {}
+        reset = False
+        for i in range(first, last):
+            kind = kinds[i]
+            if kind == Trace.VERTEX:
+                vertex_changes[items[i]] = states[i]
+            elif kind == Trace.EDGE:
+                edge_changes[items[i]] = states[i]
+            elif kind == Trace.RESET:
+                reset = True
+                vertex_changes.clear()
+                edge_changes.clear()
+        if reset:
+            self.graph.reset_states()
+        self._apply(vertex_changes, edge_changes)
+
+    # -------------------------
+    # Restore
+    # -------------------------
+    def _restore(self, vertex_states, edge_states) -> None:
+        """Changes all states of the graph to the given states."""
+        self.graph.reset_states()
+        self._apply(
+            {i: s for i, s in enumerate(vertex_states) if s},
+            {i: s for i, s in enumerate(edge_states) if s},
+        )
+
+    # -------------------------
+    # Apply
+    # -------------------------
+    def _apply(self, vertex_changes: dict, edge_changes: dict) -> None:
+        """
+        Changes the states of elements, given as {position: state},
+        with one call to the graph for each state.
+        """
+        graph = self.graph
+        for elements, changes, set_states in (
+            (graph.edge, edge_changes, graph.set_edge_states),
+            (graph.vertex, vertex_changes, graph.set_vertex_states),
+        ):
+            groups = {}
+            for i, state in changes.items():
+                groups.setdefault(state, []).append(elements[i])
+            for state, group in groups.items():
+                set_states(group, state)
+
+    # -------------------------
+    # States At
+    # -------------------------
+    def _states_at(self, position: int):
+        """
+        Returns the states of vertices and edges after position events,
+        from the checkpoint before it. Missing checkpoints are created.
+        """
+        index = position // self.interval
+        while len(self.checkpoints) <= index:
+            vertex_states, edge_states = map(bytearray, self.checkpoints[-1])
+            first = (len(self.checkpoints) - 1) * self.interval
+            self._replay(vertex_states, edge_states, first, first + self.interval)
+            self.checkpoints.append((bytes(vertex_states), bytes(edge_states)))
+        vertex_states, edge_states = map(bytearray, self.checkpoints[index])
+        self._replay(vertex_states, edge_states, index * self.interval, position)
+        return vertex_states, edge_states
+
+    # -------------------------
+    # Replay
+    # -------------------------
+    def _replay(self, vertex_states, edge_states, first: int, last: int) -> None:
+        """Applies the events from position first to last to the states."""
+        trace = self.trace
+        kinds, items, states = trace.kinds, trace.items, trace.states
+        no_vertex_states = bytes(len(vertex_states))
+        no_edge_states = bytes(len(edge_states))
+        for i in range(first, last):
+            kind = kinds[i]
+            if kind == Trace.VERTEX:
+                vertex_states[items[i]] = states[i]
+            elif kind == Trace.EDGE:
+                edge_states[items[i]] = states[i]
+            elif kind == Trace.RESET:
+                vertex_states[:] = no_vertex_states
+                edge_states[:] = no_edge_states
+
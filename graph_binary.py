@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Binary graph format of Grafuria.
+
+A compact alternative to the JSON graph files, made to be opened with
+mmap. All numbers are little-endian and every section starts at a
+multiple of 8 bytes.
+
+    header          magic "GRFB", version (u16), flags (u16),
+                    vertex count (u32), edge count (u32),
+                    names size (u64), padding (u32)
+    vertex ids      int64[vertex count]
+    vertex x        float64[vertex count]
+    vertex y        float64[vertex count]
+    edge ids        int64[edge count]
+    edge a          int64[edge count] (position of vertex in the list)
+    edge b          int64[edge count] (position of vertex in the list)
+    edge weights    float64[edge count]
+    name offsets    uint32[vertex count + 1]
+    names           utf-8 bytes of the concatenated vertex names
+
+Bit 0 of flags is set when the graph is bidirectional.
+
+Usage:
+    python3 graph_binary.py graphs/*.json
+
+Each JSON file is converted to a file with the same name and the
+extension ".grb".
+"""
+
+import sys
+import os
+import json
+import mmap
+import struct
+from array import array
+
+EXTENSION = ".grb"
+MAGIC = b"GRFB"
+VERSION = 1
+FLAG_BIDIRECTIONAL = 1
+HEADER = struct.Struct("<4sHHIIQ4x")
+
+
+# -------------------------
+# Pad
+# -------------------------
+def _pad(size: int) -> int:
+    """Returns how many bytes are missing to align size by 8."""
+    return -size % 8
+
+
+# -------------------------
+# To Little Endian
+# -------------------------
+def _little(values: array) -> bytes:
+    """Returns the bytes of an array in little-endian order."""
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+# -------------------------
+# Write Graph
+# -------------------------
+def write_graph(data: dict, filename: str) -> None:
+    """
+    Writes a graph JSON object in binary format.
+
+    Parameters
+    ----------
+    data: dict
+        Object with keys "bidirectional", "vertex" and "edge".
+    filename: str
+        Name and path of binary file.
+
+    Raises
+    ------
+    ValueError
+        If a vertex ID is duplicated or an edge connects to a missing
+        vertex.
+    """
+    vertex = data["vertex"]
+    edge = data["edge"]
+    index = {}
+    for i, v in enumerate(vertex):
+        if v["id"] in index:
+            raise ValueError(f"Duplicated vertex id {v['id']}.")
+        index[v["id"]] = i
+
+    names = bytearray()
+    name_offsets = array("I", [0])
+    for v in vertex:
+        names += v.get("name", "").encode("utf-8")
+        name_offsets.append(len(names))
+
+    edge_a = array("q")
+    edge_b = array("q")
+    for e in edge:
+        if e["a"] not in index or e["b"] not in index:
+            raise ValueError(f"Edge {e['id']} connects to a missing vertex.")
+        edge_a.append(index[e["a"]])
+        edge_b.append(index[e["b"]])
+
+    flags = FLAG_BIDIRECTIONAL if data.get("bidirectional", True) else 0
+    sections = [
+        _little(array("q", (v["id"] for v in vertex))),
+        _little(array("d", (v["x"] for v in vertex))),
+        _little(array("d", (v["y"] for v in vertex))),
+        _little(array("q", (e["id"] for e in edge))),
+        _little(edge_a),
+        _little(edge_b),
+        _little(array("d", (e.get("weight", 1) for e in edge))),
+        _little(name_offsets),
+        bytes(names),
+    ]
+    with open(filename, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC, VERSION, flags, len(vertex), len(edge), len(names)
+            )
+        )
+        for section in sections:
+            f.write(section)
+            f.write(b"\0" * _pad(len(section)))
+
+
+# -------------------------
+# Read Graph
+# -------------------------
+def read_graph(filename: str, graph) -> None:
+    """
+    Maps a binary graph file in memory and loads it in a GraphModel.
+    The packed arrays are converted in bulk, without creating an
+    intermediate object for each record as the JSON parser does.
+
+    Parameters
+    ----------
+    filename: str
+        Name and path of binary file.
+    graph: GraphModel
+        Graph that receives the content of file.
+
+    Raises
+    ------
+    ValueError
+        If the file is not a valid binary graph.
+    """
+    with open(filename, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            view = memoryview(mm)
+            try:
+                _read_sections(view, graph)
+            finally:
+                view.release()
+
+
+# -------------------------
+# Read Sections
+# -------------------------
+def _read_sections(view: memoryview, graph) -> None:
+    """Decodes the sections of a mapped binary graph file."""
+    if len(view) < HEADER.size:
+        raise ValueError("File is too small to be a binary graph.")
+    magic, version, flags, nv, ne, names_size = HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("File is not a binary graph.")
+    if version != VERSION:
+        raise ValueError(f"Unsupported binary graph version {version}.")
+
+    position = HEADER.size
+
+    def take(typecode: str, count: int) -> list:
+        nonlocal position
+        size = count * array(typecode).itemsize
+        if position + size > len(view):
+            raise ValueError("Binary graph is truncated.")
+        with view[position:position + size] as chunk:
+            if sys.byteorder == "little":
+                with chunk.cast(typecode) as typed:
+                    values = typed.tolist()
+            else:
+                swapped = array(typecode, chunk.tobytes())
+                swapped.byteswap()
+                values = swapped.tolist()
+        position += size + _pad(size)
+        return values
+
+    vertex_ids = take("q", nv)
+    xs = take("d", nv)
+    ys = take("d", nv)
+    edge_ids = take("q", ne)
+    edge_a = take("q", ne)
+    edge_b = take("q", ne)
+    weights = take("d", ne)
+    name_offsets = take("I", nv + 1)
+    if position + names_size > len(view):
+        raise ValueError("Binary graph is truncated.")
+    names = view[position:position + names_size].tobytes()
+    vertex_names = [
+        names[start:end].decode("utf-8") if end > start else ""
+        for start, end in zip(name_offsets, name_offsets[1:])
+    ]
+    weights = [int(w) if w.is_integer() else w for w in weights]
+
+    graph.load_arrays(
+        bool(flags & FLAG_BIDIRECTIONAL),
+        vertex_ids,
+        vertex_names,
+        xs,
+        ys,
+        edge_ids,
+        edge_a,
+        edge_b,
+        weights,
+    )
+
+
+# -------------------------
+# Convert
+# -------------------------
+def convert(json_filename: str, filename: str = "") -> str:
+    """
+    Converts a JSON graph file to the binary format.
+
+    Parameters
+    ----------
+    json_filename: str
+        Name and path of JSON graph file.
+    filename: str
+        Name and path of binary file. If empty, the JSON file name
+        with the binary extension is used.
+
+    Returns
+    -------
+    str
+        Name and path of binary file.
+    """
+    if not filename:
+        filename = os.path.splitext(json_filename)[0] + EXTENSION
+    with open(json_filename) as f:
+        data = json.load(f)
+    write_graph(data, filename)
+    return filename
+
+
+# -------------------------
+# Main
+# -------------------------
+def main():
+    """Converts every JSON graph file passed as argument."""
+    status = 0
+    for json_filename in sys.argv[1:]:
+        try:
+            print(f"{json_filename} -> {convert(json_filename)}")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"{json_filename}: {e}", file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
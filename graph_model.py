@@ -0,0 +1,752 @@
+import os
+import json
+import random
+import shutil
+import tempfile
+from array import array
+import graph_binary
+from state import State
+from vertex import Vertex
+from edge import Edge
+
+
+# -------------------------
+# Write JSON List
+# -------------------------
+def _write_json_list(f, key: str, records: list, compact: bool) -> None:
+    """Writes a list of records of a graph JSON object, one by one."""
+    if compact:
+        f.write(f"{json.dumps(key)}: [")
+        separator = "\n"
+        for record in records:
+            f.write(separator)
+            f.write(json.dumps(record))
+            separator = ",\n"
+        f.write("\n]" if records else "]")
+        return
+    f.write(f"    {json.dumps(key)}: [")
+    separator = "\n"
+    for record in records:
+        f.write(separator)
+        f.write("        ")
+        f.write(json.dumps(record, indent=4).replace("\n", "\n        "))
+        separator = ",\n"
+    f.write("\n    ]" if records else "]")
+
+
+# -------------------------
+# Write Graph JSON
+# -------------------------
+def write_graph_json(data: dict, f, compact: bool = False) -> None:
+    """
+    Writes a graph JSON object to a text file record by record, so the
+    whole document is never held in memory as a string.
+
+    Parameters
+    ----------
+    data: dict
+        Object with keys "bidirectional", "vertex" and "edge".
+    f: file
+        Text file opened for writing.
+    compact: bool
+        If True, writes one record per line without indentation, which
+        is faster and smaller for big graphs. Otherwise writes the same
+        layout of json.dump with indent=4.
+    """
+    bidirectional = json.dumps(data["bidirectional"])
+    if compact:
+        f.write(f'{{"bidirectional": {bidirectional},\n')
+        _write_json_list(f, "vertex", data["vertex"], True)
+        f.write(",\n")
+        _write_json_list(f, "edge", data["edge"], True)
+        f.write("}\n")
+    else:
+        f.write(f'{{\n    "bidirectional": {bidirectional},\n')
+        _write_json_list(f, "vertex", data["vertex"], False)
+        f.write(",\n")
+        _write_json_list(f, "edge", data["edge"], False)
+        f.write("\n}")
+
+
+# -------------------------
+# Save Graph Data
+# -------------------------
+def save_graph_data(data: dict, filename: str, compact: bool = False) -> None:
+    """
+    Saves a graph JSON object in a file, in JSON or binary format
+    according to the file extension. The content is written in a
+    temporary file in the same folder, which then replaces the target
+    file, so a failure never leaves a partially written graph.
+
+    Parameters
+    ----------
+    data: dict
+        Object with keys "bidirectional", "vertex" and "edge".
+    filename: str
+        Name and path of graph file.
+    compact: bool
+        One record per line in JSON format (see write_graph_json).
+    """
+    folder = os.path.dirname(os.path.abspath(filename))
+    fd, temp = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        if filename.lower().endswith(graph_binary.EXTENSION):
+            os.close(fd)
+            graph_binary.write_graph(data, temp)
+        else:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                write_graph_json(data, f, compact)
+        if os.path.exists(filename):
+            shutil.copymode(filename, temp)
+        else:
+            os.chmod(temp, 0o644)
+        os.replace(temp, filename)
+    except BaseException:
+        if os.path.exists(temp):
+            os.remove(temp)
+        raise
+
+
+# -------------------------
+# Graph Observer Class
+# -------------------------
+class GraphObserver:
+    """
+    Base class of the objects that want to be notified about changes
+    in a GraphModel, like the canvas renderer. Every method does
+    nothing by default, so an observer only overrides what it needs.
+    """
+
+    def on_graph_loaded(self) -> None:
+        """Called when the whole graph was replaced (file load)."""
+
+    def on_graph_cleared(self) -> None:
+        """Called when all vertices and edges were removed."""
+
+    def on_vertex_added(self, vertex: Vertex) -> None:
+        """Called when a new vertex was added to the graph."""
+
+    def on_vertex_removed(self, vertex: Vertex) -> None:
+        """Called when a vertex was removed from the graph."""
+
+    def on_vertex_changed(self, vertex: Vertex) -> None:
+        """Called when name or position of a vertex has changed."""
+
+    def on_vertex_state(self, vertex: Vertex) -> None:
+        """Called when the state of a vertex has changed."""
+
+    def on_edge_added(self, edge: Edge) -> None:
+        """Called when a new edge was added to the graph."""
+
+    def on_edge_removed(self, edge: Edge) -> None:
+        """Called when an edge was removed from the graph."""
+
+    def on_edge_changed(self, edge: Edge) -> None:
+        """Called when the weight of an edge has changed."""
+
+    def on_edge_state(self, edge: Edge) -> None:
+        """Called when the state of an edge has changed."""
+
+    def on_states_reset(self) -> None:
+        """Called when the states of all elements were reset to NONE."""
+
+    def on_vertex_states(self, vertices: list[Vertex]) -> None:
+        """Called when the state of many vertices has changed at once."""
+
+    def on_edge_states(self, edges: list[Edge]) -> None:
+        """Called when the state of many edges has changed at once."""
+
+
+# -------------------------
+# Graph Model Class
+# -------------------------
+class GraphModel:
+    """
+    Represents the graph (vertices, edges and its connections) without
+    any dependency of the graphic interface. It can be loaded, changed
+    and traversed without tkinter. The graphic representation is an
+    optional observer (GraphObserver) attached to the model.
+
+    Attributes
+    ----------
+    bidirectional: bool
+        If the edges of graph have no direction.
+    vertex: list[Vertex]
+        List of vertices of graph.
+    edge: list[Edge]
+        List of edges of graph.
+    vertex_dict: dict
+        Vertices indexed by ID.
+    edge_dict: dict
+        Edges indexed by ID.
+    observers: list[GraphObserver]
+        Objects notified when the graph changes.
+
+    The states of elements are kept in dense columns indexed by the
+    position of the element (Vertex.index, Edge.index), instead of
+    attributes of each object. A value of a column is only valid if
+    the epoch of its element is equal to the current epoch, otherwise
+    the element is in State.NONE (with no active edges). So resetting
+    all states is just incrementing the epoch.
+
+    epoch: int
+        Current generation of states.
+    vertex_state, edge_state: bytearray
+        State of each vertex and edge.
+    vertex_epoch, edge_epoch: array
+        Epoch when each vertex and edge state was written.
+    active_edges: array
+        Number of ACTIVE edges of each vertex.
+    """
+
+    def __init__(self):
+        self.bidirectional: bool = True
+        self.vertex: list[Vertex] = []
+        self.edge: list[Edge] = []
+        self.vertex_dict = {}
+        self.edge_dict = {}
+        self.observers: list[GraphObserver] = []
+        self.epoch: int = 0
+        self.vertex_state = bytearray()
+        self.vertex_epoch = array("Q")
+        self.active_edges = array("l")
+        self.edge_state = bytearray()
+        self.edge_epoch = array("Q")
+
+    # -------------------------
+    # Attach
+    # -------------------------
+    def attach(self, observer: GraphObserver) -> None:
+        """Attach an observer to be notified about graph changes."""
+        if observer not in self.observers:
+            self.observers.append(observer)
+
+    # -------------------------
+    # Detach
+    # -------------------------
+    def detach(self, observer: GraphObserver) -> None:
+        """Remove an observer of this graph."""
+        if observer in self.observers:
+            self.observers.remove(observer)
+
+    # -------------------------
+    # Notify Vertex State
+    # -------------------------
+    def notify_vertex_state(self, vertex: Vertex) -> None:
+        """Inform observers that the state of a vertex has changed."""
+        for observer in self.observers:
+            observer.on_vertex_state(vertex)
+
+    # -------------------------
+    # Notify Edge State
+    # -------------------------
+    def notify_edge_state(self, edge: Edge) -> None:
+        """Inform observers that the state of an edge has changed."""
+        for observer in self.observers:
+            observer.on_edge_state(edge)
+
+    # -------------------------
+    # Notify Vertex Changed
+    # -------------------------
+    def notify_vertex_changed(self, vertex: Vertex) -> None:
+        """Inform observers that name or position of a vertex changed."""
+        for observer in self.observers:
+            observer.on_vertex_changed(vertex)
+
+    # -------------------------
+    # Notify Edge Changed
+    # -------------------------
+    def notify_edge_changed(self, edge: Edge) -> None:
+        """Inform observers that the weight of an edge changed."""
+        for observer in self.observers:
+            observer.on_edge_changed(edge)
+
+    # -------------------------
+    # Touch Vertex
+    # -------------------------
+    def touch_vertex(self, index: int) -> None:
+        """
+        Brings the state columns of the vertex at position index to the
+        current epoch, clearing values written in an older epoch.
+        """
+        if self.vertex_epoch[index] != self.epoch:
+            self.vertex_epoch[index] = self.epoch
+            self.vertex_state[index] = State.NONE
+            self.active_edges[index] = 0
+
+    # -------------------------
+    # Reset States
+    # -------------------------
+    def reset_states(self, states=None) -> None:
+        """
+        Changes the state of vertices and edges to NONE.
+
+        Parameters
+        ----------
+        states: iterable
+            Only elements in one of these states are changed. If None,
+            every element is changed, in constant time, and observers
+            are notified once to redraw everything.
+        """
+        if states is None:
+            self.epoch += 1
+            for observer in self.observers:
+                observer.on_states_reset()
+            return
+        states = set(states)
+        self.set_edge_states(
+            [e for e in self.edge if e.get_state() in states], State.NONE
+        )
+        self.set_vertex_states(
+            [v for v in self.vertex if v.get_state() in states], State.NONE
+        )
+
+    # -------------------------
+    # Set Vertex States
+    # -------------------------
+    def set_vertex_states(self, vertices, state: int) -> None:
+        """
+        Changes the state of many vertices and notifies observers once.
+
+        Parameters
+        ----------
+        vertices: list[Vertex]
+            Vertices to change.
+        state: int
+            New state.
+        """
+        for v in vertices:
+            v.state = state
+        for observer in self.observers:
+            observer.on_vertex_states(vertices)
+
+    # -------------------------
+    # Set Edge States
+    # -------------------------
+    def set_edge_states(self, edges, state: int) -> None:
+        """
+        Changes the state of many edges, updating the active edge
+        counters of their vertices, and notifies observers once.
+
+        Parameters
+        ----------
+        edges: list[Edge]
+            Edges to change.
+        state: int
+            New state.
+        """
+        for e in edges:
+            e.a.change_active_edge(e, state)
+            e.b.change_active_edge(e, state)
+            e.state = state
+        for observer in self.observers:
+            observer.on_edge_states(edges)
+
+    # -------------------------
+    # Reset Columns
+    # -------------------------
+    def _reset_columns(self) -> None:
+        """
+        Recreates the state columns for the current vertex and edge
+        lists, keeping the current states, and updates the position
+        of every element.
+        """
+        vertex_state = bytearray(v.get_state() for v in self.vertex)
+        active_edges = array(
+            "l", (v.get_active_edge_size() for v in self.vertex)
+        )
+        edge_state = bytearray(e.get_state() for e in self.edge)
+        for i, v in enumerate(self.vertex):
+            v.index = i
+        for i, e in enumerate(self.edge):
+            e.index = i
+        self.vertex_state = vertex_state
+        self.active_edges = active_edges
+        self.vertex_epoch = array("Q", [self.epoch]) * len(self.vertex)
+        self.edge_state = edge_state
+        self.edge_epoch = array("Q", [self.epoch]) * len(self.edge)
+
+    # -------------------------
+    # Get Vertex Size
+    # -------------------------
+    def get_vertex_size(self) -> int:
+        """Returns how many vertices there are in the graph."""
+        return len(self.vertex)
+
+    # -------------------------
+    # Get Edge Size
+    # -------------------------
+    def get_edge_size(self) -> int:
+        """Returns how many edges there are in the graph."""
+        return len(self.edge)
+
+    # -------------------------
+    # Get Vertex
+    # -------------------------
+    def get_vertex(self, index: int) -> Vertex | None:
+        """Returns the vertex at position index of vertex list."""
+        if index < 0 or index >= len(self.vertex):
+            return None
+        return self.vertex[index]
+
+    # -------------------------
+    # Get Edge
+    # -------------------------
+    def get_edge(self, index: int) -> Edge | None:
+        """Returns the edge at position index of edge list."""
+        if index < 0 or index >= len(self.edge):
+            return None
+        return self.edge[index]
+
+    # -------------------------
+    # Get Vertex By ID
+    # -------------------------
+    def get_vertex_by_id(self, vertex_id) -> Vertex | None:
+        """Returns a vertex by its ID, or None if not found."""
+        return self.vertex_dict.get(vertex_id, None)
+
+    # -------------------------
+    # Get Edge By ID
+    # -------------------------
+    def get_edge_by_id(self, edge_id) -> Edge | None:
+        """Returns an edge by its ID, or None if not found."""
+        return self.edge_dict.get(edge_id, None)
+
+    # -------------------------
+    # Add Vertex
+    # -------------------------
+    def add_vertex(self, name: str, x, y, id: int = -1) -> Vertex:
+        """
+        Creates a new vertex in the graph.
+
+        Parameters
+        ----------
+        name: str
+            Name of vertex.
+        x, y: int
+            Position of vertex.
+        id: int
+            Vertex ID. If -1, an autoincrement ID is used.
+        """
+        vertex = Vertex(name, x, y, self, id)
+        vertex.index = len(self.vertex)
+        self.vertex_state.append(State.NONE)
+        self.vertex_epoch.append(self.epoch)
+        self.active_edges.append(0)
+        self.vertex.append(vertex)
+        self.vertex_dict[vertex.get_id()] = vertex
+        for observer in self.observers:
+            observer.on_vertex_added(vertex)
+        return vertex
+
+    # -------------------------
+    # Add Edge
+    # -------------------------
+    def add_edge(self, a: Vertex, b: Vertex, weight=1, id: int = -1) -> Edge:
+        """
+        Creates a new edge connecting vertex a to vertex b.
+
+        Parameters
+        ----------
+        a, b: Vertex
+            Vertices connected by the edge.
+        weight: float
+            Weight of connection.
+        id: int
+            Edge ID. If -1, an autoincrement ID is used.
+        """
+        edge = Edge(a, b, weight, self, id=id)
+        edge.index = len(self.edge)
+        self.edge_state.append(State.NONE)
+        self.edge_epoch.append(self.epoch)
+        self.edge.append(edge)
+        self.edge_dict[edge.get_id()] = edge
+        a.edge.append(edge)
+        b.edge.append(edge)
+        a.neighbor[b.get_id()] = edge
+        b.neighbor[a.get_id()] = edge
+        for observer in self.observers:
+            observer.on_edge_added(edge)
+        return edge
+
+    # -------------------------
+    # Remove Edge
+    # -------------------------
+    def remove_edge(self, edge: Edge) -> None:
+        """
+        Removes the Edge by also removing its connection to the
+        Vertices to which it is connected.
+        """
+        if edge not in edge.a.edge or edge not in edge.b.edge:
+            return
+        edge.a.edge.remove(edge)
+        edge.a.neighbor.pop(edge.b.get_id(), None)
+        edge.b.edge.remove(edge)
+        edge.b.neighbor.pop(edge.a.get_id(), None)
+        self.edge.remove(edge)
+        self.edge_dict.pop(edge.get_id(), None)
+        self._reset_columns()
+        for observer in self.observers:
+            observer.on_edge_removed(edge)
+
+    # -------------------------
+    # Remove Vertex
+    # -------------------------
+    def remove_vertex(self, vertex: Vertex) -> None:
+        """
+        Removes a Vertex. But it is necessary to delete all connections.
+        The iteration is done over a copy of the edge list because
+        removing an edge also changes the vertex's edge list.
+        """
+        for e in vertex.edge.copy():
+            self.remove_edge(e)
+        vertex.edge.clear()
+        vertex.neighbor.clear()
+        self.vertex.remove(vertex)
+        self.vertex_dict.pop(vertex.get_id(), None)
+        self._reset_columns()
+        for observer in self.observers:
+            observer.on_vertex_removed(vertex)
+
+    # -------------------------
+    # Move Vertex
+    # -------------------------
+    def move_vertex(self, vertex: Vertex, x, y) -> None:
+        """Changes the position of a vertex."""
+        vertex.x = x
+        vertex.y = y
+        self.notify_vertex_changed(vertex)
+
+    # -------------------------
+    # Shuffle Edges
+    # -------------------------
+    def shuffle_edges(self, rng=random) -> None:
+        """
+        Shuffles the edge list of every vertex.
+
+        Parameters
+        ----------
+        rng: random.Random
+            Random number generator. A seeded one gives always the
+            same order for the same graph.
+        """
+        for v in self.vertex:
+            v.shuffle_edges(rng)
+
+    # -------------------------
+    # Clear
+    # -------------------------
+    def clear(self) -> None:
+        """Removes all vertices and edges of graph."""
+        self.vertex.clear()
+        self.edge.clear()
+        self.vertex_dict.clear()
+        self.edge_dict.clear()
+        self._reset_columns()
+        Vertex.id = 0
+        Edge.id = 0
+        for observer in self.observers:
+            observer.on_graph_cleared()
+
+    # -------------------------
+    # Load
+    # -------------------------
+    def load(self, data: dict) -> None:
+        """
+        Replaces this graph by the content of a graph JSON object. The
+        endpoints of edges are resolved with an index of vertices by ID,
+        so the load time is linear in the size of graph. Duplicated IDs
+        and edges connected to missing vertices are reported before the
+        current graph is changed.
+
+        Parameters
+        ----------
+        data: dict
+            Object with keys "bidirectional", "vertex" and "edge".
+
+        Raises
+        ------
+        ValueError
+            If a vertex or edge ID is duplicated, or an edge connects
+            to a vertex that does not exist.
+        """
+        index = {}
+        for i, v in enumerate(data["vertex"]):
+            if v["id"] in index:
+                raise ValueError(f"Duplicated vertex id {v['id']}.")
+            index[v["id"]] = i
+        edge_a = []
+        edge_b = []
+        for e in data["edge"]:
+            a = index.get(e["a"])
+            b = index.get(e["b"])
+            if a is None or b is None:
+                missing = e["a"] if a is None else e["b"]
+                raise ValueError(
+                    f"Edge {e['id']} connects to missing vertex {missing}."
+                )
+            edge_a.append(a)
+            edge_b.append(b)
+        self.load_arrays(
+            data.get("bidirectional", True),
+            [v["id"] for v in data["vertex"]],
+            [v.get("name", "") for v in data["vertex"]],
+            [v["x"] for v in data["vertex"]],
+            [v["y"] for v in data["vertex"]],
+            [e["id"] for e in data["edge"]],
+            edge_a,
+            edge_b,
+            [e.get("weight", 1) for e in data["edge"]],
+        )
+
+    # -------------------------
+    # Load Arrays
+    # -------------------------
+    def load_arrays(
+        self,
+        bidirectional: bool,
+        vertex_ids,
+        names,
+        xs,
+        ys,
+        edge_ids,
+        edge_a,
+        edge_b,
+        weights,
+    ) -> None:
+        """
+        Replaces this graph by vertices and edges given as parallel
+        sequences, one item per vertex or edge. Edge endpoints are the
+        positions of vertices in the sequences, so no lookup is needed.
+        Edges of each vertex are kept in the order of the sequences;
+        they are shuffled with the seed of each execution (see
+        Engine.seed_execution).
+
+        Parameters
+        ----------
+        bidirectional: bool
+            If the edges of graph have no direction.
+        vertex_ids, names, xs, ys: sequence
+            ID, name and position of each vertex.
+        edge_ids, edge_a, edge_b, weights: sequence
+            ID, endpoint positions and weight of each edge.
+
+        Raises
+        ------
+        ValueError
+            If a vertex or edge ID is duplicated or an endpoint position
+            is out of range.
+        """
+        vertex: list[Vertex] = [
+            Vertex(name, x, y, self, vertex_id)
+            for vertex_id, name, x, y in zip(vertex_ids, names, xs, ys)
+        ]
+        vertex_dict = {}
+        for i, v in enumerate(vertex):
+            if v.id in vertex_dict:
+                raise ValueError(f"Duplicated vertex id {v.id}.")
+            vertex_dict[v.id] = v
+            v.index = i
+        size = len(vertex)
+        edge: list[Edge] = []
+        edge_dict = {}
+        for edge_id, ia, ib, w in zip(edge_ids, edge_a, edge_b, weights):
+            if edge_id in edge_dict:
+                raise ValueError(f"Duplicated edge id {edge_id}.")
+            if not (0 <= ia < size and 0 <= ib < size):
+                raise ValueError(f"Edge {edge_id} connects to missing vertex.")
+            a = vertex[ia]
+            b = vertex[ib]
+            new = Edge(a, b, w, self, id=edge_id)
+            new.index = len(edge)
+            edge.append(new)
+            edge_dict[edge_id] = new
+            a.edge.append(new)
+            b.edge.append(new)
+            a.neighbor[b.id] = new
+            b.neighbor[a.id] = new
+
+        self.bidirectional = bidirectional
+        self.vertex = vertex
+        self.edge = edge
+        self.vertex_dict = vertex_dict
+        self.edge_dict = edge_dict
+        self.epoch = 0
+        self.vertex_state = bytearray(len(vertex))
+        self.vertex_epoch = array("Q", [0]) * len(vertex)
+        self.active_edges = array("l", [0]) * len(vertex)
+        self.edge_state = bytearray(len(edge))
+        self.edge_epoch = array("Q", [0]) * len(edge)
+        for observer in self.observers:
+            observer.on_graph_loaded()
+
+    # -------------------------
+    # Load File
+    # -------------------------
+    def load_file(self, filename: str) -> None:
+        """
+        Load a graph file, in JSON or binary format (see graph_binary).
+
+        Parameters
+        ----------
+        filename: str
+            Name and path of graph file.
+        """
+        if filename.lower().endswith(graph_binary.EXTENSION):
+            graph_binary.read_graph(filename, self)
+            return
+        with open(filename) as f:
+            data = json.load(f)
+        self.load(data)
+
+    # -------------------------
+    # Save File
+    # -------------------------
+    def save_file(self, filename: str, compact: bool = False) -> None:
+        """
+        Save the graph in a file, JSON or binary according to the file
+        extension (see save_graph_data).
+
+        Parameters
+        ----------
+        filename: str
+            Name and path of graph file.
+        compact: bool
+            One record per line in JSON format.
+        """
+        save_graph_data(self.get_json(), filename, compact)
+
+    # -------------------------
+    # Get JSON
+    # -------------------------
+    def get_json(self) -> dict:
+        """
+        Returns the JSON object representing this graph. IDs of
+        vertices and edges are reindexed (0, 1, 2...) without changing
+        the original elements.
+        """
+        # 1. Mapeia ID antigo -> Novo ID (0, 1, 2...)
+        v_map = {v.id: i for i, v in enumerate(self.vertex)}
+
+        # 2. Gera a lista de JSON de vértices com IDs novos
+        vertex_json: list[dict] = []
+        for i, v in enumerate(self.vertex):
+            v_data = v.get_json()
+            v_data["id"] = i  # Reindexa apenas aqui no dicionário temporário
+            vertex_json.append(v_data)
+
+        # 3. Gera a lista de JSON de arestas traduzindo as conexões
+        edge_json: list[dict] = []
+        for i, e in enumerate(self.edge):
+            e_data = e.get_json()
+            e_data["id"] = i
+            # Traduzimos a referência usando o mapa, sem alterar e.a original
+            e_data["a"] = v_map[e.a.id]
+            e_data["b"] = v_map[e.b.id]
+            edge_json.append(e_data)
+
+        return {
+            "bidirectional": self.bidirectional,
+            "vertex": vertex_json,
+            "edge": edge_json,
+        }
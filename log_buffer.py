@@ -0,0 +1,150 @@
+from collections import deque
+from threading import Lock
+
+
+# -------------------------
+# Log Buffer Class
+# -------------------------
+class LogBuffer:
+    """
+    Lines of the log of the interface, kept in memory up to max_lines
+    (the oldest lines are dropped), so a script that writes many lines
+    does not fill the memory. Lines can be written by any thread; the
+    lines not shown yet are taken by the main loop, all at once, to be
+    inserted in the log widget.
+
+    Optionally, every line is also written to a file (the sink), so the
+    whole log can be saved without the limit of lines. The sink is
+    created when it is set and then only appended, for the whole
+    session: clear() does not empty it, and mark() writes separators
+    between executions.
+
+    Attributes
+    ----------
+    max_lines: int
+        Number of lines kept in memory and shown in the widget.
+    filename: str
+        File of the sink, empty if there is no sink.
+    """
+
+    MAX_LINES = 5000  # Default number of lines kept
+
+    def __init__(self, max_lines: int = MAX_LINES, filename: str = ""):
+        """
+        Parameters
+        ----------
+        max_lines: int
+            Number of lines kept in memory.
+        filename: str
+            File of the sink, empty for no sink.
+        """
+        self._lock = Lock()
+        self.max_lines = max(int(max_lines), 1)
+        self.lines = deque(maxlen=self.max_lines)
+        self.pending = deque(maxlen=self.max_lines)  # Not shown yet
+        self.filename = ""
+        self.file = None
+        self.set_file(filename)
+
+    # -------------------------
+    # Set File
+    # -------------------------
+    def set_file(self, filename: str) -> None:
+        """
+        Changes the file of the sink, empty for no sink. The file is
+        created again, with the lines kept in memory.
+
+        Raises
+        ------
+        OSError
+            If the file can not be created. There is no sink then.
+        """
+        with self._lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.filename = ""
+            if filename:
+                self.file = open(filename, "w", encoding="utf-8")
+                self.filename = filename
+                self.file.writelines(self.lines)
+
+    # -------------------------
+    # Set Max Lines
+    # -------------------------
+    def set_max_lines(self, max_lines: int) -> None:
+        """Changes the number of lines kept in memory."""
+        with self._lock:
+            self.max_lines = max(int(max_lines), 1)
+            self.lines = deque(self.lines, maxlen=self.max_lines)
+            self.pending = deque(self.pending, maxlen=self.max_lines)
+
+    # -------------------------
+    # Write
+    # -------------------------
+    def write(self, line: str, sink: bool = True) -> None:
+        """
+        Adds a line, ended by a new line character. With sink False,
+        the line is not written to the sink file (e.g. lines of a
+        replay, already written when they were recorded).
+        """
+        with self._lock:
+            self.lines.append(line)
+            self.pending.append(line)
+            if sink and self.file is not None:
+                self.file.write(line)
+
+    # -------------------------
+    # Mark
+    # -------------------------
+    def mark(self, text: str) -> None:
+        """Writes a separator line with text only to the sink file."""
+        with self._lock:
+            if self.file is not None:
+                self.file.write(f"----- {text} -----\n")
+
+    # -------------------------
+    # Take
+    # -------------------------
+    def take(self) -> list[str]:
+        """
+        Returns the lines written since the last call, at most
+        max_lines, and marks them as shown.
+        """
+        with self._lock:
+            lines = list(self.pending)
+            self.pending.clear()
+        return lines
+
+    # -------------------------
+    # Get Text
+    # -------------------------
+    def get_text(self) -> str:
+        """Returns the lines kept in memory."""
+        with self._lock:
+            return "".join(self.lines)
+
+    # -------------------------
+    # Flush
+    # -------------------------
+    def flush(self) -> None:
+        """Writes the lines waiting in the buffer of the sink file."""
+        with self._lock:
+            if self.file is not None:
+                self.file.flush()
+
+    # -------------------------
+    # Clear
+    # -------------------------
+    def clear(self) -> None:
+        """Removes all lines kept in memory. The sink file is kept."""
+        with self._lock:
+            self.lines.clear()
+            self.pending.clear()
+
+    # -------------------------
+    # Close
+    # -------------------------
+    def close(self) -> None:
+        """Closes the sink file, if any."""
+        self.set_file("")
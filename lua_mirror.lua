@@ -0,0 +1,318 @@
+-- =========================
+-- Lua Mirror
+-- =========================
+--- Native copy of the graph for Lua scripts (see lua_mirror.py).
+---
+--- Vertices and edges are plain Lua tables with the same methods of
+--- the proxies, so scripts run without changes, but without calling
+--- Python for each method. State changes are kept in Lua and sent to
+--- the application in a single call, at each app:step() and at the
+--- end of the execution.
+---
+--- Arguments of this chunk:
+--- proxy: the LuaAppProxy of the execution.
+--- ACTIVE, NONE: states of the application.
+--- The next arguments are 1-based tables with the graph data. Vertex
+--- and edge positions in these tables are 0-based, as in Python.
+
+local proxy, ACTIVE, NONE,
+      vertex_ids, names, xs, ys, vertex_states, active_edges,
+      edge_ids, edge_a, edge_b, weights, edge_states,
+      offsets, incident = ...
+
+local Vertex = {}
+Vertex.__index = Vertex
+
+local Edge = {}
+Edge.__index = Edge
+
+local vertices = {}
+local edges = {}
+local vertex_by_id = {}
+local edge_by_id = {}
+local dirty_vertices = {} -- Vertices with state changed since last flush
+local dirty_edges = {} -- Edges with state changed since last flush
+
+for i = 1, #vertex_ids do
+    local v = setmetatable({
+        id = vertex_ids[i],
+        index = i,
+        name = names[i],
+        x = xs[i],
+        y = ys[i],
+        state = vertex_states[i],
+        active = active_edges[i],
+        edge = {},
+        neighbor = {},
+        vars = {},
+        dirty = false,
+    }, Vertex)
+    vertices[i] = v
+    vertex_by_id[v.id] = v
+end
+
+for i = 1, #edge_ids do
+    local e = setmetatable({
+        id = edge_ids[i],
+        index = i,
+        a = vertices[edge_a[i] + 1],
+        b = vertices[edge_b[i] + 1],
+        weight = weights[i],
+        state = edge_states[i],
+        dirty = false,
+    }, Edge)
+    edges[i] = e
+    edge_by_id[e.id] = e
+end
+
+-- Edge list of each vertex, in the same order of the graph
+for i = 1, #vertices do
+    local v = vertices[i]
+    local list = v.edge
+    for k = offsets[i] + 1, offsets[i + 1] do
+        local e = edges[incident[k] + 1]
+        list[#list + 1] = e
+        if e.a == v then
+            v.neighbor[e.b.id] = e
+        else
+            v.neighbor[e.a.id] = e
+        end
+    end
+end
+
+-- -------------------------
+-- State Set
+-- -------------------------
+--- Returns a state or a table of states as a set, or nil.
+local function state_set(states)
+    if states == nil then
+        return nil
+    end
+    local set = {}
+    if type(states) == "table" then
+        for _, state in pairs(states) do
+            set[state] = true
+        end
+    else
+        set[states] = true
+    end
+    return set
+end
+
+-- -------------------------
+-- Vertex
+-- -------------------------
+function Vertex:get_type() return "VertexProxy" end
+function Vertex:get_id() return self.id end
+function Vertex:get_index() return self.index end
+function Vertex:get_name() return self.name end
+function Vertex:get_x() return self.x end
+function Vertex:get_y() return self.y end
+function Vertex:get_coords() return self.x, self.y end
+function Vertex:get_state() return self.state end
+function Vertex:set_var(name, value) self.vars[name] = value end
+function Vertex:get_var(name) return self.vars[name] end
+function Vertex:get_edge_size() return #self.edge end
+function Vertex:get_active_edge_size() return self.active end
+function Vertex:get_edge(index) return self.edge[index] end
+function Vertex:get_edge_to(other) return self.neighbor[other.id] end
+function Vertex:is_connected(other) return self.neighbor[other.id] ~= nil end
+
+function Vertex:set_state(state)
+    self.state = state
+    if not self.dirty then
+        self.dirty = true
+        dirty_vertices[#dirty_vertices + 1] = self
+    end
+end
+
+function Vertex:get_adjacent(edge)
+    if not edge then
+        return nil
+    end
+    if edge.a.id == self.id then
+        return edge.b
+    end
+    return edge.a
+end
+
+function Vertex:neighbors(edge_state, vertex_state, not_edge_state, not_vertex_state)
+    edge_state = state_set(edge_state)
+    vertex_state = state_set(vertex_state)
+    not_edge_state = state_set(not_edge_state)
+    not_vertex_state = state_set(not_vertex_state)
+    local items = {}
+    for _, e in ipairs(self.edge) do
+        local adjacent = e.a
+        if adjacent == self then
+            adjacent = e.b
+        end
+        if (edge_state == nil or edge_state[e.state])
+            and (not_edge_state == nil or not not_edge_state[e.state])
+            and (vertex_state == nil or vertex_state[adjacent.state])
+            and (not_vertex_state == nil or not not_vertex_state[adjacent.state]) then
+            items[#items + 1] = e
+            items[#items + 1] = adjacent
+        end
+    end
+    local i = -1
+    return function()
+        i = i + 2
+        return items[i], items[i + 1]
+    end
+end
+
+-- -------------------------
+-- Edge
+-- -------------------------
+function Edge:get_type() return "EdgeProxy" end
+function Edge:get_id() return self.id end
+function Edge:get_index() return self.index end
+function Edge:get_weight() return self.weight end
+function Edge:get_state() return self.state end
+function Edge:get_a() return self.a end
+function Edge:get_b() return self.b end
+
+function Edge:set_weight(weight)
+    self.weight = weight
+    proxy:get_edge_by_index(self.index):set_weight(weight)
+end
+
+function Edge:set_state(state)
+    if self.state ~= ACTIVE and state == ACTIVE then
+        self.a.active = self.a.active + 1
+        self.b.active = self.b.active + 1
+    elseif self.state == ACTIVE and state ~= ACTIVE then
+        self.a.active = self.a.active - 1
+        self.b.active = self.b.active - 1
+    end
+    self.state = state
+    if not self.dirty then
+        self.dirty = true
+        dirty_edges[#dirty_edges + 1] = self
+    end
+end
+
+function Edge:get_adjacent(vertex)
+    if self.a == vertex then
+        return self.b
+    elseif self.b == vertex then
+        return self.a
+    end
+    return nil
+end
+
+-- -------------------------
+-- Flush
+-- -------------------------
+--- Groups the IDs of changed elements by state and clears them.
+local function changes(dirty)
+    local by_state = {}
+    for i = 1, #dirty do
+        local element = dirty[i]
+        local ids = by_state[element.state]
+        if ids == nil then
+            ids = {}
+            by_state[element.state] = ids
+        end
+        ids[#ids + 1] = element.id
+        element.dirty = false
+        dirty[i] = nil
+    end
+    return by_state
+end
+
+--- Sends the state changes to the application in a single call.
+local function flush()
+    if #dirty_vertices == 0 and #dirty_edges == 0 then
+        return
+    end
+    proxy:apply_states(changes(dirty_vertices), changes(dirty_edges))
+end
+
+-- -------------------------
+-- App
+-- -------------------------
+local app = {flush = flush}
+
+function app:log(text) proxy:log(text) end
+function app:log_enabled(symbol) return proxy:log_enabled(symbol) end
+function app:logf(symbol, fmt, ...)
+    if proxy:log_enabled(symbol) then
+        proxy:log(symbol .. string.format(fmt, ...))
+    end
+end
+function app:area_add(x, y) proxy:area_add(x, y) end
+function app:area_close() proxy:area_close() end
+function app:set_execution_time(time) proxy:set_execution_time(time) end
+function app:set_solved(solved) proxy:set_solved(solved) end
+function app:is_stopped() return proxy:is_stopped() end
+function app:get_var(name) return proxy:get_var(name) end
+function app:random(m, n) return proxy:random(m, n) end
+function app:get_adjacency() return proxy:get_adjacency() end
+function app:get_vertex_size() return #vertices end
+function app:get_edge_size() return #edges end
+function app:get_vertex(index) return vertices[index] end
+function app:get_vertex_by_index(index) return vertices[index] end
+function app:get_edge_by_index(index) return edges[index] end
+function app:get_vertex_by_id(id) return vertex_by_id[id] end
+function app:get_edge_by_id(id) return edge_by_id[id] end
+
+function app:step()
+    flush()
+    proxy:step()
+end
+
+function app:set_vertex_states(ids, state)
+    for _, id in pairs(ids) do
+        local v = vertex_by_id[id]
+        if v then
+            v:set_state(state)
+        end
+    end
+end
+
+function app:set_edge_states(ids, state)
+    for _, id in pairs(ids) do
+        local e = edge_by_id[id]
+        if e then
+            e:set_state(state)
+        end
+    end
+end
+
+function app:reset_states(state_filter)
+    if state_filter == nil then
+        -- Everything changes, so it's cheaper to reset the application
+        for i = 1, #dirty_vertices do
+            dirty_vertices[i].dirty = false
+            dirty_vertices[i] = nil
+        end
+        for i = 1, #dirty_edges do
+            dirty_edges[i].dirty = false
+            dirty_edges[i] = nil
+        end
+        for _, v in ipairs(vertices) do
+            v.state = NONE
+            v.active = 0
+        end
+        for _, e in ipairs(edges) do
+            e.state = NONE
+        end
+        proxy:reset_states()
+        return
+    end
+    local states = state_set(state_filter)
+    for _, e in ipairs(edges) do
+        if states[e.state] then
+            e:set_state(NONE)
+        end
+    end
+    for _, v in ipairs(vertices) do
+        if states[v.state] then
+            v:set_state(NONE)
+        end
+    end
+end
+
+return app
@@ -0,0 +1,59 @@
+import os
+from state import State
+
+MIRROR_FILE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "lua_mirror.lua"
+)
+
+
+# -------------------------
+# Create Mirror
+# -------------------------
+def create_mirror(chunk, lua, app_proxy, graph):
+    """
+    Copies the graph to plain Lua tables, with the same methods of the
+    proxies, so Lua scripts run without calling Python for each vertex
+    or edge. State changes are sent back to the graph in batches, at
+    each app:step() and when the mirror is flushed.
+
+    Parameters
+    ----------
+    chunk: function
+        The file MIRROR_FILE loaded in the Lua runtime.
+    lua: LuaRuntime
+        Lua runtime of the execution.
+    app_proxy: LuaAppProxy
+        Interface of the application, used by the mirror to call it.
+    graph: GraphModel
+        Graph to copy.
+
+    Returns
+    -------
+    table
+        Lua object to be used as the global app of the script. Its
+        function flush() sends the pending state changes.
+    """
+    offsets = [0]
+    incident = []
+    for v in graph.vertex:
+        incident.extend(e.index for e in v.edge)
+        offsets.append(len(incident))
+    table = lua.table_from
+    return chunk(
+        app_proxy,
+        State.ACTIVE,
+        State.NONE,
+        table([v.id for v in graph.vertex]),
+        table([v.name for v in graph.vertex]),
+        table([v.x for v in graph.vertex]),
+        table([v.y for v in graph.vertex]),
+        table([v.get_state() for v in graph.vertex]),
+        table([v.get_active_edge_size() for v in graph.vertex]),
+        table([e.id for e in graph.edge]),
+        table([e.a.index for e in graph.edge]),
+        table([e.b.index for e in graph.edge]),
+        table([e.weight for e in graph.edge]),
+        table([e.get_state() for e in graph.edge]),
+        table(offsets),
+        table(incident),
+    )
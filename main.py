@@ -21,21 +21,160 @@ execution of various algorithms to manipulate the graph's structure and
 behavior.
 
 Usage:
-    python3 main.py graph=graphs/dodecahedron.json script=scripts/bfs.lua
+    python3 main.py graph=graphs/dodecahedron.json script=scripts/bfs.lua seed=42
+    python3 main.py --headless graph=graphs/cube.json script=scripts/bfs.lua runs=10
+    python3 main.py --headless graph=graphs/cube.json script=scripts/bfs.lua trace=bfs.trace
 
 Note:
     - The 'graph' parameter specifies the graph file (optional).
     - The 'script' parameter specifies the algorithm script (optional).
+    - The 'seed' parameter fixes the seed of the random number generator,
+      so executions can be repeated exactly (optional).
     - If no parameters are passed, the program will interactively request
       the user to select the files.
+    - The '--headless' option runs the script without graphic interface,
+      prints the results in JSON format and exits with status 0 if the
+      script solved the graph, 1 if not and 2 on errors. Both 'graph'
+      and 'script' are required.
+    - The 'runs' parameter repeats the headless execution and reports the
+      minimum, median and 95th percentile of times (optional).
+    - The 'trace' parameter records the trace of the headless execution in
+      a file, to be replayed in the graphic interface (File > Open Trace).
+      With many runs, the file has the trace of the last one (optional).
 
 This software is open-source and free to use and modify under the BSD 3-Clause
 License.
 """
 
 import sys
-from app import App
-import tkinter as tk
+import json
+import math
+import time
+import statistics
+from engine import Engine
+
+
+# -------------------------
+# Time Summary
+# -------------------------
+def time_summary(times):
+    """Returns the minimum, median and 95th percentile of times."""
+    ordered = sorted(times)
+    p95 = ordered[max(math.ceil(0.95 * len(ordered)) - 1, 0)]
+    return {
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "p95": p95,
+    }
+
+
+# -------------------------
+# Headless
+# -------------------------
+def headless(
+    graph: str, script: str, seed=None, runs: int = 1, trace: str = ""
+) -> int:
+    """
+    Runs a script on a graph without graphic interface, without
+    animation or pauses, and prints the results in JSON format.
+
+    Parameters
+    ----------
+    graph: str
+        graph path and filename.
+    script: str
+        script path and filename.
+    seed: int
+        seed of the executions. If None, each execution takes the seed
+        of the script properties or a new one.
+    runs: int
+        number of executions.
+    trace: str
+        file where the trace of the last execution is saved, if not empty.
+
+    Returns
+    -------
+    int
+        exit status: 0 if every execution solved the graph, 1 if some
+        did not and 2 on errors.
+    """
+    if not graph or not script:
+        print("Headless mode needs graph= and script=.", file=sys.stderr)
+        return 2
+    engine = Engine()
+    try:
+        engine.load_graph(graph)
+        engine.load_script(script)
+    except Exception as e:
+        print(f"Error loading files: {e}", file=sys.stderr)
+        return 2
+    engine.record_trace = bool(trace)
+    results = []
+    status = 0
+    for _ in range(runs):
+        engine.graph.reset_states()
+        engine.start_execution(seed)
+        start = time.perf_counter()
+        ok = engine.execute()
+        wall_time = time.perf_counter() - start
+        results.append(
+            {
+                "seed": engine.seed,
+                "ok": ok,
+                "solved": bool(engine.solved),
+                "execution_time": engine.execution_time,
+                "wall_time": wall_time,
+                "path_size": engine.get_path_size(),
+                "log": engine.logs,
+            }
+        )
+        if not ok:
+            status = 2
+        elif not engine.solved and status == 0:
+            status = 1
+    if trace:
+        try:
+            engine.trace.save(trace)
+        except OSError as e:
+            print(f"Error saving trace: {e}", file=sys.stderr)
+            status = 2
+    report = {
+        "graph": graph,
+        "script": script,
+        "vertices": engine.get_vertex_size(),
+        "edges": engine.get_edge_size(),
+        "runs": results,
+        "summary": {
+            "runs": runs,
+            "solved": sum(1 for r in results if r["solved"]),
+            "execution_time": time_summary(r["execution_time"] for r in results),
+            "wall_time": time_summary(r["wall_time"] for r in results),
+        },
+    }
+    print(json.dumps(report, indent=2))
+    return status
+
+
+# -------------------------
+# Parse Int
+# -------------------------
+def parse_int(arg: str) -> int:
+    """
+    Returns the integer value of an argument name=value. On an invalid
+    value, prints the usage and exits with status 2 (error), not 1,
+    which means an execution that did not solve the graph.
+    """
+    name, value = arg.split("=", 1)
+    try:
+        return int(value)
+    except ValueError:
+        print(f"Invalid {name}={value}: {name} must be an integer.", file=sys.stderr)
+        print(
+            "Usage: main.py [--headless] graph=FILE script=FILE "
+            "[seed=N] [runs=N] [trace=FILE]",
+            file=sys.stderr,
+        )
+        sys.exit(2)
 
 
 # -------------------------
@@ -51,18 +190,44 @@ def main():
         graph path and filename.
     script: str
         script path and filename.
+    seed: int
+        seed of the random number generator of executions.
+    runs: int
+        number of executions in headless mode.
+    trace: str
+        file of the trace of the headless execution.
     """
     args = sys.argv[1:]
     graph: str = ""
     script: str = ""
+    seed = None
+    runs = 1
+    trace = ""
+    is_headless = False
     for arg in args:
-        if arg.startswith("graph="):
+        if arg == "--headless":
+            is_headless = True
+        elif arg.startswith("runs="):
+            runs = max(parse_int(arg), 1)
+        elif arg.startswith("graph="):
             graph = arg.split("=", 1)[1]
         elif arg.startswith("script="):
             script = arg.split("=", 1)[1]
+        elif arg.startswith("seed="):
+            seed = parse_int(arg)
+        elif arg.startswith("trace="):
+            trace = arg.split("=", 1)[1]
+
+    if is_headless:
+        sys.exit(headless(graph, script, seed, runs, trace))
+
+    import tkinter as tk
+    from app import App
 
     root = tk.Tk()
-    app: App = App(master=root, filename=graph, script_lua=script)
+    app: App = App(
+        master=root, filename=graph, script_lua=script, seed=seed
+    )
     app.mainloop()
 
 
@@ -17,6 +17,10 @@ class Properties:
         The frame where the properties are displayed.
     attr : dict
         The properties loaded from the JSON file.
+    values : dict
+        Plain copy of the values of the properties, kept updated by
+        the main loop, so the script thread can read them without
+        calling Tk.
     filename : str
         The name of the JSON file.
     name : str
@@ -33,6 +37,7 @@ class Properties:
         """
         self.frame = frame
         self.attr = None
+        self.values = {}
         name, extension = os.path.splitext(filename)
         self.filename = name + ".json"
         self.name = os.path.splitext(os.path.basename(filename))[0]
@@ -60,6 +65,7 @@ class Properties:
         self.frame.grid_columnconfigure(0, weight=1)
         self.frame.grid_columnconfigure(1, weight=1)
         row += 1
+        self.values = dict(self.attr)
 
         for key, value in self.attr.items():
             if key.endswith("_min") or key.endswith("_max"):
@@ -72,6 +78,7 @@ class Properties:
                 cb = tk.Checkbutton(self.frame, variable=var, command=self.save)
                 cb.grid(row=row, column=1, sticky="e", padx=(2, 2))
                 self.attr[key] = var
+                self.watch(key, var)
                 row += 1
 
             elif isinstance(value, int):
@@ -100,6 +107,7 @@ class Properties:
                     scale_label_value.grid(row=row, column=1, sticky="w", padx=(2, 10))
 
                     self.attr[key] = var
+                    self.watch(key, var)
                     row += 1
                 else:
                     label = tk.Label(self.frame, text=key)
@@ -145,11 +153,7 @@ class Properties:
         object
             The value of the attribute.
         """
-        try:
-            val = self.attr[name]
-            return val.get() if isinstance(val, (tk.BooleanVar, tk.IntVar, tk.DoubleVar)) else val
-        except KeyError:
-            return None
+        return self.values.get(name)
 
     # --------------------------
     # Set Attribute
@@ -165,11 +169,29 @@ class Properties:
         value : object
             The value to set.
         """
+        self.values[name] = value
         if isinstance(self.attr[name], (tk.BooleanVar, tk.IntVar, tk.DoubleVar)):
             self.attr[name].set(value)
         else:
             self.attr[name] = value
 
+    # --------------------------
+    # Watch
+    # --------------------------
+    def watch(self, name, var):
+        """
+        Keeps the plain value of an attribute updated when its
+        variable changes.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+        var : tkinter.Variable
+            The variable of the attribute.
+        """
+        var.trace_add("write", lambda *args: self.values.__setitem__(name, var.get()))
+
     # --------------------------
     # Load
     # --------------------------
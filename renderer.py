@@ -0,0 +1,900 @@
+import time
+import tkinter as tk
+from state import State
+from vertex import Vertex
+from edge import Edge
+from graph_model import GraphModel, GraphObserver
+from spatial_index import SpatialIndex
+
+
+# -------------------------
+# Graph Renderer Class
+# -------------------------
+class GraphRenderer(GraphObserver):
+    """
+    Draws a GraphModel on a tkinter canvas. It is attached to the graph
+    as an observer, so the vertices and edges don't need to know
+    anything about the graphic interface. Changes made by the script
+    thread are drawn by the main loop, through app.ui (see UIQueue).
+
+    Attributes
+    ----------
+    app: App
+        Context of interface application (colors, flags and events).
+    canvas: tk.Canvas
+        Canvas where the graph is drawn.
+    graph: GraphModel
+        Graph to be drawn.
+    scale: float
+        Current zoom of canvas.
+    offset_x, offset_y: float
+        Translation of canvas caused by zoom around the mouse position.
+    vertex_items: dict
+        Canvas item (circle) of each vertex in the region.
+    edge_items: dict
+        Canvas item (line) of each edge in the region.
+    vertex_labels, edge_labels: dict
+        Canvas items of names of vertices and weights of edges, only
+        of the labels that are shown.
+    index: SpatialIndex
+        Positions of the vertices and edges of the graph.
+    region: tuple or None
+        Rectangle (x0, y0, x1, y1) of graph positions whose elements
+        have canvas items, None before the first rebuild.
+    rebuild_job: str
+        Identifier of the pending after() call of a rebuild in progress.
+    hovered: Vertex, Edge or None
+        Element under the mouse.
+    pressed: Vertex, Edge or None
+        Element where the mouse button 1 was pressed, while it is down.
+
+    Only the elements in the visible area of the canvas, plus a margin
+    of MARGIN times its size on each side, have canvas items. When the
+    visible area leaves the region (scroll, zoom or resize), the items
+    out of the new region are deleted and the missing ones created, so
+    the cost of drawing, zooming and panning depends on what is seen,
+    not on the size of the graph.
+
+    The level of detail depends on the zoom: labels are created only
+    when the zoom is at least LABEL_SCALE (weights only if show_weight
+    is on) and removed below it, and vertex outlines and arrowheads are
+    only drawn when the zoom is at least SHAPE_SCALE. So a big graph
+    seen as a whole has few items and simple ones to draw and scale.
+    """
+
+    BATCH_TIME = 0.03  # Seconds spent creating items before yielding to Tk
+    LABEL_SCALE = 0.6  # Minimum zoom to show labels
+    SHAPE_SCALE = 0.35  # Minimum zoom to draw vertex outlines and arrowheads
+    MARGIN = 0.5  # Margin of the region around the visible area
+    PADDING = 30  # Pixels around the graph in the scroll region
+    HIT_TOLERANCE = 4  # Pixels around vertices and edges that hit them
+
+    def __init__(self, app, canvas: tk.Canvas, graph: GraphModel):
+        self.app = app
+        self.canvas = canvas
+        self.graph = graph
+        self.scale = 1.0
+        self.offset_x = 0.0
+        self.offset_y = 0.0
+        self.vertex_items: dict[Vertex, int] = {}
+        self.edge_items: dict[Edge, int] = {}
+        self.vertex_labels: dict[Vertex, int] = {}
+        self.edge_labels: dict[Edge, int] = {}
+        self.index = SpatialIndex()
+        self.region = None
+        self.rebuild_job = None
+        self.hovered = None
+        self.pressed = None
+        self.detailed, self.names_shown, self.weights_shown = self.get_detail()
+        self.bind_events()
+        graph.attach(self)
+
+    # -------------------------
+    # Set Graph
+    # -------------------------
+    def set_graph(self, graph: GraphModel) -> None:
+        """Changes the graph drawn by this renderer."""
+        self.cancel_rebuild()
+        self.graph.detach(self)
+        self.graph = graph
+        self.index.clear()
+        graph.attach(self)
+
+    # -------------------------
+    # To Canvas
+    # -------------------------
+    def to_canvas(self, x, y) -> tuple[float, float]:
+        """Converts a graph position to a canvas position."""
+        return x * self.scale + self.offset_x, y * self.scale + self.offset_y
+
+    # -------------------------
+    # To Model
+    # -------------------------
+    def to_model(self, x, y) -> tuple[float, float]:
+        """Converts a canvas position to a graph position."""
+        return (x - self.offset_x) / self.scale, (y - self.offset_y) / self.scale
+
+    # -------------------------
+    # Vertex Coordinates
+    # -------------------------
+    def vertex_coords(self, vertex: Vertex) -> tuple[float, float]:
+        """Returns the coordinates of a vertex on canvas."""
+        return self.to_canvas(vertex.x, vertex.y)
+
+    # -------------------------
+    # Visible Area
+    # -------------------------
+    def visible_area(self) -> tuple[float, float, float, float]:
+        """Returns the rectangle of graph positions seen on canvas."""
+        x0, y0 = self.to_model(self.canvas.canvasx(0), self.canvas.canvasy(0))
+        x1, y1 = self.to_model(
+            self.canvas.canvasx(self.canvas.winfo_width()),
+            self.canvas.canvasy(self.canvas.winfo_height()),
+        )
+        return x0, y0, x1, y1
+
+    # -------------------------
+    # In Region
+    # -------------------------
+    def in_region(self, x0, y0, x1, y1) -> bool:
+        """
+        Returns if a rectangle of graph positions overlaps the region.
+        Everything is in the region before it is set.
+        """
+        if self.region is None:
+            return True
+        rx0, ry0, rx1, ry1 = self.region
+        return x0 <= rx1 and x1 >= rx0 and y0 <= ry1 and y1 >= ry0
+
+    def vertex_in_region(self, vertex: Vertex) -> bool:
+        """Returns if a vertex is in the region."""
+        return self.in_region(vertex.x, vertex.y, vertex.x, vertex.y)
+
+    def edge_in_region(self, edge: Edge) -> bool:
+        """Returns if the bounding box of an edge overlaps the region."""
+        a, b = edge.a, edge.b
+        return self.in_region(
+            min(a.x, b.x), min(a.y, b.y), max(a.x, b.x), max(a.y, b.y)
+        )
+
+    # -------------------------
+    # Cull
+    # -------------------------
+    def cull(self) -> tuple[list[Edge], list[Vertex]]:
+        """
+        Sets the region around the visible area and deletes the items
+        of elements out of it. Returns the edges and the vertices of
+        the region without items.
+        """
+        x0, y0, x1, y1 = self.visible_area()
+        mx = (x1 - x0) * GraphRenderer.MARGIN
+        my = (y1 - y0) * GraphRenderer.MARGIN
+        self.region = (x0 - mx, y0 - my, x1 + mx, y1 + my)
+        vertices, edges = self.index.query(*self.region)
+        for vertex in [v for v in self.vertex_items if v not in vertices]:
+            self.delete_vertex_items(vertex)
+        for edge in [e for e in self.edge_items if e not in edges]:
+            self.delete_edge_items(edge)
+        return (
+            [e for e in edges if e not in self.edge_items],
+            [v for v in vertices if v not in self.vertex_items],
+        )
+
+    # -------------------------
+    # Update View
+    # -------------------------
+    def update_view(self) -> None:
+        """
+        Culls the items if the visible area is out of the region, or if
+        the region is more than twice the size it would have now (after
+        zooming in). Does nothing while items are created; it is called
+        again after them.
+        """
+        if self.rebuild_job is not None:
+            return
+        if self.region is not None:
+            x0, y0, x1, y1 = self.visible_area()
+            rx0, ry0, rx1, ry1 = self.region
+            size = 2 * (1 + 2 * GraphRenderer.MARGIN) * (x1 - x0)
+            if (
+                rx0 <= x0
+                and ry0 <= y0
+                and x1 <= rx1
+                and y1 <= ry1
+                and rx1 - rx0 <= size
+            ):
+                return
+        self.create_items(*self.cull())
+
+    # -------------------------
+    # Request View
+    # -------------------------
+    def request_view(self) -> None:
+        """
+        Calls update_view() in the next frame, once for all scroll and
+        resize events of the frame.
+        """
+        self.app.ui.post(self.update_view, key="view")
+
+    # -------------------------
+    # Update Scroll Region
+    # -------------------------
+    def update_scrollregion(self) -> None:
+        """Sets the scroll region of canvas around the graph and areas."""
+        bounds = self.index.bounds
+        if bounds is None:
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+            return
+        x0, y0 = self.to_canvas(bounds[0], bounds[1])
+        x1, y1 = self.to_canvas(bounds[2], bounds[3])
+        area = self.canvas.bbox("area")
+        if area is not None:
+            x0, y0 = min(x0, area[0]), min(y0, area[1])
+            x1, y1 = max(x1, area[2]), max(y1, area[3])
+        pad = GraphRenderer.PADDING + Vertex.radius * self.scale
+        self.canvas.configure(
+            scrollregion=(x0 - pad, y0 - pad, x1 + pad, y1 + pad)
+        )
+
+    # -------------------------
+    # Arrow Shape
+    # -------------------------
+    def arrow_shape(self) -> tuple[float, float, float]:
+        """Returns the arrow shape of directed edges for current zoom."""
+        return (10 * self.scale, 10 * self.scale, 5 * self.scale)
+
+    # -------------------------
+    # Get Detail
+    # -------------------------
+    def get_detail(self) -> tuple[bool, bool, bool]:
+        """
+        Returns the level of detail for the current zoom: if vertex
+        outlines and arrowheads are drawn, if names of vertices are
+        shown and if weights of edges are shown.
+        """
+        labels = self.scale >= GraphRenderer.LABEL_SCALE
+        return (
+            self.scale >= GraphRenderer.SHAPE_SCALE,
+            labels,
+            labels and bool(self.app.show_weight),
+        )
+
+    # -------------------------
+    # Update Detail
+    # -------------------------
+    def update_detail(self) -> None:
+        """
+        Changes the items of canvas to the level of detail of the
+        current zoom and show_weight. Labels are created or removed;
+        outlines and arrowheads are changed with one call over tags.
+        """
+        detailed, names, weights = self.get_detail()
+        if detailed != self.detailed:
+            self.detailed = detailed
+            self.canvas.itemconfig(
+                "vertex", width=Vertex.width if detailed else 0
+            )
+            if not self.graph.bidirectional:
+                self.canvas.itemconfig("edge", arrow=self.arrow())
+        if names != self.names_shown:
+            self.names_shown = names
+            self.canvas.delete("name")
+            self.vertex_labels.clear()
+            if names:
+                for vertex in self.vertex_items:
+                    self.create_vertex_label(vertex)
+        if weights != self.weights_shown:
+            self.weights_shown = weights
+            self.canvas.delete("weight")
+            self.edge_labels.clear()
+            if weights:
+                for edge in self.edge_items:
+                    self.create_edge_label(edge)
+        self.canvas.tag_raise("text")
+
+    # -------------------------
+    # Delete Item
+    # -------------------------
+    def delete_item(self, canvas_id: int | None) -> None:
+        """Deletes an item of canvas, if any."""
+        if canvas_id is not None:
+            self.canvas.delete(canvas_id)
+
+    def forget(self, element) -> None:
+        """Stops tracking an element under the mouse without items."""
+        if self.hovered is element:
+            self.hovered = None
+        if self.pressed is element:
+            self.pressed = None
+
+    def delete_vertex_items(self, vertex: Vertex) -> None:
+        """Deletes the circle and the label of a vertex, if any."""
+        self.forget(vertex)
+        self.delete_item(self.vertex_items.pop(vertex, None))
+        self.delete_item(self.vertex_labels.pop(vertex, None))
+
+    def delete_edge_items(self, edge: Edge) -> None:
+        """Deletes the line and the label of an edge, if any."""
+        self.forget(edge)
+        self.delete_item(self.edge_items.pop(edge, None))
+        self.delete_item(self.edge_labels.pop(edge, None))
+
+    # -------------------------
+    # Arrow
+    # -------------------------
+    def arrow(self) -> str:
+        """Returns the arrow of edges for the graph and level of detail."""
+        if self.graph.bidirectional or not self.detailed:
+            return "none"
+        return "last"
+
+    # -------------------------
+    # Create Vertex Items
+    # -------------------------
+    def create_vertex_items(self, vertex: Vertex) -> None:
+        """Creates the circle and the label of a vertex on canvas."""
+        x, y = self.vertex_coords(vertex)
+        r = Vertex.radius * self.scale
+        canvas_id = self.canvas.create_oval(
+            x - r,
+            y - r,
+            x + r,
+            y + r,
+            width=Vertex.width if self.detailed else 0,
+            fill=self.app.COLOR_NONE,
+            tags="vertex",
+        )
+        self.canvas.tag_raise(canvas_id)
+        self.vertex_items[vertex] = canvas_id
+        if self.names_shown:
+            self.create_vertex_label(vertex)
+        if vertex.get_state() != State.NONE:
+            self.draw_vertex(vertex)
+        if vertex is self.app.selected:
+            self.select(vertex)
+
+    # -------------------------
+    # Create Vertex Label
+    # -------------------------
+    def create_vertex_label(self, vertex: Vertex) -> None:
+        """Creates the name label of a vertex on canvas."""
+        x, y = self.vertex_coords(vertex)
+        self.vertex_labels[vertex] = self.canvas.create_text(
+            x,
+            y - 15 * self.scale,
+            text=vertex.name,
+            anchor="center",
+            font=("Arial", 12),
+            tags=("text", "name"),
+        )
+
+    # -------------------------
+    # Create Edge Items
+    # -------------------------
+    def create_edge_items(self, edge: Edge) -> None:
+        """Creates the line and the weight label of an edge on canvas."""
+        ax, ay = self.vertex_coords(edge.a)
+        bx, by = self.vertex_coords(edge.b)
+        canvas_id = self.canvas.create_line(
+            ax,
+            ay,
+            bx,
+            by,
+            arrow=self.arrow(),
+            arrowshape=self.arrow_shape(),
+            width=2,
+            fill=self.app.COLOR_NONE,
+            tags="edge",
+        )
+        self.canvas.tag_lower(canvas_id)
+        self.edge_items[edge] = canvas_id
+        if self.weights_shown:
+            self.create_edge_label(edge)
+        if edge.get_state() != State.NONE:
+            self.draw_edge(edge)
+        if edge is self.app.selected_edge:
+            self.select(edge)
+
+    # -------------------------
+    # Create Edge Label
+    # -------------------------
+    def create_edge_label(self, edge: Edge) -> None:
+        """Creates the weight label of an edge on canvas."""
+        ax, ay = self.vertex_coords(edge.a)
+        bx, by = self.vertex_coords(edge.b)
+        self.edge_labels[edge] = self.canvas.create_text(
+            (ax + bx) / 2,
+            (ay + by) / 2,
+            text=str(edge.weight),
+            anchor="center",
+            font=("Arial", 10),
+            fill="black",
+            tags=("text", "weight"),
+        )
+
+    # -------------------------
+    # Rebuild
+    # -------------------------
+    def rebuild(self, on_progress=None, on_done=None) -> None:
+        """
+        Removes every item of canvas, indexes the graph again and draws
+        the elements in the region (see create_items()).
+
+        Parameters
+        ----------
+        on_progress: callable
+            Called after each batch with (items created, total items).
+        on_done: callable
+            Called when all items were created.
+        """
+        self.cancel_rebuild()
+        self.canvas.delete("all")
+        self.vertex_items.clear()
+        self.edge_items.clear()
+        self.vertex_labels.clear()
+        self.edge_labels.clear()
+        self.hovered = None
+        self.pressed = None
+        self.detailed, self.names_shown, self.weights_shown = self.get_detail()
+        self.index.build(self.graph.vertex, self.graph.edge)
+        self.update_scrollregion()
+        edges, vertices = self.cull()
+        self.create_items(edges, vertices, on_progress, on_done)
+
+    # -------------------------
+    # Create Items
+    # -------------------------
+    def create_items(
+        self, edges: list[Edge], vertices: list[Vertex], on_progress=None, on_done=None
+    ) -> None:
+        """
+        Creates the items of edges and vertices in time-sliced batches
+        scheduled with after(), so the interface keeps responding while
+        a big graph is drawn. At the end, the view is updated again, for
+        the scrolls made in the meantime.
+
+        Parameters
+        ----------
+        edges, vertices: list
+            Elements to be drawn.
+        on_progress: callable
+            Called after each batch with (items created, total items).
+        on_done: callable
+            Called when all items were created.
+        """
+        self.cancel_rebuild()
+        total = len(edges) + len(vertices)
+        created = 0
+
+        def _batch():
+            nonlocal created
+            self.rebuild_job = None
+            deadline = time.perf_counter() + GraphRenderer.BATCH_TIME
+            while created < total and time.perf_counter() < deadline:
+                # Elements may be removed or drawn between batches
+                if created < len(edges):
+                    edge = edges[created]
+                    if edge in self.index.edge_cells and edge not in self.edge_items:
+                        self.create_edge_items(edge)
+                else:
+                    vertex = vertices[created - len(edges)]
+                    if (
+                        vertex in self.index.vertex_cell
+                        and vertex not in self.vertex_items
+                    ):
+                        self.create_vertex_items(vertex)
+                created += 1
+            if created < total:
+                if on_progress is not None:
+                    on_progress(created, total)
+                self.rebuild_job = self.canvas.after(1, _batch)
+                return
+            self.canvas.tag_lower("edge")
+            self.canvas.tag_raise("vertex")
+            self.canvas.tag_raise("text")
+            if on_done is not None:
+                on_done()
+            self.update_view()
+
+        _batch()
+
+    # -------------------------
+    # Cancel Rebuild
+    # -------------------------
+    def cancel_rebuild(self) -> None:
+        """
+        Cancels a rebuild or a creation of items in progress, if any.
+        The region is cleared, so the next update_view() culls again.
+        """
+        if self.rebuild_job is not None:
+            self.canvas.after_cancel(self.rebuild_job)
+            self.rebuild_job = None
+            self.region = None
+
+    # -------------------------
+    # Rebuild Edges
+    # -------------------------
+    def rebuild_edges(self) -> None:
+        """
+        Recreates the lines of all edges. It is necessary when the
+        graph changes between bidirectional and directed.
+        """
+        for e, canvas_id in list(self.edge_items.items()):
+            self.canvas.delete(canvas_id)
+            self.delete_item(self.edge_labels.pop(e, None))
+            self.create_edge_items(e)
+        self.draw()
+
+    # -------------------------
+    # Draw Vertex
+    # -------------------------
+    def draw_vertex(self, vertex: Vertex) -> None:
+        """Changes the color of a vertex according to its state."""
+        canvas_id = self.vertex_items.get(vertex)
+        if canvas_id is None:
+            return
+        state = vertex.get_state()
+        if state == State.NONE:
+            fill = self.app.COLOR_NONE
+        elif state == State.TESTING:
+            fill = self.app.COLOR_OVER
+        elif state == State.ACTIVE:
+            fill = self.app.COLOR_SELECTED
+        elif state == State.INVALID:
+            fill = self.app.COLOR_INVALID
+        else:
+            return
+        self.canvas.itemconfig(canvas_id, fill=fill)
+
+    # -------------------------
+    # Draw Edge
+    # -------------------------
+    def draw_edge(self, edge: Edge) -> None:
+        """Changes color and width of an edge according to its state."""
+        canvas_id = self.edge_items.get(edge)
+        if canvas_id is None:
+            return
+        state = edge.get_state()
+        if state == State.NONE:
+            self.canvas.itemconfig(canvas_id, fill=self.app.COLOR_NONE, width=2)
+        elif state == State.TESTING:
+            self.canvas.itemconfig(canvas_id, fill=self.app.COLOR_OVER, width=2)
+        elif state == State.ACTIVE:
+            self.canvas.itemconfig(
+                canvas_id,
+                fill=self.app.COLOR_SELECTED,
+                width=4,
+            )
+        elif state == State.INVALID:
+            self.canvas.itemconfig(
+                canvas_id,
+                fill=self.app.COLOR_INVALID,
+                width=2,
+            )
+
+    # -------------------------
+    # Draw
+    # -------------------------
+    def draw(self) -> None:
+        """Draw all edges and vertices"""
+        for edge in self.edge_items:
+            self.draw_edge(edge)
+        for vertex in self.vertex_items:
+            self.draw_vertex(vertex)
+        self.update_detail()
+        self.canvas.tag_lower("edge")
+        self.canvas.tag_raise("vertex")
+        self.canvas.tag_raise("text")
+
+    # -------------------------
+    # Draw Reset
+    # -------------------------
+    def draw_reset(self) -> None:
+        """
+        Draws all elements in State.NONE with a few canvas calls over
+        tags, instead of one call per element.
+        """
+        self.canvas.itemconfig("edge", fill=self.app.COLOR_NONE, width=2)
+        self.canvas.itemconfig("vertex", fill=self.app.COLOR_NONE)
+        self.canvas.tag_lower("edge")
+        self.canvas.tag_raise("vertex")
+        self.canvas.tag_raise("text")
+
+    # -------------------------
+    # Refresh Edge
+    # -------------------------
+    def refresh_edge(self, edge: Edge) -> None:
+        """
+        Changes edge coordinates as vertices are moved around on the canvas.
+        """
+        canvas_id = self.edge_items.get(edge)
+        if canvas_id is None:
+            return
+        ax, ay = self.vertex_coords(edge.a)
+        bx, by = self.vertex_coords(edge.b)
+        self.canvas.coords(canvas_id, ax, ay, bx, by)
+        text_id = self.edge_labels.get(edge)
+        if text_id is not None:
+            self.canvas.coords(text_id, (ax + bx) / 2, (ay + by) / 2)
+
+    # -------------------------
+    # Draw Edge Weight
+    # -------------------------
+    def draw_edge_weight(self, edge: Edge) -> None:
+        """Changes the weight label of an edge."""
+        text_id = self.edge_labels.get(edge)
+        if text_id is not None:
+            self.canvas.itemconfig(text_id, text=str(edge.weight))
+
+    # -------------------------
+    # Draw Area
+    # -------------------------
+    def draw_area(self, points) -> None:
+        """Draws a closed polygon with graph positions."""
+        area = [self.to_canvas(x, y) for x, y in points]
+        self.canvas.create_polygon(
+            *area, fill="lemon chiffon", outline="black", tags="area"
+        )
+        self.canvas.tag_lower("area")
+
+    # -------------------------
+    # Zoom
+    # -------------------------
+    def zoom(self, x, y, factor: float) -> None:
+        """
+        Zooms the canvas centered on canvas position x, y.
+
+        Parameters
+        ----------
+        x, y: float
+            Canvas position of zoom center.
+        factor: float
+            Zoom factor.
+        """
+        self.scale *= factor
+        self.offset_x = self.offset_x * factor + x * (1 - factor)
+        self.offset_y = self.offset_y * factor + y * (1 - factor)
+        self.canvas.scale("all", x, y, factor, factor)
+        # Adjust your view to stay focused
+        self.update_scrollregion()
+        # Update the size of edge arrows
+        if not self.graph.bidirectional:
+            self.canvas.itemconfig("edge", arrowshape=self.arrow_shape())
+        self.update_detail()
+        self.update_view()
+
+    # -------------------------
+    # Select
+    # -------------------------
+    def select(self, element) -> None:
+        """Set a vertex or an edge as selected."""
+        canvas_id = self.vertex_items.get(element) or self.edge_items.get(element)
+        if canvas_id is not None:
+            self.canvas.itemconfig(canvas_id, fill=self.app.COLOR_SELECTED)
+
+    # -------------------------
+    # Unselect
+    # -------------------------
+    def unselect(self, element) -> None:
+        """Unselect a vertex or an edge."""
+        canvas_id = self.vertex_items.get(element) or self.edge_items.get(element)
+        if canvas_id is not None:
+            self.canvas.itemconfig(canvas_id, fill=self.app.COLOR_NONE)
+
+    # -------------------------
+    # Bind Events
+    # -------------------------
+    def bind_events(self) -> None:
+        """
+        Binds the mouse events of canvas. The vertex or edge of an
+        event is found by hit_test(), so items have no bindings.
+        """
+        self.canvas.bind("<Button-1>", self.on_button1)
+        self.canvas.bind("<B1-Motion>", self.on_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_release)
+        self.canvas.bind("<Button-3>", self.on_button3)
+        self.canvas.bind("<Motion>", self.on_motion)
+        self.canvas.bind("<Leave>", lambda event: self.hover(None))
+
+    # -------------------------
+    # Hit Test
+    # -------------------------
+    def hit_test(self, event: tk.Event) -> Vertex | Edge | None:
+        """
+        Returns the drawn vertex or else the drawn edge under the mouse,
+        within HIT_TOLERANCE pixels, or None.
+        """
+        x, y = self.to_model(
+            self.canvas.canvasx(event.x),
+            self.canvas.canvasy(event.y),
+        )
+        tolerance = GraphRenderer.HIT_TOLERANCE / self.scale
+        vertex = self.index.nearest_vertex(x, y, Vertex.radius + tolerance)
+        if vertex is not None and vertex in self.vertex_items:
+            return vertex
+        edge = self.index.nearest_edge(x, y, tolerance)
+        if edge is not None and edge in self.edge_items:
+            return edge
+        return None
+
+    # -------------------------
+    # Hover
+    # -------------------------
+    def hover(self, element) -> None:
+        """Changes the element under the mouse, leaving the previous."""
+        previous = self.hovered
+        if element is previous:
+            return
+        self.hovered = element
+        if isinstance(previous, Vertex):
+            self.vertex_leave(previous)
+        elif isinstance(previous, Edge):
+            self.edge_leave(previous)
+        if isinstance(element, Vertex):
+            self.vertex_enter(element)
+        elif isinstance(element, Edge):
+            self.edge_enter(element)
+
+    # -------------------------
+    # Mouse Events
+    # -------------------------
+    def on_motion(self, event: tk.Event) -> None:
+        self.hover(self.hit_test(event))
+
+    def on_button1(self, event: tk.Event) -> None:
+        element = self.hit_test(event)
+        self.hover(element)
+        self.pressed = element
+        if isinstance(element, Vertex):
+            self.app.on_vertex_click(element, event)
+        elif isinstance(element, Edge):
+            self.app.on_edge_click(element, event)
+
+    def on_drag(self, event: tk.Event) -> None:
+        # The pressed vertex follows the mouse, also out of its circle
+        if isinstance(self.pressed, Vertex):
+            self.app.on_vertex_drag(self.pressed, event)
+
+    def on_release(self, event: tk.Event) -> None:
+        self.pressed = None
+        self.hover(self.hit_test(event))
+
+    def on_button3(self, event: tk.Event) -> None:
+        element = self.hit_test(event)
+        if isinstance(element, Vertex):
+            self.app.on_vertex_connect(element, event)
+
+    # -------------------------
+    # Vertex Enter
+    # -------------------------
+    def vertex_enter(self, vertex: Vertex) -> None:
+        """
+        Event called when mouse is over vertex point,
+        changing the vertex color.
+        """
+        if not self.app.editing or self.app.selected == vertex:
+            return
+        self.canvas.itemconfig(
+            self.vertex_items[vertex],
+            fill=self.app.COLOR_OVER,
+        )
+
+    # -------------------------
+    # Vertex Leave
+    # -------------------------
+    def vertex_leave(self, vertex: Vertex) -> None:
+        """
+        Event called when mouse is out of vertex point,
+        changing the vertex color.
+        """
+        if not self.app.editing:
+            return
+        if self.app.selected == vertex:
+            self.select(vertex)
+        else:
+            self.unselect(vertex)
+
+    # -------------------------
+    # Edge Enter
+    # -------------------------
+    def edge_enter(self, edge: Edge) -> None:
+        """
+        Event called when mouse is over edge line, changing the edge color.
+        """
+        if not self.app.editing or self.app.selected_edge == edge:
+            return
+        self.canvas.itemconfig(
+            self.edge_items[edge],
+            fill=self.app.COLOR_OVER,
+        )
+
+    # -------------------------
+    # Edge Leave
+    # -------------------------
+    def edge_leave(self, edge: Edge) -> None:
+        """
+        Event called when mouse is out of edge line, changing the edge color.
+        """
+        if not self.app.editing:
+            return
+        if self.app.selected_edge == edge:
+            self.select(edge)
+        else:
+            self.unselect(edge)
+
+    # -------------------------
+    # Graph Observer
+    # -------------------------
+    def on_graph_loaded(self) -> None:
+        self.rebuild()
+
+    def on_graph_cleared(self) -> None:
+        self.cancel_rebuild()
+        self.index.clear()
+        self.canvas.delete("all")
+        self.vertex_items.clear()
+        self.edge_items.clear()
+        self.vertex_labels.clear()
+        self.edge_labels.clear()
+        self.hovered = None
+        self.pressed = None
+
+    def on_vertex_added(self, vertex: Vertex) -> None:
+        self.index.add_vertex(vertex)
+        if self.vertex_in_region(vertex):
+            self.create_vertex_items(vertex)
+
+    def on_vertex_removed(self, vertex: Vertex) -> None:
+        self.index.remove_vertex(vertex)
+        self.delete_vertex_items(vertex)
+
+    def on_vertex_changed(self, vertex: Vertex) -> None:
+        self.index.move_vertex(vertex)
+        for e in vertex.edge:
+            if e in self.edge_items:
+                self.refresh_edge(e)
+            elif self.edge_in_region(e):
+                self.create_edge_items(e)
+        canvas_id = self.vertex_items.get(vertex)
+        if canvas_id is None:
+            if self.vertex_in_region(vertex):
+                self.create_vertex_items(vertex)
+            return
+        x, y = self.vertex_coords(vertex)
+        r = Vertex.radius * self.scale
+        self.canvas.coords(canvas_id, x - r, y - r, x + r, y + r)
+        text_id = self.vertex_labels.get(vertex)
+        if text_id is not None:
+            self.canvas.coords(text_id, x, y - 15 * self.scale)
+            self.canvas.itemconfig(text_id, text=vertex.name)
+
+    def on_vertex_state(self, vertex: Vertex) -> None:
+        if self.app.is_animated():
+            self.app.ui.call(self.draw_vertex, vertex, key=vertex)
+
+    def on_edge_added(self, edge: Edge) -> None:
+        self.index.add_edge(edge)
+        if self.edge_in_region(edge):
+            self.create_edge_items(edge)
+
+    def on_edge_removed(self, edge: Edge) -> None:
+        self.index.remove_edge(edge)
+        self.delete_edge_items(edge)
+
+    def on_edge_changed(self, edge: Edge) -> None:
+        self.app.ui.call(self.draw_edge_weight, edge, key=("weight", edge))
+
+    def on_edge_state(self, edge: Edge) -> None:
+        if self.app.is_animated():
+            self.app.ui.call(self.draw_edge, edge, key=edge)
+
+    def on_states_reset(self) -> None:
+        self.app.ui.call(self.draw_reset, key="reset")
+
+    def on_vertex_states(self, vertices: list[Vertex]) -> None:
+        if self.app.is_animated():
+            self.app.ui.call_each(self.draw_vertex, vertices)
+
+    def on_edge_states(self, edges: list[Edge]) -> None:
+        if self.app.is_animated():
+            self.app.ui.call_each(self.draw_edge, edges)
@@ -0,0 +1,309 @@
+import hashlib
+import importlib
+import os
+from threading import Lock
+import lupa
+from state import State
+
+# Lua runtimes that lupa may provide, as names of its submodules
+LUA_RUNTIMES = ("luajit21", "luajit20", "lua55", "lua54", "lua53", "lua52", "lua51")
+
+# Runtime of "from lupa import LuaRuntime", used when no other is chosen
+DEFAULT_LUA_RUNTIME = lupa.LuaRuntime.__module__.rsplit(".", 1)[-1]
+
+_available_lua_runtimes = None
+
+# Runs once in each Lua runtime, before the scripts. It replaces
+# dofile() to load files from the cache.
+LUA_PRELUDE = """
+local load_file = ...
+local load = loadstring or load -- Lua 5.1 and LuaJIT
+
+function dofile(path)
+    return load_file(path)()
+end
+
+local function compile(source, name)
+    local chunk, message = load(source, "@" .. name)
+    if not chunk then
+        error(message, 0)
+    end
+    return chunk
+end
+
+return compile
+"""
+
+
+# -------------------------
+# Available Lua Runtimes
+# -------------------------
+def available_lua_runtimes():
+    """Returns the names of the Lua runtimes provided by lupa."""
+    global _available_lua_runtimes
+    if _available_lua_runtimes is None:
+        names = []
+        for name in LUA_RUNTIMES:
+            try:
+                importlib.import_module(f"lupa.{name}")
+            except ImportError:
+                continue
+            names.append(name)
+        _available_lua_runtimes = names
+    return list(_available_lua_runtimes)
+
+
+# -------------------------
+# Select Lua Runtime
+# -------------------------
+def select_lua_runtime(requested=None):
+    """
+    Chooses the Lua runtime of an execution.
+
+    Parameters
+    ----------
+    requested: str
+        Names of runtimes in order of preference, separated by commas,
+        e.g. "luajit21, lua54". The name "luajit" means any LuaJIT.
+        None or an empty string means the default runtime.
+
+    Returns
+    -------
+    tuple[str, list[str]]
+        Name of the first available runtime, or DEFAULT_LUA_RUNTIME if
+        none is, and the requested names that are not available.
+    """
+    available = available_lua_runtimes()
+    missing = []
+    for name in str(requested or "").split(","):
+        name = name.strip().lower()
+        if not name:
+            continue
+        if name == "luajit":
+            candidates = [n for n in available if n.startswith("luajit")]
+        else:
+            candidates = [name] if name in available else []
+        if candidates:
+            return candidates[0], missing
+        missing.append(name)
+    return DEFAULT_LUA_RUNTIME, missing
+
+
+# -------------------------
+# Lua State Class
+# -------------------------
+class LuaState:
+    """
+    A Lua runtime ready to run a script, with its loaded functions and
+    the global State table. A runtime runs a single execution and is
+    then closed: lupa keeps the Python objects referenced by Lua by
+    their id(), so a wrapper of an object of an old execution, whose
+    finalizer did not run yet, could drop the reference of an object
+    of a new execution that got the same id(), and later reach another
+    object. Creating a runtime and loading a script takes about a
+    millisecond; the pool of ScriptCache prepares them in advance.
+
+    Attributes
+    ----------
+    name: str
+        Name of the runtime (see LUA_RUNTIMES).
+    lua: LuaRuntime
+        The Lua runtime, None after close().
+    used: bool
+        If the runtime was given to an execution.
+    proxy: LuaAppProxy or None
+        Interface of the execution in this runtime, released with it.
+    """
+
+    def __init__(self, cache, name: str):
+        """
+        Parameters
+        ----------
+        cache: ScriptCache
+            Cache that owns this runtime, used to read the files.
+        name: str
+            Name of the runtime, one of available_lua_runtimes().
+        """
+        self.cache = cache
+        self.name = name
+        module = importlib.import_module(f"lupa.{name}")
+        self.lua = module.LuaRuntime(unpack_returned_tuples=True)
+        self.lua.globals().State = self.lua.table_from(
+            {
+                "NONE": State.NONE,
+                "TESTING": State.TESTING,
+                "ACTIVE": State.ACTIVE,
+                "INVALID": State.INVALID,
+            }
+        )
+        self.functions = {}  # path: (digest, function)
+        self.used = False
+        self.proxy = None
+        self._compile = self.lua.execute(LUA_PRELUDE, self.function)
+
+    # -------------------------
+    # Get Implementation
+    # -------------------------
+    def get_implementation(self) -> str:
+        """Returns the name and version of Lua, e.g. "LuaJIT 2.1"."""
+        return self.lua.lua_implementation
+
+    # -------------------------
+    # Function
+    # -------------------------
+    def function(self, path: str):
+        """
+        Returns the file loaded as a Lua function of this runtime. The
+        file is compiled again only if its content changed.
+        """
+        digest, source = self.cache.read(path)
+        cached = self.functions.get(path)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        function = self._compile(source, path)
+        self.functions[path] = (digest, function)
+        return function
+
+    # -------------------------
+    # Close
+    # -------------------------
+    def close(self) -> None:
+        """
+        Drops the runtime with its functions and globals, and so every
+        Lua reference to the objects of the execution, and releases the
+        proxy of the execution.
+        """
+        if self.proxy is not None:
+            self.proxy.release()
+        self.functions.clear()
+        self._compile = None
+        self.lua = None
+
+
+# -------------------------
+# Script Cache Class
+# -------------------------
+class ScriptCache:
+    """
+    Cache of compiled scripts, to run the same script many times
+    without reading and compiling it again. Files are identified by
+    path, modification time and a hash of the content: the file is
+    read again only if the modification time or the size changes,
+    and compiled again only if the content changes.
+
+    Python scripts are cached as code objects. Lua scripts are loaded
+    in runtimes prepared before the execution (see warm()), which are
+    kept in a pool until an execution takes them. Each runtime runs a
+    single execution (see LuaState).
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._sources = {}  # path: (mtime, size, digest, source)
+        self._code = {}  # path: (digest, code)
+        self._lua_states = {}  # Unused Lua runtimes by name
+
+    # -------------------------
+    # Read
+    # -------------------------
+    def read(self, path: str):
+        """
+        Returns the hash and the content of a file, reading it only if
+        it changed since the last call.
+
+        Returns
+        -------
+        tuple[str, str]
+            Hash and content of the file.
+        """
+        info = os.stat(path)
+        with self._lock:
+            cached = self._sources.get(path)
+        if cached is not None and cached[:2] == (info.st_mtime_ns, info.st_size):
+            return cached[2], cached[3]
+        with open(path, "r") as file:
+            source = file.read()
+        digest = hashlib.sha1(source.encode()).hexdigest()
+        with self._lock:
+            self._sources[path] = (info.st_mtime_ns, info.st_size, digest, source)
+        return digest, source
+
+    # -------------------------
+    # Python Code
+    # -------------------------
+    def python_code(self, path: str):
+        """Returns the Python script compiled as a code object."""
+        digest, source = self.read(path)
+        with self._lock:
+            cached = self._code.get(path)
+        if cached is not None and cached[0] == digest:
+            return cached[1]
+        code = compile(source, path, "exec")
+        with self._lock:
+            self._code[path] = (digest, code)
+        return code
+
+    # -------------------------
+    # Acquire Lua
+    # -------------------------
+    def acquire_lua(self, name: str = DEFAULT_LUA_RUNTIME) -> LuaState:
+        """
+        Returns an unused Lua runtime of the pool, or a new one. It
+        must be given back with release_lua() after the execution.
+
+        Parameters
+        ----------
+        name: str
+            Name of the runtime (see select_lua_runtime()).
+        """
+        lua_state = self._take_lua(name)
+        lua_state.used = True
+        return lua_state
+
+    def _take_lua(self, name: str) -> LuaState:
+        """Removes an unused runtime from the pool, or creates one."""
+        with self._lock:
+            idle = self._lua_states.get(name)
+            if idle:
+                return idle.pop()
+        return LuaState(self, name)
+
+    # -------------------------
+    # Release Lua
+    # -------------------------
+    def release_lua(self, lua_state: LuaState) -> None:
+        """
+        Closes the Lua runtime of an ended execution. It is not reused
+        (see LuaState); the next execution takes a new runtime.
+        """
+        lua_state.close()
+
+    # -------------------------
+    # Warm
+    # -------------------------
+    def warm(self, path: str, name: str = DEFAULT_LUA_RUNTIME) -> None:
+        """
+        Prepares the execution of a script before it is played: Python
+        scripts are compiled and Lua scripts are loaded in an unused
+        runtime of the pool, created if needed. Errors are ignored here, they are
+        reported when the script is executed.
+
+        Parameters
+        ----------
+        path: str
+            Path of the script.
+        name: str
+            Name of the Lua runtime, for Lua scripts.
+        """
+        try:
+            if path.lower().endswith(".lua"):
+                lua_state = self._take_lua(name)
+                try:
+                    lua_state.function(path)
+                finally:
+                    with self._lock:
+                        self._lua_states.setdefault(name, []).append(lua_state)
+            else:
+                self.python_code(path)
+        except Exception:
+            pass
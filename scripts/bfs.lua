@@ -79,14 +79,10 @@ function BFS:run()
             break -- We get out of the loop if we find destiny
         end
 
-        local edge_size = current.vertex:get_edge_size()
-        for i = 1, edge_size do
-            local edge = current.vertex:get_edge(i)
-            local neighbor = current.vertex:get_adjacent(edge)
-            if neighbor:get_state() ~= State.TESTING then
-                local node = BFSNode.new(neighbor, edge, current)
-                table.insert(self.queue, node)
-            end
+        -- Neighbors that are not being tested
+        for edge, neighbor in current.vertex:neighbors(nil, nil, nil, State.TESTING) do
+            local node = BFSNode.new(neighbor, edge, current)
+            table.insert(self.queue, node)
         end
         -- Control commands to synchronize with the application.
         app:step()
@@ -112,10 +108,13 @@ end
 --- Marc the path of origin vertex to destination vertex as ACTIVE
 function BFS:mark_path_as_active()
     local path = ""
+    local log_path = app:log_enabled("$")
     local current = self.destination
     repeat
-        -- Add current vertex ID to path
-        path = current.vertex:get_id() .. " " .. path
+        -- Add current vertex ID to path, only if it will be shown
+        if log_path then
+            path = current.vertex:get_id() .. " " .. path
+        end
 
         -- Mark current vertex and edge to it's parent as ACTIVE
         -- if current is not then origin vertex
@@ -127,18 +126,18 @@ function BFS:mark_path_as_active()
         -- Move current to parent vertex
         current = current.parent
     until current == nil
-    app:log("$path [ " .. path .. "]")
+    if log_path then
+        app:log("$path [ " .. path .. "]")
+    end
 end
 
 --- Function main
 --- Run the BFS algorithm with a random origin and random destination.
 local function main()
-    -- Initializes the random number generator seed
-    math.randomseed(os.time())
     local vertex_size = app:get_vertex_size()
     -- Get random origin and destination vertex from graph
-    local orig = math.random(1, vertex_size)
-    local dest = math.random(1, vertex_size)
+    local orig = app:random(1, vertex_size)
+    local dest = app:random(1, vertex_size)
     BFS.new(orig, dest):run()
 end
 
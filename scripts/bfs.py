@@ -1,5 +1,4 @@
 import time
-import random
 
 app: "AppProxy" # type: ignore
 
@@ -117,13 +116,11 @@ class BFS:
                 self.destination = current
                 break
 
-            edge_size = current.vertex.get_edge_size()
-            for i in range(edge_size):
-                edge = current.vertex.get_edge(i)
-                neighbor = current.vertex.get_adjacent(edge)
-                if neighbor.get_state() != State.TESTING:
-                    node = BFSNode(neighbor, edge, current)
-                    self.queue.append(node)
+            for edge, neighbor in current.vertex.neighbors(
+                not_vertex_state=State.TESTING
+            ):
+                node = BFSNode(neighbor, edge, current)
+                self.queue.append(node)
 
             app.step()
             if app.is_stopped():
@@ -143,15 +140,18 @@ class BFS:
 
     def mark_path_as_active(self):
         """Marks the path from origin to destination as active"""
-        path = ""
+        path = []
+        log_path = app.log_enabled("$")
         current = self.destination
         while current is not None:
-            path = f"{current.vertex.get_id()} {path}"
+            if log_path:
+                path.append(str(current.vertex.get_id()))
             current.vertex.set_state(State.ACTIVE)
             if current.edge:
                 current.edge.set_state(State.ACTIVE)
             current = current.parent
-        app.log(f"$path [ {path.strip()} ]")
+        if log_path:
+            app.log(f"$path [ {' '.join(reversed(path))} ]")
 
 
 # -------------------------
@@ -162,8 +162,7 @@ This script implements a Breadth First Search (BFS) algorithm to
 find a path in a graph. It initializes a BFS instance with a
 random starting and random destination vertex.
 """
-random.seed(time.time())
 vertex_size = app.get_vertex_size()
-orig = random.randint(0, vertex_size-1)
-dest = random.randint(0, vertex_size-1)
+orig = app.random(0, vertex_size-1)
+dest = app.random(0, vertex_size-1)
 BFS(orig, dest).run()
@@ -40,8 +40,8 @@ DFS.__index = DFS
 ---@param destination_pos integer The end vertex point
 function DFS.new(origin_pos, destination_pos)
     local self = setmetatable({}, DFS)
-    self.origin_id = app:get_vertex(origin_pos).get_id()
-    self.destination_id = app:get_vertex(destination_pos).get_id()
+    self.origin_id = app:get_vertex(origin_pos):get_id()
+    self.destination_id = app:get_vertex(destination_pos):get_id()
     self.found = false -- Flag to know if the destination was found
     self.origin = DFSNode.new(app:get_vertex(origin_pos), nil)
     self.path = ""
@@ -76,11 +76,8 @@ function DFS:visit(current)
     if app:is_stopped() then
         return
     end
-    local edge_size = current.vertex:get_edge_size()
-    for i = 1, edge_size do
-        local edge = current.vertex:get_edge(i)
-        local vertex_neighbor = current.vertex:get_adjacent(edge)
-        if vertex_neighbor and vertex_neighbor:get_state() == State.NONE then
+    for edge, vertex_neighbor in current.vertex:neighbors() do
+        if vertex_neighbor:get_state() == State.NONE then
             edge:set_state(State.TESTING)
             vertex_neighbor:set_state(State.TESTING)
             if vertex_neighbor:get_id() == self.destination_id then
@@ -116,11 +113,9 @@ end
 
 --- Function main
 local function main()
-    -- Initializes the random number generator seed
-    math.randomseed(os.time())
     local vertex_size = app:get_vertex_size()
-    local orig = math.random(1, vertex_size)
-    local dest = math.random(1, vertex_size)
+    local orig = app:random(1, vertex_size)
+    local dest = app:random(1, vertex_size)
     DFS.new(orig, dest):run()
 end
 
@@ -1,5 +1,4 @@
 import time
-import random
 
 app: "AppProxy" # type: ignore
 
@@ -115,11 +114,8 @@ class DFS:
         if app.is_stopped():
             return
 
-        edge_size = current.vertex.get_edge_size()
-        for i in range(edge_size):
-            edge = current.vertex.get_edge(i)
-            neighbor = current.vertex.get_adjacent(edge)
-            if neighbor and neighbor.get_state() == State.NONE:
+        for edge, neighbor in current.vertex.neighbors():
+            if neighbor.get_state() == State.NONE:
                 edge.set_state(State.TESTING)
                 neighbor.set_state(State.TESTING)
 
@@ -158,8 +154,7 @@ This script implements a Depth-First Search (DFS) algorithm to
 find a path in a graph. It initializes a BFS instance with a
 random starting and random destination vertex.
 """
-random.seed(time.time())
 vertex_size = app.get_vertex_size()
-orig = random.randint(0, vertex_size-1)
-dest = random.randint(0, vertex_size-1)
+orig = app.random(0, vertex_size-1)
+dest = app.random(0, vertex_size-1)
 DFS(orig, dest).run()
@@ -54,12 +54,10 @@ function NBFS:run()
         for i = 1, #self.leaves do -- For each leaf of this level
             app:step()
             local n = self.leaves[i]
-            local edge_size = n.vertex:get_edge_size()
-            for j = 1, edge_size do -- For each vertex's edge of this leaf
+            for e, adjacent in n.vertex:neighbors() do -- For each vertex's edge of this leaf
                 app:step()
-                local e = n.vertex:get_edge(j) -- Get the edge
                 local child
-                child, self.found = self:select_child(r, n, e, first) -- get child if valid
+                child, self.found = self:select_child(r, n, e, adjacent, first) -- get child if valid
                 if self.found then -- If get_child returns true, than a vertex target was found
                     self.node = child
                     break
@@ -95,9 +93,10 @@ end
 --- Get a valid child of parent node vertex and it's edge
 ---@param node Node to verify (Node)
 ---@param edge Edge connected to parent to verify (Edge)
+---@param adjacent Vertex connected to parent by the edge (Vertex)
 ---@return Node returns a child if valid or found, and nil if not valid (Node)
 ---@return boolean true if found a target or false if not found (boolean)
-function NBFS:select_child(root, node, edge, first)
+function NBFS:select_child(root, node, edge, adjacent, first)
 
     -- Case 1: If I'm trying to follow an edge that's already in the path.
     --         It can happen in the first iteration.
@@ -105,8 +104,6 @@ function NBFS:select_child(root, node, edge, first)
         return nil, false
     end
 
-    local adjacent = node.vertex:get_adjacent(edge) -- adjacent vertex
-
    
     if adjacent:get_state() == State.TESTING then
         -- Case 2: General blocking of TESTING outside of the first iteration.
@@ -38,7 +38,7 @@ function nemertea()
     local path_size = 1 -- Number of vertices in the path
     local vertex_size = app:get_vertex_size() -- Number of vertices in the graph
     -- Randomly selects a vertex to start the algorithm
-    local first_vertex = app:get_vertex(math.random(1, vertex_size))
+    local first_vertex = app:get_vertex(app:random(1, vertex_size))
     local current = first_vertex -- Starting current vertex at the first
     local start_time = os.clock()
     current:set_state(State.ACTIVE) -- Sets the current status to active
@@ -131,8 +131,8 @@ function first_path(root)
             if edge:get_state() ~= State.ACTIVE then
                 local adjacent = p:get_adjacent(edge)
                 if adjacent:get_state() ~= State.ACTIVE then
-                    edge.set_state(State.ACTIVE)
-                    adjacent.set_state(State.ACTIVE)
+                    edge:set_state(State.ACTIVE)
+                    adjacent:set_state(State.ACTIVE)
                     p = adjacent
                     found = true
                     size = size + 1
@@ -166,7 +166,5 @@ end
 -- Nemertea initialization
 -- =========================
 
--- Initializes the random number generator seed
-math.randomseed(os.time())
 path_size = nemertea()
 evaluate(path_size)
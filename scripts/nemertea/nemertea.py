@@ -1,5 +1,4 @@
 import time
-import random
 
 app: "AppProxy" # type: ignore
 
@@ -25,16 +24,6 @@ class Node:
         self.children.append(child)
         return child
 
-    def destroy(self):
-        if self.parent and self.edge and self.edge.get_state() != State.ACTIVE:
-            self.edge.set_state(State.NONE)
-
-        if self.vertex.get_state() != State.ACTIVE:
-            self.vertex.set_state(State.NONE)
-
-        self.parent = None
-        self.children = None
-
 # NBFS --------------------------------------------------------------------------
 
 class NBFS:
@@ -56,12 +45,11 @@ class NBFS:
             new_level = []
             for leaf in self.leaves:
                 app.step()
-                edge_size = leaf.vertex.get_edge_size()
-
-                for i in range(edge_size):
+                for edge, adjacent in leaf.vertex.neighbors():
                     app.step()
-                    edge = leaf.vertex.get_edge(i)
-                    child, self.found = self.select_child(root, leaf, edge, first)
+                    child, self.found = self.select_child(
+                        root, leaf, edge, adjacent, first
+                    )
 
                     if self.found:
                         self.node = child
@@ -85,13 +73,11 @@ class NBFS:
         self.destroy(self.root)
         return self.new_vertices
 
-    def select_child(self, root, node, edge, first):
+    def select_child(self, root, node, edge, adjacent, first):
         # Caso 1: Aresta já ativa - ignora
         if edge.get_state() == State.ACTIVE:
             return None, False
 
-        adjacent = node.vertex.get_adjacent(edge)
-
         # Caso 2: Só na primeira iteração pode visitar vértices TESTING
         if not first and adjacent.get_state() == State.TESTING:
             return None, False
@@ -123,22 +109,36 @@ class NBFS:
             if edge and edge.get_state() == State.ACTIVE:
                 edge.set_state(State.NONE)
         # faz o caminho de volta para a raiz e ativa os vértices e arestas   
+        vertices = []
+        edges = []
         n = node
         while n.parent:
             if n.vertex.get_state() != State.ACTIVE:
                 self.new_vertices += 1
-            n.vertex.set_state(State.ACTIVE)
-            n.edge.set_state(State.ACTIVE)
+            vertices.append(n.vertex.get_id())
+            edges.append(n.edge.get_id())
             n = n.parent
-
-    def destroy(self, node):
-        if not node.children:
-            return
-        for child in node.children:
-            if child:
-                self.destroy(child)
-                child.destroy()
-        node.children = None
+        app.set_vertex_states(vertices, State.ACTIVE)
+        app.set_edge_states(edges, State.ACTIVE)
+
+    def destroy(self, root):
+        # Coleta os vértices e arestas da árvore que não fazem parte do
+        # caminho e limpa todos de uma vez
+        vertices = []
+        edges = []
+        stack = list(root.children or [])
+        while stack:
+            node = stack.pop()
+            if node.edge and node.edge.get_state() != State.ACTIVE:
+                edges.append(node.edge.get_id())
+            if node.vertex.get_state() != State.ACTIVE:
+                vertices.append(node.vertex.get_id())
+            stack.extend(node.children or [])
+            node.parent = None
+            node.children = None
+        root.children = None
+        app.set_edge_states(edges, State.NONE)
+        app.set_vertex_states(vertices, State.NONE)
 
 
 # NEMERTEA --------------------------------------------------------------------------
@@ -150,7 +150,7 @@ def nemertea():
     vertex_size = app.get_vertex_size()  # Número de vértices no grafo
 
     # Seleciona um vértice aleatório para começar
-    first_vertex = app.get_vertex(random.randint(0, vertex_size-1))
+    first_vertex = app.get_vertex(app.random(0, vertex_size-1))
     current = first_vertex
     start_time = time.time()
     current.set_state(State.ACTIVE)  # Define o estado do vértice atual como ativo
@@ -230,6 +230,5 @@ def evaluate(path_size):
 
 # Inicialização do algoritmo
 
-random.seed(time.time())
 path_size = nemertea()
 evaluate(path_size)
@@ -28,8 +28,7 @@ function main()
     local vertex_size = app:get_vertex_size()
     local begin = nil
     if app:get_var("begin") == -1 then
-        math.randomseed(os.time())
-        begin = app:get_vertex(math.random(1, vertex_size))
+        begin = app:get_vertex(app:random(1, vertex_size))
     else
         begin = app:get_vertex(app:get_var("begin"))
     end
@@ -45,11 +45,7 @@ vertex_size = app.get_vertex_size()
 begin = None
 begin_var = app.get_var("begin")
 if begin_var == -1:
-    import random
-    import time
-
-    random.seed(time.time())
-    begin = app.get_vertex(random.randint(1, vertex_size))
+    begin = app.get_vertex(app.random(0, vertex_size - 1))
 else:
     begin = app.get_vertex(begin_var)
 
@@ -0,0 +1,251 @@
+import math
+from vertex import Vertex
+from edge import Edge
+
+
+# -------------------------
+# Spatial Index Class
+# -------------------------
+class SpatialIndex:
+    """
+    Uniform grid over the positions of the graph, so the vertices and
+    edges in a region are found without visiting the whole graph. Each
+    vertex is in the cell of its position and each edge in the cells
+    crossed by its line. The grid is sparse: only cells with elements
+    are kept.
+
+    Positions are graph positions (see GraphRenderer.to_model), so the
+    index does not change with the zoom. Results of queries are the
+    elements of the cells touched by the region, so they may include
+    elements near, but out of, the region.
+
+    Attributes
+    ----------
+    cell_size: float
+        Width and height of the cells.
+    bounds: tuple or None
+        Rectangle (x0, y0, x1, y1) with all vertices added since the
+        last build or clear, None if there is none.
+    """
+
+    CELL_SIZE = 100.0  # Default cell size, in graph positions
+    CELL_VERTICES = 4  # Mean number of vertices per cell of a build
+
+    def __init__(self, cell_size: float = CELL_SIZE):
+        """
+        Parameters
+        ----------
+        cell_size: float
+            Width and height of the cells.
+        """
+        self.cell_size = cell_size
+        self.bounds = None
+        self.vertex_grid: dict[tuple[int, int], set[Vertex]] = {}
+        self.edge_grid: dict[tuple[int, int], set[Edge]] = {}
+        self.vertex_cell: dict[Vertex, tuple[int, int]] = {}
+        self.edge_cells: dict[Edge, list[tuple[int, int]]] = {}
+
+    # -------------------------
+    # Clear
+    # -------------------------
+    def clear(self) -> None:
+        """Removes all elements."""
+        self.bounds = None
+        self.vertex_grid.clear()
+        self.edge_grid.clear()
+        self.vertex_cell.clear()
+        self.edge_cells.clear()
+
+    # -------------------------
+    # Build
+    # -------------------------
+    def build(self, vertices, edges) -> None:
+        """
+        Indexes the vertices and edges of a graph, replacing the
+        current elements. The cell size is chosen by the area and the
+        number of vertices, with about CELL_VERTICES vertices per cell.
+        """
+        self.clear()
+        vertices = list(vertices)
+        if vertices:
+            xs = [v.x for v in vertices]
+            ys = [v.y for v in vertices]
+            area = (max(xs) - min(xs)) * (max(ys) - min(ys))
+            size = math.sqrt(area * SpatialIndex.CELL_VERTICES / len(vertices))
+            self.cell_size = max(size, 4.0 * Vertex.radius)
+        for vertex in vertices:
+            self.add_vertex(vertex)
+        for edge in edges:
+            self.add_edge(edge)
+
+    # -------------------------
+    # Cell
+    # -------------------------
+    def cell(self, x, y) -> tuple[int, int]:
+        """Returns the cell of a position."""
+        return (
+            math.floor(x / self.cell_size),
+            math.floor(y / self.cell_size),
+        )
+
+    # -------------------------
+    # Line Cells
+    # -------------------------
+    def line_cells(self, ax, ay, bx, by) -> list[tuple[int, int]]:
+        """Returns the cells crossed by the line from a to b."""
+        if ax > bx:
+            ax, ay, bx, by = bx, by, ax, ay
+        size = self.cell_size
+        slope = (by - ay) / (bx - ax) if bx != ax else 0.0
+        cells = []
+        for i in range(math.floor(ax / size), math.floor(bx / size) + 1):
+            # Part of the line in column i
+            x0 = max(ax, i * size)
+            x1 = min(bx, (i + 1) * size)
+            if bx != ax:
+                y0 = ay + (x0 - ax) * slope
+                y1 = ay + (x1 - ax) * slope
+            else:
+                y0, y1 = ay, by
+            if y0 > y1:
+                y0, y1 = y1, y0
+            for j in range(math.floor(y0 / size), math.floor(y1 / size) + 1):
+                cells.append((i, j))
+        return cells
+
+    # -------------------------
+    # Add Vertex
+    # -------------------------
+    def add_vertex(self, vertex: Vertex) -> None:
+        """Adds a vertex at its position."""
+        x, y = vertex.x, vertex.y
+        key = self.cell(x, y)
+        self.vertex_cell[vertex] = key
+        self.vertex_grid.setdefault(key, set()).add(vertex)
+        if self.bounds is None:
+            self.bounds = (x, y, x, y)
+        else:
+            x0, y0, x1, y1 = self.bounds
+            self.bounds = (min(x0, x), min(y0, y), max(x1, x), max(y1, y))
+
+    # -------------------------
+    # Remove Vertex
+    # -------------------------
+    def remove_vertex(self, vertex: Vertex) -> None:
+        """Removes a vertex, if it is in the index."""
+        key = self.vertex_cell.pop(vertex, None)
+        if key is None:
+            return
+        cell = self.vertex_grid[key]
+        cell.discard(vertex)
+        if not cell:
+            del self.vertex_grid[key]
+
+    # -------------------------
+    # Move Vertex
+    # -------------------------
+    def move_vertex(self, vertex: Vertex) -> None:
+        """Moves a vertex, and its edges, to their current positions."""
+        self.remove_vertex(vertex)
+        self.add_vertex(vertex)
+        for edge in vertex.edge:
+            if edge in self.edge_cells:
+                self.remove_edge(edge)
+                self.add_edge(edge)
+
+    # -------------------------
+    # Add Edge
+    # -------------------------
+    def add_edge(self, edge: Edge) -> None:
+        """Adds an edge in the cells crossed by its line."""
+        cells = self.line_cells(edge.a.x, edge.a.y, edge.b.x, edge.b.y)
+        self.edge_cells[edge] = cells
+        grid = self.edge_grid
+        for key in cells:
+            grid.setdefault(key, set()).add(edge)
+
+    # -------------------------
+    # Remove Edge
+    # -------------------------
+    def remove_edge(self, edge: Edge) -> None:
+        """Removes an edge, if it is in the index."""
+        for key in self.edge_cells.pop(edge, ()):
+            cell = self.edge_grid[key]
+            cell.discard(edge)
+            if not cell:
+                del self.edge_grid[key]
+
+    # -------------------------
+    # Query
+    # -------------------------
+    def query(self, x0, y0, x1, y1) -> tuple[set[Vertex], set[Edge]]:
+        """
+        Returns the vertices and the edges in the cells touched by the
+        rectangle from (x0, y0) to (x1, y1).
+        """
+        return (
+            self._query(self.vertex_grid, x0, y0, x1, y1),
+            self._query(self.edge_grid, x0, y0, x1, y1),
+        )
+
+    def _query(self, grid: dict, x0, y0, x1, y1) -> set:
+        """Returns the union of the cells of grid touched by a rectangle."""
+        i0, j0 = self.cell(x0, y0)
+        i1, j1 = self.cell(x1, y1)
+        found = set()
+        if (i1 - i0 + 1) * (j1 - j0 + 1) > len(grid):
+            # Fewer cells in the grid than in the range (zoom out)
+            for (i, j), cell in grid.items():
+                if i0 <= i <= i1 and j0 <= j <= j1:
+                    found.update(cell)
+            return found
+        for i in range(i0, i1 + 1):
+            for j in range(j0, j1 + 1):
+                cell = grid.get((i, j))
+                if cell is not None:
+                    found.update(cell)
+        return found
+
+    # -------------------------
+    # Nearest Vertex
+    # -------------------------
+    def nearest_vertex(self, x, y, radius: float) -> Vertex | None:
+        """
+        Returns the vertex nearest to a position, at most at radius of
+        distance, or None.
+        """
+        nearest = None
+        best = radius * radius
+        vertices = self._query(
+            self.vertex_grid, x - radius, y - radius, x + radius, y + radius
+        )
+        for vertex in vertices:
+            d = (vertex.x - x) ** 2 + (vertex.y - y) ** 2
+            if d <= best:
+                nearest, best = vertex, d
+        return nearest
+
+    # -------------------------
+    # Nearest Edge
+    # -------------------------
+    def nearest_edge(self, x, y, tolerance: float) -> Edge | None:
+        """
+        Returns the edge whose line is nearest to a position, at most at
+        tolerance of distance, or None.
+        """
+        nearest = None
+        best = tolerance * tolerance
+        edges = self._query(
+            self.edge_grid, x - tolerance, y - tolerance, x + tolerance, y + tolerance
+        )
+        for edge in edges:
+            ax, ay = edge.a.x, edge.a.y
+            dx, dy = edge.b.x - ax, edge.b.y - ay
+            length = dx * dx + dy * dy
+            # Point of the line nearest to the position
+            t = ((x - ax) * dx + (y - ay) * dy) / length if length else 0.0
+            t = min(max(t, 0.0), 1.0)
+            d = (ax + t * dx - x) ** 2 + (ay + t * dy - y) ** 2
+            if d <= best:
+                nearest, best = edge, d
+        return nearest
@@ -16,6 +16,23 @@ class ScriptType:
     PYTHON = 1
     LUA = 2
 
+
+class ElementType:
+    """
+    Enumeration to identify the type of a graph element.
+
+    Attributes
+    ----------
+    VERTEX : int
+        Represents a vertex.
+    EDGE : int
+        Represents an edge.
+    """
+
+    VERTEX = 0
+    EDGE = 1
+
+
 class State:
     """
     Enumeration to represents Edge, Vertex and Node states.
@@ -0,0 +1,66 @@
+import glob
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from engine import Engine  # noqa: E402
+
+
+class TestEngine(unittest.TestCase):
+    """Executions of scripts without graphic interface."""
+
+    def setUp(self):
+        # Scripts load their dependencies by paths relative to the root
+        self.cwd = os.getcwd()
+        os.chdir(ROOT)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+
+    def test_one_engine_many_graphs_and_seeds(self):
+        """
+        One Engine runs a Lua script over several graphs and seeds, as
+        runs=N and the batch runner do. Lua runtimes of old executions
+        must not reach the proxies of new ones.
+        """
+        engine = Engine()
+        failures = []
+        for graph in sorted(glob.glob("graphs/c*.json")):
+            for seed in range(1, 5):
+                engine.load_graph(graph)
+                engine.load_script("scripts/dfs.lua")
+                engine.graph.reset_states()
+                engine.start_execution(seed)
+                if not engine.execute():
+                    failures.append((graph, seed, engine.logs[-1]))
+        self.assertEqual(failures, [])
+
+    def test_stop_not_caught_by_except_exception(self):
+        """A stopped script ends at step() also inside except Exception."""
+        source = (
+            "for _ in range(1000):\n"
+            "    try:\n"
+            "        app.step()\n"
+            "    except Exception:\n"
+            "        pass\n"
+            "app.log('#finished')\n"
+        )
+        with tempfile.TemporaryDirectory() as folder:
+            script = os.path.join(folder, "catch.py")
+            with open(script, "w") as file:
+                file.write(source)
+            engine = Engine()
+            engine.load_graph("graphs/cube.json")
+            engine.load_script(script)
+            engine.start_execution(1)
+            engine.stopped = True
+            self.assertFalse(engine.execute())
+        self.assertNotIn("#finished", engine.logs)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from graph_model import GraphModel  # noqa: E402
+
+
+class TestGraphModel(unittest.TestCase):
+    """Loading of graphs."""
+
+    def test_load_arrays_duplicated_vertex_id(self):
+        """Binary loads check vertex IDs as load() does."""
+        graph = GraphModel()
+        with self.assertRaises(ValueError):
+            graph.load_arrays(
+                True, [1, 1], ["a", "b"], [0, 1], [0, 1], [1], [0], [1], [1]
+            )
+        self.assertEqual(graph.get_vertex_size(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
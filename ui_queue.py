@@ -0,0 +1,118 @@
+import threading
+import traceback
+from threading import Lock
+
+
+# -------------------------
+# UI Queue Class
+# -------------------------
+class UIQueue:
+    """
+    Queue of commands to the graphic interface. Tk must only be called
+    by the thread of its main loop, so the commands of other threads
+    (e.g. the script thread) are kept here and run by the main loop at
+    each frame, scheduled with after().
+
+    A command can have a key. A new command with the key of a pending
+    one replaces it, so the many updates of an element in a frame are
+    drawn only once. Commands must read the state of the element when
+    they run, not when they are queued.
+
+    Attributes
+    ----------
+    widget: tk.Widget
+        Widget used to schedule the frames.
+    frame_ms: int
+        Interval between frames, in milliseconds.
+    """
+
+    FRAME_MS = 30  # Interval between frames, in milliseconds
+
+    def __init__(self, widget, frame_ms: int = FRAME_MS):
+        """
+        Parameters
+        ----------
+        widget: tk.Widget
+            Widget used to schedule the frames. The queue must be
+            created by the thread of the main loop.
+        frame_ms: int
+            Interval between frames, in milliseconds.
+        """
+        self.widget = widget
+        self.frame_ms = frame_ms
+        self._thread = threading.current_thread()
+        self._lock = Lock()
+        self._commands = {}  # key: (command, args), in order of arrival
+        self._count = 0  # Keys of commands without key
+        self.widget.after(self.frame_ms, self._drain)
+
+    # -------------------------
+    # Call
+    # -------------------------
+    def call(self, command, *args, key=None) -> None:
+        """
+        Runs a command in the main loop: now, if called by its thread,
+        or in the next frame otherwise.
+
+        Parameters
+        ----------
+        command: callable
+            Command to run, called with args.
+        key: hashable
+            Key of the command. A pending command with the same key is
+            replaced, and this one runs after the other commands queued
+            before it. None runs every call.
+        """
+        if threading.current_thread() is self._thread:
+            command(*args)
+            return
+        self.post(command, *args, key=key)
+
+    # -------------------------
+    # Post
+    # -------------------------
+    def post(self, command, *args, key=None) -> None:
+        """
+        Runs a command in the next frame, also if called by the thread
+        of the main loop (see call()).
+        """
+        with self._lock:
+            if key is None:
+                self._count += 1
+                key = (UIQueue, self._count)
+            else:
+                self._commands.pop(key, None)
+            self._commands[key] = (command, args)
+
+    # -------------------------
+    # Call Each
+    # -------------------------
+    def call_each(self, command, items) -> None:
+        """
+        Calls command(item) for each item, using the item as key (see
+        call()). Items are queued together, with the lock taken once.
+        """
+        if threading.current_thread() is self._thread:
+            for item in items:
+                command(item)
+            return
+        with self._lock:
+            commands = self._commands
+            for item in items:
+                commands.pop(item, None)
+                commands[item] = (command, (item,))
+
+    # -------------------------
+    # Drain
+    # -------------------------
+    def _drain(self) -> None:
+        """Runs the pending commands and schedules the next frame."""
+        with self._lock:
+            commands = self._commands
+            self._commands = {}
+        for command, args in commands.values():
+            try:
+                command(*args)
+            except Exception:
+                traceback.print_exc()
+        self.widget.after(self.frame_ms, self._drain)
@@ -1,17 +1,29 @@
 from typing import Dict, List, Tuple, Union
-import tkinter as tk
-from state import State
+from state import State, ElementType
 from edge import Edge
 import random
 
 
+# -------------------------
+# State Set
+# -------------------------
+def _state_set(states):
+    """Returns a state or a list of states as a set, or None."""
+    if states is None:
+        return None
+    if isinstance(states, int):
+        return {states}
+    return set(states)
+
+
 # -------------------------
 # Vertex Class
 # -------------------------
 class Vertex:
     """
-    This class represents a Vertex on algorithm and it's representation
-    on application to draw on canvas.
+    This class represents a Vertex on algorithm. It only holds data,
+    the representation on canvas is done by an observer of the graph
+    (see GraphRenderer).
 
     Attributes
     ----------
@@ -19,34 +31,32 @@ class Vertex:
         Identify element type in application.
     id: int
         Vertex identification ID.
-    app: App
-        Context of interface application.
-    canvas: tk.Canvas
-        Canvas to draw it element.
+    graph: GraphModel
+        Graph that owns this vertex.
     name: string
         Name of vertex. Starts with a void string.
     x, y: int
-        Position x, y on canvas.
-    state: int
-        State of edge while execution.
+        Position x, y of vertex.
+    index: int
+        Position of vertex in the graph's vertex list. The state and
+        the active edge counter are stored in columns of the graph at
+        this position (see GraphModel).
     """
 
     id: int = 0  # id auto increment
     radius: int = 5
     width: int = 2
 
-    def __init__(self, name: str, x: int, y: int, app, id=-1):
-        self.type: int = app.VERTEX
-        self.app = app
-        self.canvas: tk.Canvas = self.app.canvas
+    def __init__(self, name: str, x: int, y: int, graph, id=-1):
+        self.type: int = ElementType.VERTEX
+        self.graph = graph
         self.edge: List[Edge] = []
         self.neighbor = {}
-        self.active_edges = 0
+        self.index: int = -1
         self.name: str = name
         self.x: int = x
         self.y: int = y
         self.vars = {}
-        self.state: int = State.NONE
         if id == -1:
             Vertex.id = Vertex.id + 1
             self.id = Vertex.id
@@ -54,29 +64,6 @@ class Vertex:
             if Vertex.id <= id:
                 Vertex.id = id + 1
             self.id = id
-        self.canvas_id = self.canvas.create_oval(
-            self.x - Vertex.radius,
-            self.y - Vertex.radius,
-            self.x + Vertex.radius,
-            self.y + Vertex.radius,
-            width=Vertex.width,
-            fill=self.app.COLOR_NONE,
-            tags="vertex",
-        )
-        self.text_id = self.canvas.create_text(
-            self.x,
-            self.y - 15,
-            text=self.name,
-            anchor="center",
-            font=("Arial", 12),
-            tags="text",
-        )
-        self.canvas.tag_raise(self.canvas_id)
-        self.canvas.tag_bind(self.canvas_id, "<Button-1>", self.mouse_down)
-        self.canvas.tag_bind(self.canvas_id, "<Button-3>", self.connect)
-        self.canvas.tag_bind(self.canvas_id, "<B1-Motion>", self.mouse_move)
-        self.canvas.tag_bind(self.canvas_id, "<Any-Enter>", self.mouse_enter)
-        self.canvas.tag_bind(self.canvas_id, "<Any-Leave>", self.mouse_leave)
 
     def get_type(self):
         return "Vertex"
@@ -99,15 +86,26 @@ class Vertex:
     # -------------------------
     # Shuffle Edges
     # -------------------------
-    def shuffle_edges(self) -> None:
-        random.shuffle(self.edge)
+    def shuffle_edges(self, rng=random) -> None:
+        """
+        Shuffles the edge list of this vertex. The edges are sorted by
+        their position in the graph before, so the same random number
+        generator state always gives the same order.
+
+        Parameters
+        ----------
+        rng: random.Random
+            Random number generator. The global one by default.
+        """
+        self.edge.sort(key=lambda e: e.index)
+        rng.shuffle(self.edge)
 
     # -------------------------
     # Set Var
     # -------------------------
     def set_var(self, name, value):
         """
-        Atribui um valor a um atributo dinâmico. 
+        Atribui um valor a um atributo dinâmico.
         Lembre-se: em um sistema soberano, a clareza do dado é sua maior defesa.
         """
         self.vars[name] = value
@@ -129,6 +127,17 @@ class Vertex:
         """Returns the edge ID."""
         return self.id
 
+    # -------------------------
+    # Get Index
+    # -------------------------
+    def get_index(self) -> int:
+        """
+        Returns the dense index of vertex, its position in the graph's
+        vertex list (0 to size - 1). It doesn't change while the graph
+        is not edited, so it is stable during an execution.
+        """
+        return self.index
+
     # -------------------------
     # Get Name
     # -------------------------
@@ -136,6 +145,14 @@ class Vertex:
         """Returns the name of vertex."""
         return self.name
 
+    # -------------------------
+    # Set Name
+    # -------------------------
+    def set_name(self, name: str) -> None:
+        """Changes the name of vertex."""
+        self.name = name
+        self.graph.notify_vertex_changed(self)
+
     # -------------------------
     # Get X
     # -------------------------
@@ -154,11 +171,8 @@ class Vertex:
     # Get Coordinates
     # -------------------------
     def get_coords(self) -> Tuple[int, int]:
-        """Returns the relative coordinates of this vertex on canvas."""
-        coords = self.canvas.coords(self.canvas_id)
-        x = coords[0] + (Vertex.radius * self.app.scale)
-        y = coords[1] + (Vertex.radius * self.app.scale)
-        return x, y
+        """Returns the coordinates of this vertex."""
+        return self.x, self.y
 
     # -------------------------
     # Get Edge Size
@@ -190,6 +204,55 @@ class Vertex:
             return edge.get_b()
         return edge.get_a()
 
+    # -------------------------
+    # Get Neighbors
+    # -------------------------
+    def get_neighbors(
+        self,
+        edge_state=None,
+        vertex_state=None,
+        not_edge_state=None,
+        not_vertex_state=None,
+    ):
+        """
+        Yields the pairs (edge, adjacent vertex) of this vertex, in the
+        order of the edge list. Each filter is a state or a list of
+        states, and None means no filter. States are read while the
+        pairs are yielded.
+
+        Parameters
+        ----------
+        edge_state: int | list[int]
+            Only edges in one of these states.
+        vertex_state: int | list[int]
+            Only adjacent vertices in one of these states.
+        not_edge_state: int | list[int]
+            Skips edges in one of these states.
+        not_vertex_state: int | list[int]
+            Skips adjacent vertices in one of these states.
+        """
+        edge_state = _state_set(edge_state)
+        vertex_state = _state_set(vertex_state)
+        not_edge_state = _state_set(not_edge_state)
+        not_vertex_state = _state_set(not_vertex_state)
+        check_edge = edge_state is not None or not_edge_state is not None
+        check_vertex = vertex_state is not None or not_vertex_state is not None
+        for edge in self.edge:
+            if check_edge:
+                state = edge.get_state()
+                if edge_state is not None and state not in edge_state:
+                    continue
+                if not_edge_state is not None and state in not_edge_state:
+                    continue
+            adjacent = edge.b if edge.a is self else edge.a
+            if check_vertex:
+                state = adjacent.get_state()
+                if vertex_state is not None and state not in vertex_state:
+                    continue
+                if not_vertex_state is not None and state in not_vertex_state:
+                    continue
+            yield edge, adjacent
+
     # -------------------------
     # Get Edge To
     # -------------------------
@@ -215,7 +278,14 @@ class Vertex:
     # -------------------------
     def get_active_edge_size(self) -> int:
         """Return size of active connections of this vertex."""
-        return self.active_edges
+        graph = self.graph
+        if graph.vertex_epoch[self.index] != graph.epoch:
+            return 0
+        return graph.active_edges[self.index]
+
+    @property
+    def active_edges(self) -> int:
+        return self.get_active_edge_size()
 
     # -------------------------
     # Change Active Edge
@@ -232,16 +302,21 @@ class Vertex:
             New state to chage.
         """
         if edge.get_state() != State.ACTIVE and state == State.ACTIVE:
-            self.active_edges += 1
+            self.graph.touch_vertex(self.index)
+            self.graph.active_edges[self.index] += 1
         if edge.get_state() == State.ACTIVE and state != State.ACTIVE:
-            self.active_edges -= 1
+            self.graph.touch_vertex(self.index)
+            self.graph.active_edges[self.index] -= 1
 
     # -------------------------
     # Get State
     # -------------------------
     def get_state(self):
         """Returns the state of this vertex."""
-        return self.state
+        graph = self.graph
+        if graph.vertex_epoch[self.index] != graph.epoch:
+            return State.NONE
+        return graph.vertex_state[self.index]
 
     # -------------------------
     # Set State
@@ -249,141 +324,17 @@ class Vertex:
     def set_state(self, state: int) -> None:
         """Changes the state of this vertex."""
         self.state = state
-        if self.app.animation:
-            self.draw()
+        self.graph.notify_vertex_state(self)
 
-    # -------------------------
-    # Draw
-    # -------------------------
-    def draw(self) -> None:
-        """
-        Draws the element on the screen. It is important when the state
-        has changed.
-        """
-        if self.state == State.NONE:
-            self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_NONE)
-        elif self.state == State.TESTING:
-            self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_OVER)
-        elif self.state == State.ACTIVE:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_SELECTED,
-            )
-        elif self.state == State.INVALID:
-            self.canvas.itemconfig(
-                self.canvas.id,
-                fill=self.app.COLOR_INVALID,
-            )
-
-    # -------------------------
-    # On Mouse Enter
-    # -------------------------
-    def mouse_enter(self, event: tk.Event) -> None:
-        """
-        Event called when mouse is over vertex point,
-        changing the vertex color.
-        """
-        if not self.app.editing:
-            return
-        if self.app.selected is not None and self.app.selected == self:
-            return
-        self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_OVER)
+    @property
+    def state(self) -> int:
+        return self.get_state()
 
-    # -------------------------
-    # On Mouse Leave
-    # -------------------------
-    def mouse_leave(self, event: tk.Event) -> None:
-        """
-        Event called when mouse is out of vertex point,
-        changing the vertex color.
-        """
-        if not self.app.editing:
-            return
-        if self.app.selected is not None and self.app.selected == self:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_SELECTED,
-            )
-        else:
-            self.canvas.itemconfig(
-                self.canvas_id,
-                fill=self.app.COLOR_NONE,
-            )
-
-    # -------------------------
-    # On Mouse Move
-    # -------------------------
-    def mouse_move(self, event: tk.Event) -> None:
-        """Event called when you are moving a vertex to other position."""
-        if not self.app.editing:
-            return
-        x = self.canvas.canvasx(event.x)
-        y = self.canvas.canvasy(event.y)
-        dx = x - self.x
-        dy = y - self.y
-        self.canvas.move(self.canvas_id, dx, dy)
-        self.canvas.move(self.text_id, dx, dy)
-        self.x = x
-        self.y = y
-        for e in self.edge:
-            e.refresh()
-
-    # -------------------------
-    # On Mouse Down
-    # -------------------------
-    def mouse_down(self, event: tk.Event) -> None:
-        """Event called when mouse was clicked over this vertex."""
-        if not self.app.editing:
-            if self.app.debug:
-                if self.state == State.ACTIVE:
-                    self.state = State.NONE
-                else:
-                    self.state = State.ACTIVE
-                self.app.draw()
-                return
-            self.app.set_statusbar(f"Vertex: {self.id}")
-            return
-        if self.app.selected is not None:
-            self.app.selected.unselect()
-            self.app.selected = None
-        if self.app.selected_edge is not None:
-            self.app.selected_edge.unselect()
-            self.app.selected_edge = None
-        self.select()
-        self.app.selected = self
-        self.x = self.canvas.canvasx(event.x)
-        self.y = self.canvas.canvasy(event.y)
-        self.app.set_statusbar(f"Vertex selected: {self.id}")
-        self.app.vertex_id.config(state="normal")
-        self.app.vertex_id.delete(0, tk.END)
-        self.app.vertex_id.insert(0, self.id)
-        self.app.vertex_id.config(state="readonly")
-        self.app.vertex_name.delete(0, tk.END)
-        self.app.vertex_name.insert(0, self.name)
-        self.app.show_config_frame(self.app.vertex_config_frame)
-
-    # -------------------------
-    # Connect
-    # -------------------------
-    def connect(self, event: tk.Event) -> None:
-        """
-        When this vertex is selected and you click with Mouse Button-1
-        in other vertex, you create a connection between this vertex and
-        other, represented by a new edge object.
-        """
-        if self == self.app.selected:
-            return
-        selected = self.app.selected
-        if selected is not None and self.app.selected.type == self.app.VERTEX:
-            if not self.is_connected(self.app.selected):
-                e = Edge(self.app.selected, self, 1, self.app)
-                e.a = self.app.selected
-                e.b = self
-                e.b.neighbor[e.a.get_id()] = e
-                e.a.neighbor[e.b.get_id()] = e
-                self.edge.append(e)
-                self.app.selected.edge.append(e)
-                self.app.edge.append(e)
+    @state.setter
+    def state(self, state: int) -> None:
+        """Changes the state without notifying the graph observers."""
+        self.graph.touch_vertex(self.index)
+        self.graph.vertex_state[self.index] = state
 
     # -------------------------
     # Is Connected
@@ -405,40 +356,3 @@ class Vertex:
             ):
                 return True
         return False
-
-    # -------------------------
-    # Select
-    # -------------------------
-    def select(self) -> None:
-        """Set this vertex as selected."""
-        self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_SELECTED)
-
-    # -------------------------
-    # Unselect
-    # -------------------------
-    def unselect(self) -> None:
-        """Set this vertex as selected."""
-        self.canvas.itemconfig(self.canvas_id, fill=self.app.COLOR_NONE)
-
-    # -------------------------
-    # Delete
-    # -------------------------
-    def delete(self) -> None:
-        """
-        Removes a Vertex. But it is necessary to delete all connections.
-        The function has an auxiliary list, copied from the Edges
-        list, to perform the iteration, because during the iteration the
-        Edge can also ask the Vertex to delete it from the Vertex's Edges
-        list. If this deletion is done and the iteration is being made in
-        the original list, it generates a problem in the loop.
-        """
-        if not self.app.editing:
-            return
-        aux = self.edge.copy()
-        for e in aux:
-            e.delete()
-        self.edge.clear()  # Clear the Edge list
-        self.neighbor.clear()
-        self.canvas.delete(str(self.canvas_id))  # Remove from canvas.
-        self.canvas.delete(str(self.text_id))
-        self.app.vertex.remove(self)
@@ -1,6 +1,13 @@
+def _states(states):
+    """Returns the values of a Lua table of states, or the states."""
+    if hasattr(states, "values"):
+        return list(states.values())
+    return states
+
+
 class VertexProxy:
-    def __init__(self, app, vertex):
-        self._app = app
+    def __init__(self, proxies, vertex):
+        self._proxies = proxies
         self._vertex = vertex
 
     def get_type(self):
@@ -12,6 +19,9 @@ class VertexProxy:
     def get_id(self):
         return self._vertex.get_id()
 
+    def get_index(self):
+        return self._vertex.index
+
     def get_name(self):
         return self._vertex.get_name()
 
@@ -46,22 +56,58 @@ class VertexProxy:
         return self._vertex.get_active_edge_size()
 
     def get_edge(self, index):
-        from edge_proxy import EdgeProxy
-        from state import ScriptType
-
-        aux = 0
-        if self._app.script_type == ScriptType.LUA:
-            aux = 1
-        return EdgeProxy(self._app, self._vertex.get_edge(index - aux))
+        return self._proxies.edge_proxy(self._vertex.get_edge(index))
 
     def get_adjacent(self, edge):
         adjacent = self._vertex.get_adjacent(edge.get_raw_edge())
-        return VertexProxy(self._app, adjacent)
+        return self._proxies.vertex_proxy(adjacent)
+
+    def neighbors(
+        self,
+        edge_state=None,
+        vertex_state=None,
+        not_edge_state=None,
+        not_vertex_state=None,
+    ):
+        proxies = self._proxies
+        for edge, adjacent in self._vertex.get_neighbors(
+            _states(edge_state),
+            _states(vertex_state),
+            _states(not_edge_state),
+            _states(not_vertex_state),
+        ):
+            yield proxies.edge_proxy(edge), proxies.vertex_proxy(adjacent)
 
     def get_edge_to(self, other):
-        from edge_proxy import EdgeProxy
-
         edge = self._vertex.get_edge_to(other.get_raw_vertex())
-        if edge is None:
-            return None
-        return EdgeProxy(self._app, edge)
+        return self._proxies.edge_proxy(edge)
+
+
+class LuaVertexProxy(VertexProxy):
+    """Vertex proxy with the 1-based indices of Lua."""
+
+    def get_index(self):
+        return self._vertex.index + 1
+
+    def get_edge(self, index):
+        return self._proxies.edge_proxy(self._vertex.get_edge(index - 1))
+
+    def neighbors(
+        self,
+        edge_state=None,
+        vertex_state=None,
+        not_edge_state=None,
+        not_vertex_state=None,
+    ):
+        # The pairs are selected in a single call and iterated in Lua
+        items = []
+        proxies = self._proxies
+        for edge, adjacent in self._vertex.get_neighbors(
+            _states(edge_state),
+            _states(vertex_state),
+            _states(not_edge_state),
+            _states(not_vertex_state),
+        ):
+            items.append(proxies.edge_proxy(edge))
+            items.append(proxies.vertex_proxy(adjacent))
+        return proxies.iterate_pairs(items)